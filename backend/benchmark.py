@@ -0,0 +1,564 @@
+"""
+Inference checks and benchmarks for the LSTM Chatbot model.
+
+Usage:
+    python benchmark.py parity [--tolerance 1e-5]
+    python benchmark.py latency [--backends keras compiled numpy] [--iterations 500]
+    python benchmark.py tokenize [--iterations 200]
+    python benchmark.py preprocess [--texts 200000] [--workers 4]
+    python benchmark.py cascade [--iterations 2000]
+    python benchmark.py pool [--workers 1 2 4] [--clients 8] [--requests 200]
+    python benchmark.py load [--patterns 200000] [--intents 50]
+    python benchmark.py bucketing [--iterations 2000] [--epochs 5]
+"""
+
+import io
+import json
+import time
+import pickle
+import argparse
+import sys
+import contextlib
+import numpy as np
+
+from utils.nlp_utils import preprocess_text, preprocess_batch
+from utils.numpy_lstm import NumpyLSTM, pad_sequences
+from utils.vocab_encoder import VocabEncoder
+
+# ========== CONFIGURATION ==========
+DATASET_PATH = 'dataset/intents.json'
+MODEL_PATH = 'model/lstm_model.h5'
+TOKENIZER_PATH = 'model/tokenizer.pkl'
+ENCODER_PATH = 'model/label_encoder.pkl'
+FAST_MODEL_PATH = 'model/fast_classifier.npz'
+
+MAX_SEQUENCE_LENGTH = 20
+
+
+def load_dataset_inputs():
+    """Load every pattern from the dataset as a padded input matrix."""
+    with open(DATASET_PATH, encoding='utf-8') as f:
+        data = json.load(f)
+
+    sentences = preprocess_batch(
+        pattern
+        for intent in data['intents']
+        for pattern in intent['patterns']
+    )
+
+    tokenizer = pickle.load(open(TOKENIZER_PATH, 'rb'))
+    sequences = tokenizer.texts_to_sequences(sentences)
+    return sentences, pad_sequences(sequences, maxlen=MAX_SEQUENCE_LENGTH)
+
+
+def run_parity(tolerance):
+    """Compare the NumPy engine against Keras model.predict on the intents dataset."""
+    from tensorflow.keras.models import load_model
+
+    print("=" * 60)
+    print("PARITY: NumPy engine vs Keras model.predict")
+    print("=" * 60)
+
+    sentences, X = load_dataset_inputs()
+    print(f"Samples: {len(sentences)}")
+
+    keras_model = load_model(MODEL_PATH)
+    expected = keras_model.predict(X, verbose=0)
+
+    engines = {
+        "numpy (h5)": NumpyLSTM.from_h5(MODEL_PATH),
+        "numpy (keras weights)": NumpyLSTM.from_keras_model(keras_model),
+    }
+
+    ok = True
+    for name, engine in engines.items():
+        actual = engine.predict(X)
+        max_diff = float(np.max(np.abs(actual - expected)))
+        argmax_match = float(np.mean(np.argmax(actual, axis=1) == np.argmax(expected, axis=1)))
+        passed = max_diff <= tolerance and argmax_match == 1.0
+        ok = ok and passed
+        print(f"  {name:24s} max |diff| = {max_diff:.2e}  argmax match = {argmax_match*100:.1f}%  "
+              f"[{'OK' if passed else 'FAIL'}]")
+
+    return ok
+
+
+def _percentile_ms(samples, q):
+    return float(np.percentile(samples, q)) * 1000.0
+
+
+def run_latency(backends, iterations):
+    """Measure p50/p99 of ChatService.predict_intent for each inference backend."""
+    from config.settings import get_settings
+    from service.chat_service import ChatService
+
+    settings = get_settings()
+    # Measure the model call itself, not the batching window or cache hits
+    settings.INFERENCE_BATCHING_ENABLED = False
+    settings.PREDICTION_CACHE_ENABLED = False
+
+    print("=" * 60)
+    print("LATENCY: ChatService.predict_intent")
+    print("=" * 60)
+
+    sentences, _ = load_dataset_inputs()
+    print(f"Iterations: {iterations} (cycling over {len(sentences)} dataset patterns)\n")
+    print(f"  {'backend':10s} {'load (s)':>10s} {'p50 (ms)':>10s} {'p99 (ms)':>10s} {'mean (ms)':>10s}")
+
+    for backend in backends:
+        settings.INFERENCE_BACKEND = backend
+        start = time.perf_counter()
+        ChatService.reload_model()
+        load_time = time.perf_counter() - start
+        service = ChatService(db=None)
+
+        samples = []
+        with contextlib.redirect_stdout(io.StringIO()):
+            for i in range(iterations):
+                message = sentences[i % len(sentences)]
+                start = time.perf_counter()
+                service.predict_intent(message)
+                samples.append(time.perf_counter() - start)
+
+        print(f"  {backend:10s} {load_time:10.2f} {_percentile_ms(samples, 50):10.3f} "
+              f"{_percentile_ms(samples, 99):10.3f} {np.mean(samples) * 1000:10.3f}")
+
+
+def run_tokenize(iterations):
+    """Compare the pickled Keras Tokenizer with VocabEncoder: load time, batch encode time and output."""
+    import os
+    import tempfile
+
+    print("=" * 60)
+    print("TOKENIZE: Keras Tokenizer + pad_sequences vs VocabEncoder")
+    print("=" * 60)
+
+    sentences, _ = load_dataset_inputs()
+
+    start = time.perf_counter()
+    tokenizer = pickle.load(open(TOKENIZER_PATH, 'rb'))
+    pickle_load = time.perf_counter() - start
+
+    vocab_path = os.path.join(tempfile.mkdtemp(), 'vocab.txt')
+    VocabEncoder.from_tokenizer(tokenizer).save(vocab_path)
+    start = time.perf_counter()
+    vocab = VocabEncoder.load(vocab_path)
+    vocab_load = time.perf_counter() - start
+
+    expected = pad_sequences(tokenizer.texts_to_sequences(sentences), maxlen=MAX_SEQUENCE_LENGTH)
+    actual = vocab.encode_batch(sentences, MAX_SEQUENCE_LENGTH)
+    identical = actual.dtype == np.int32 and np.array_equal(actual, expected)
+
+    def time_batches(encode):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            encode(sentences)
+        return (time.perf_counter() - start) / iterations * 1000.0
+
+    keras_ms = time_batches(
+        lambda texts: pad_sequences(tokenizer.texts_to_sequences(texts), maxlen=MAX_SEQUENCE_LENGTH)
+    )
+    vocab_ms = time_batches(lambda texts: vocab.encode_batch(texts, MAX_SEQUENCE_LENGTH))
+
+    print(f"Batch: {len(sentences)} texts, {iterations} iterations, vocabulary {vocab.vocab_size} words\n")
+    print(f"  {'':16s} {'load (ms)':>10s} {'batch (ms)':>11s} {'size (bytes)':>13s}")
+    print(f"  {'keras pickle':16s} {pickle_load * 1000:10.2f} {keras_ms:11.3f} {os.path.getsize(TOKENIZER_PATH):13d}")
+    print(f"  {'vocab encoder':16s} {vocab_load * 1000:10.2f} {vocab_ms:11.3f} {os.path.getsize(vocab_path):13d}")
+    print(f"\n  Speedup: {keras_ms / vocab_ms:.1f}x  Output identical: {'OK' if identical else 'FAIL'}")
+
+    return identical
+
+
+def run_preprocess(num_texts, workers):
+    """Compare per-item preprocess_text (regex) with preprocess_batch on a synthetic corpus."""
+    import re
+    import random
+
+    print("=" * 60)
+    print("PREPROCESS: per-item regex loop vs preprocess_batch")
+    print("=" * 60)
+
+    def regex_clean(text):
+        # The original clean_text implementation
+        text = text.lower()
+        text = re.sub(r'[^a-zA-Z\s]', ' ', text)
+        return ' '.join(text.split())
+
+    with open(DATASET_PATH, encoding='utf-8') as f:
+        data = json.load(f)
+    patterns = [p for intent in data['intents'] for p in intent['patterns']]
+    rng = random.Random(42)
+    corpus = [
+        f"{rng.choice(patterns)}? {rng.choice(patterns).upper()}, ke-{rng.randint(1, 99)}!"
+        for _ in range(num_texts)
+    ]
+    import os
+    print(f"Texts: {len(corpus)}  CPUs: {os.cpu_count()} (workers are capped at the CPU count)\n")
+
+    timings = {}
+    outputs = {}
+    for name, fn in [
+        ("regex loop", lambda texts: [regex_clean(t) for t in texts]),
+        ("preprocess_text loop", lambda texts: [preprocess_text(t) for t in texts]),
+        ("preprocess_batch", preprocess_batch),
+        (f"preprocess_batch x{workers}", lambda texts: preprocess_batch(texts, workers=workers)),
+    ]:
+        start = time.perf_counter()
+        outputs[name] = fn(corpus)
+        timings[name] = time.perf_counter() - start
+
+    baseline = timings["regex loop"]
+    expected = outputs["regex loop"]
+    ok = all(out == expected for out in outputs.values())
+    print(f"  {'method':26s} {'time (ms)':>10s} {'speedup':>8s}")
+    for name, seconds in timings.items():
+        print(f"  {name:26s} {seconds * 1000:10.1f} {baseline / seconds:7.1f}x")
+    print(f"\n  Output identical: {'OK' if ok else 'FAIL'}")
+
+    return ok
+
+
+def run_cascade(iterations):
+    """Per-message cost and agreement of the cascade (fast model, then LSTM) against the LSTM alone."""
+    from utils.fast_classifier import FastIntentClassifier, cascade_metrics
+
+    print("=" * 60)
+    print("CASCADE: fast linear model + NumPy LSTM vs NumPy LSTM")
+    print("=" * 60)
+
+    with open(DATASET_PATH, encoding='utf-8') as f:
+        data = json.load(f)
+    tags = [intent['tag'] for intent in data['intents'] for _ in intent['patterns']]
+    encoder = pickle.load(open(ENCODER_PATH, 'rb'))
+    y = encoder.transform(tags)
+
+    sentences, X = load_dataset_inputs()
+    lstm = NumpyLSTM.from_h5(MODEL_PATH)
+    fast = FastIntentClassifier.load(FAST_MODEL_PATH)
+
+    lstm_probs = lstm.predict(X)
+    fast_probs = fast.predict(X)
+    metrics = cascade_metrics(fast_probs, lstm_probs, y, fast.threshold)
+    agreement = float(np.mean(
+        np.where(np.max(fast_probs, axis=1) >= (fast.threshold or np.inf), np.argmax(fast_probs, axis=1),
+                 np.argmax(lstm_probs, axis=1)) == np.argmax(lstm_probs, axis=1)
+    ))
+
+    def per_message_us(predict):
+        start = time.perf_counter()
+        for i in range(iterations):
+            predict(X[i % len(X)][None, :])
+        return (time.perf_counter() - start) / iterations * 1e6
+
+    def cascade_predict(row):
+        probs = fast.predict(row)
+        if fast.threshold is not None and probs.max() >= fast.threshold:
+            return probs
+        return lstm.predict(row)
+
+    lstm_us = per_message_us(lstm.predict)
+    fast_us = per_message_us(fast.predict)
+    cascade_us = per_message_us(cascade_predict)
+
+    print(f"Samples: {len(sentences)} (dataset patterns)  Threshold: {fast.threshold}\n")
+    print(f"  Fast stage coverage:   {metrics['fast_coverage'] * 100:.1f}%")
+    print(f"  Accuracy (labels):     LSTM {np.mean(np.argmax(lstm_probs, axis=1) == y) * 100:.1f}%  "
+          f"cascade {metrics['cascade_accuracy'] * 100:.1f}%")
+    print(f"  Agreement with LSTM:   {agreement * 100:.1f}%\n")
+    print(f"  {'per message':14s} {'mean (us)':>10s}")
+    print(f"  {'lstm':14s} {lstm_us:10.1f}")
+    print(f"  {'fast':14s} {fast_us:10.1f}")
+    print(f"  {'cascade':14s} {cascade_us:10.1f}  ({lstm_us / cascade_us:.1f}x cheaper)")
+
+
+def run_pool(worker_counts, clients, requests):
+    """Throughput of the shared-memory inference pool for different worker counts."""
+    import os
+    import signal
+    import subprocess
+    import threading
+    from service.inference_pool import InferencePoolClient, _pool_address, _pool_authkey
+
+    print("=" * 60)
+    print("POOL: shared-memory inference pool throughput")
+    print("=" * 60)
+
+    _, X = load_dataset_inputs()
+    batch = np.resize(X, (32, X.shape[1]))
+    print(f"CPUs: {os.cpu_count()}  Clients: {clients}  Requests per client: {requests}  Batch: {len(batch)}\n")
+    print(f"  {'workers':>8s} {'batches/s':>10s} {'messages/s':>11s} {'shared (bytes)':>15s}")
+
+    for workers in worker_counts:
+        server = subprocess.Popen(
+            [sys.executable, '-m', 'service.inference_pool', '--workers', str(workers)],
+            stdout=subprocess.DEVNULL
+        )
+        try:
+            client = InferencePoolClient(_pool_address(), _pool_authkey(), timeout=30.0)
+            for _ in range(100):
+                try:
+                    client(batch)
+                    break
+                except (ConnectionError, OSError):
+                    time.sleep(0.1)
+
+            def run():
+                for _ in range(requests):
+                    client(batch)
+
+            threads = [threading.Thread(target=run) for _ in range(clients)]
+            start = time.perf_counter()
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            elapsed = time.perf_counter() - start
+            stats = client.get_stats()
+            client.close()
+
+            total = clients * requests
+            print(f"  {workers:8d} {total / elapsed:10.1f} {total * len(batch) / elapsed:11.0f} "
+                  f"{stats['shared_bytes']:15d}")
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait()
+
+
+def run_load(num_patterns, num_intents):
+    """Peak memory, queries and time of training-data loading: per-intent lists + Keras vs streaming."""
+    import os
+    import random
+    import tempfile
+    import tracemalloc
+    from sqlalchemy import create_engine, event
+    from sqlalchemy.orm import sessionmaker
+    from config.database import Base
+    from schema.models import Intent, Pattern
+    from service.intent_service import IntentService
+    from utils.training_data import TrainingSetBuilder
+
+    print("=" * 60)
+    print("LOAD: per-intent lists + Keras Tokenizer vs streaming loader")
+    print("=" * 60)
+
+    with open(DATASET_PATH, encoding='utf-8') as f:
+        data = json.load(f)
+    words = sorted({w for intent in data['intents'] for p in intent['patterns'] for w in preprocess_text(p).split()})
+    rng = random.Random(42)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'load.db')}")
+        Base.metadata.create_all(bind=engine)
+        statements = []
+        event.listen(engine, "before_cursor_execute", lambda conn, cursor, statement, *rest: statements.append(statement))
+        Session = sessionmaker(bind=engine)
+
+        with engine.begin() as conn:
+            conn.execute(Intent.__table__.insert(), [{"tag": f"intent_{i}"} for i in range(num_intents)])
+            conn.execute(Pattern.__table__.insert(), [
+                {
+                    "intent_id": rng.randint(1, num_intents),
+                    "pattern_text": " ".join(rng.choices(words, k=rng.randint(2, 12))).capitalize() + "?",
+                    "pattern_hash": ""
+                }
+                for _ in range(num_patterns)
+            ])
+        print(f"Patterns: {num_patterns}  Intents: {num_intents}  Vocabulary: {len(words)} words\n")
+
+        def lists_and_keras():
+            from tensorflow.keras.preprocessing.text import Tokenizer
+            from tensorflow.keras.preprocessing.sequence import pad_sequences as keras_pad
+            from sklearn.preprocessing import LabelEncoder
+            db = Session()
+            sentences, labels = [], []
+            for intent in db.query(Intent).all():  # The original loader: one extra query per intent
+                for pattern in intent.patterns:
+                    sentences.append(pattern.pattern_text)
+                    labels.append(intent.tag)
+            db.close()
+            sentences = preprocess_batch(sentences)
+            tokenizer = Tokenizer()
+            tokenizer.fit_on_texts(sentences)
+            X = keras_pad(tokenizer.texts_to_sequences(sentences), maxlen=MAX_SEQUENCE_LENGTH)
+            encoder = LabelEncoder()
+            return tokenizer, encoder, X, np.array(encoder.fit_transform(labels))
+
+        def streaming():
+            db = Session()
+            builder = TrainingSetBuilder(MAX_SEQUENCE_LENGTH)
+            for sentences, labels in IntentService(db).iter_training_chunks():
+                builder.add(preprocess_batch(sentences), labels)
+            db.close()
+            return builder.build()
+
+        import tensorflow  # noqa: F401  Imported up front so it is not measured
+        results = {}
+        print(f"  {'loader':22s} {'queries':>8s} {'time (ms)':>10s} {'peak (MB)':>10s}")
+        for name, fn in [("lists + keras", lists_and_keras), ("streaming", streaming)]:
+            statements.clear()
+            tracemalloc.start()
+            start = time.perf_counter()
+            results[name] = fn()
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"  {name:22s} {len(statements):8d} {elapsed * 1000:10.1f} {peak / 2**20:10.1f}")
+
+    def rows(result):
+        # Row order differs between loaders; compare the decoded (words, tag) multisets
+        tokenizer, encoder, X, y = result
+        return sorted(
+            (tuple(tokenizer.index_word[i] for i in row if i), encoder.classes_[label])
+            for row, label in zip(X.tolist(), y)
+        )
+
+    identical = rows(results["lists + keras"]) == rows(results["streaming"])
+    print(f"\n  Output identical: {'OK' if identical else 'FAIL'}")
+    return identical
+
+
+def run_bucketing(iterations, epochs):
+    """Inference and training throughput with full padding vs batches trimmed to their longest row."""
+    from tensorflow.keras.models import load_model
+    from tensorflow.keras.callbacks import Callback
+    from config.settings import get_settings
+    from service.training_service import TrainingService
+    from utils.compiled_predict import CompiledPredictor
+    from utils.length_buckets import sequence_lengths, length_bucketed_batches, bucketed_dataset
+
+    settings = get_settings()
+
+    print("=" * 60)
+    print("BUCKETING: full padding vs length-bucketed batches")
+    print("=" * 60)
+
+    with open(DATASET_PATH, encoding='utf-8') as f:
+        data = json.load(f)
+    tags = [intent['tag'] for intent in data['intents'] for _ in intent['patterns']]
+    y = pickle.load(open(ENCODER_PATH, 'rb')).transform(tags)
+    sentences, X = load_dataset_inputs()
+    lengths = sequence_lengths(X)
+    print(f"Samples: {len(sentences)}  Mean length: {lengths.mean():.1f} of {X.shape[1]} timesteps "
+          f"({(1 - lengths.mean() / X.shape[1]) * 100:.0f}% padding)\n")
+
+    keras_model = load_model(MODEL_PATH)
+    numpy_model = NumpyLSTM.from_h5(MODEL_PATH)
+    if not numpy_model.mask_zero:
+        print("  Model does not mask padding; retrain it to use length bucketing")
+        return False
+    buckets = settings.INFERENCE_BATCH_BUCKETS
+    engines = {
+        "numpy": (lambda b: numpy_model.predict(b, trim=False), numpy_model.predict),
+        "compiled": (CompiledPredictor(keras_model, X.shape[1], buckets),
+                     CompiledPredictor(keras_model, X.shape[1], buckets, trim=True)),
+    }
+
+    # ========== INFERENCE ==========
+    ok = True
+    rng = np.random.default_rng(0)
+    print(f"  {'inference':22s} {'padded (rows/s)':>16s} {'trimmed (rows/s)':>17s} {'speedup':>8s} {'max |diff|':>11s}")
+    for name, (padded, trimmed) in engines.items():
+        # Parity on batches of similar length, where trimming removes the most columns
+        expected = padded(X)
+        max_diff = max(
+            float(np.max(np.abs(trimmed(X[rows]) - expected[rows])))
+            for rows in length_bucketed_batches(lengths, 8)
+        )
+        ok = ok and max_diff <= 1e-5
+        for batch_size in (1, settings.INFERENCE_BATCH_MAX_SIZE):
+            # Random rows, as concurrent requests reach the micro-batcher
+            batches = [X[rng.integers(0, len(X), batch_size)] for _ in range(max(1, iterations // batch_size))]
+            rates = []
+            for predict in (padded, trimmed):
+                start = time.perf_counter()
+                for batch in batches:
+                    predict(batch)
+                rates.append(len(batches) * batch_size / (time.perf_counter() - start))
+            print(f"  {name + f' (batch {batch_size})':22s} {rates[0]:16.0f} {rates[1]:17.0f} "
+                  f"{rates[1] / rates[0]:7.2f}x {max_diff:11.1e}")
+
+    # ========== TRAINING ==========
+    class EpochTimer(Callback):
+        def on_train_begin(self, logs=None):
+            self.times = []
+
+        def on_epoch_begin(self, epoch, logs=None):
+            self.start = time.perf_counter()
+
+        def on_epoch_end(self, epoch, logs=None):
+            self.times.append(time.perf_counter() - self.start)
+
+    service = TrainingService(db=None)
+    y = np.asarray(y, dtype=np.int64)
+    print(f"\n  {'training':22s} {'epoch (ms)':>10s}  (mean of {max(1, epochs - 1)} epochs after the first)")
+    epoch_ms = {}
+    for name in ("padded", "bucketed"):
+        model = service._build_model(len(numpy_model.embeddings), len(np.unique(y)), X.shape[1])
+        model.compile(loss='sparse_categorical_crossentropy', optimizer='adam', metrics=['accuracy'])
+        timer = EpochTimer()
+        if name == "bucketed":
+            model.fit(bucketed_dataset(X, y, settings.BATCH_SIZE, shuffle=True),
+                      epochs=epochs, shuffle=False, callbacks=[timer], verbose=0)
+        else:
+            model.fit(X, y, batch_size=settings.BATCH_SIZE, epochs=epochs, callbacks=[timer], verbose=0)
+        epoch_ms[name] = np.mean(timer.times[1:] or timer.times) * 1000.0
+        print(f"  {name:22s} {epoch_ms[name]:10.1f}")
+    print(f"  {'speedup':22s} {epoch_ms['padded'] / epoch_ms['bucketed']:9.2f}x")
+
+    print(f"\n  Trimmed output identical: {'OK' if ok else 'FAIL'}")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='LSTM Chatbot inference checks and benchmarks')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    parity_parser = subparsers.add_parser('parity', help='Check NumPy engine outputs against Keras')
+    parity_parser.add_argument('--tolerance', type=float, default=1e-5, help='Max absolute difference (default: 1e-5)')
+
+    latency_parser = subparsers.add_parser('latency', help='Compare predict_intent latency across backends')
+    latency_parser.add_argument('--backends', nargs='+', default=['keras', 'compiled', 'numpy'],
+                                choices=['keras', 'compiled', 'numpy'], help='Backends to compare')
+    latency_parser.add_argument('--iterations', type=int, default=500, help='Calls per backend (default: 500)')
+
+    tokenize_parser = subparsers.add_parser('tokenize', help='Compare Keras Tokenizer and VocabEncoder')
+    tokenize_parser.add_argument('--iterations', type=int, default=200, help='Batches to encode (default: 200)')
+
+    preprocess_parser = subparsers.add_parser('preprocess', help='Compare per-item and batch text preprocessing')
+    preprocess_parser.add_argument('--texts', type=int, default=200000, help='Synthetic corpus size (default: 200000)')
+    preprocess_parser.add_argument('--workers', type=int, default=4, help='Processes for the parallel run (default: 4)')
+
+    cascade_parser = subparsers.add_parser('cascade', help='Measure cascade coverage and cost')
+    cascade_parser.add_argument('--iterations', type=int, default=2000, help='Single-message calls (default: 2000)')
+
+    pool_parser = subparsers.add_parser('pool', help='Measure inference pool throughput')
+    pool_parser.add_argument('--workers', nargs='+', type=int, default=[1, 2, 4], help='Worker counts to compare')
+    pool_parser.add_argument('--clients', type=int, default=8, help='Concurrent client threads (default: 8)')
+    pool_parser.add_argument('--requests', type=int, default=200, help='Batches per client (default: 200)')
+
+    load_parser = subparsers.add_parser('load', help='Compare training-data loaders (memory, queries, time)')
+    load_parser.add_argument('--patterns', type=int, default=200000, help='Synthetic patterns (default: 200000)')
+    load_parser.add_argument('--intents', type=int, default=50, help='Synthetic intents (default: 50)')
+
+    bucketing_parser = subparsers.add_parser('bucketing', help='Compare full padding with length-bucketed batches')
+    bucketing_parser.add_argument('--iterations', type=int, default=2000, help='Rows per inference measurement (default: 2000)')
+    bucketing_parser.add_argument('--epochs', type=int, default=5, help='Training epochs per variant (default: 5)')
+
+    args = parser.parse_args()
+
+    if args.command == 'parity':
+        sys.exit(0 if run_parity(args.tolerance) else 1)
+    elif args.command == 'latency':
+        run_latency(args.backends, args.iterations)
+    elif args.command == 'tokenize':
+        sys.exit(0 if run_tokenize(args.iterations) else 1)
+    elif args.command == 'preprocess':
+        sys.exit(0 if run_preprocess(args.texts, args.workers) else 1)
+    elif args.command == 'cascade':
+        run_cascade(args.iterations)
+    elif args.command == 'pool':
+        run_pool(args.workers, args.clients, args.requests)
+    elif args.command == 'load':
+        sys.exit(0 if run_load(args.patterns, args.intents) else 1)
+    elif args.command == 'bucketing':
+        sys.exit(0 if run_bucketing(args.iterations, args.epochs) else 1)
@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Dict, List
 
 
 class Settings(BaseSettings):
@@ -16,14 +17,88 @@ class Settings(BaseSettings):
     MODEL_PATH: str = "model/lstm_model.h5"
     TOKENIZER_PATH: str = "model/tokenizer.pkl"
     ENCODER_PATH: str = "model/label_encoder.pkl"
+    WEIGHTS_PATH: str = "model/lstm_weights.npz"  # NumPy weight bundle exported at training time
+    VOCAB_PATH: str = "model/vocab.txt"  # Compact tokenizer vocabulary exported at training time
+    FAST_MODEL_PATH: str = "model/fast_classifier.npz"  # TF-IDF linear model, first cascade stage
+    MODEL_VERSION_PATH: str = "model/version.json"  # Written last by training; workers poll it to hot-reload
+    MODEL_VERSION_POLL_SECONDS: float = 5.0  # 0 = off
     DATASET_PATH: str = "dataset/intents.json"
     MAX_SEQUENCE_LENGTH: int = 20
-    
+    LENGTH_BUCKETING_ENABLED: bool = True  # Pad training/inference batches only to their longest sequence (masked models)
+    PREPROCESS_WORKERS: int = 1  # Processes for preprocessing very large training corpora (1 = in-process)
+
+    # Inference settings
+    INFERENCE_BACKEND: str = "keras"  # "keras" (model.predict), "compiled" (tf.function), "numpy" (no TensorFlow) or "pool"
+    INFERENCE_BATCH_BUCKETS: List[int] = [1, 8, 32, 128]  # Padded batch sizes for the compiled backend
+    INFERENCE_BATCHING_ENABLED: bool = True
+    INFERENCE_BATCH_MAX_SIZE: int = 32  # Max messages per forward pass
+    INFERENCE_BATCH_MAX_WAIT_MS: float = 5.0  # Max time a message waits for a batch to fill
+    INFERENCE_EXECUTOR_WORKERS: int = 32  # Threads for async chat inference (>= batch size so batches can fill)
+    INFERENCE_POOL_HOST: str = "127.0.0.1"  # Inference pool server (python -m service.inference_pool)
+    INFERENCE_POOL_PORT: int = 6011
+    INFERENCE_POOL_AUTHKEY: str = ""  # Required by the pool backend; set it in the environment (or .env), never a shared default
+    INFERENCE_POOL_WORKERS: int = 0  # Worker processes (0 = one per CPU core)
+    INFERENCE_POOL_TIMEOUT_SECONDS: float = 10.0
+    CASCADE_ENABLED: bool = True  # Fast linear model answers confident cases, LSTM only the rest
+    CASCADE_MIN_THRESHOLD: float = 0.5  # Lower bound for the threshold calibrated at training time
+    BATCH_CLASSIFY_MAX_MESSAGES: int = 10000  # Per POST /api/chat/batch request
+    BATCH_CLASSIFY_CHUNK_SIZE: int = 512  # Rows per forward pass for batch classification
+    PREDICTION_CACHE_ENABLED: bool = True
+    PREDICTION_CACHE_MAX_SIZE: int = 10000  # Entries keyed on preprocessed message text
+    PREDICTION_CACHE_TTL_SECONDS: float = 3600.0
+    INTENT_CACHE_REFRESH_SECONDS: float = 30.0  # Version check for intent edits made by other workers (0 = off)
+
+    # Chat log settings (write-behind buffer)
+    CHAT_LOG_WRITE_BEHIND: bool = True
+    CHAT_LOG_FLUSH_INTERVAL_MS: float = 200.0  # Flush at least this often
+    CHAT_LOG_FLUSH_BATCH_SIZE: int = 100  # ...or as soon as this many records are buffered
+    CHAT_LOG_QUEUE_MAX_SIZE: int = 10000
+    CHAT_LOG_ENQUEUE_TIMEOUT_MS: float = 50.0  # Wait for space before writing inline (backpressure)
+    CHAT_LOG_WRITE_RETRIES: int = 3  # Failed batches go back to the queue this often before rows are written one by one
+    CHAT_LOG_RETRY_BACKOFF_MS: float = 200.0  # Doubles with every retry
+
     # Training hyperparameters
     BATCH_SIZE: int = 8
     VALIDATION_SPLIT: float = 0.15  # 15% for validation
     TEST_SPLIT: float = 0.15  # 15% for testing
     
+    # Training job settings (jobs run one at a time, off the request path)
+    TRAINING_JOB_HISTORY_SIZE: int = 50  # Finished jobs kept (memory and training_jobs table) for status queries
+    TRAINING_JOB_POLL_SECONDS: float = 1.0  # Job heartbeat and check for cancel requests made through other API processes
+    TRAINING_JOB_STALE_SECONDS: float = 60.0  # Unfinished job without a heartbeat this long: its process stopped
+    TRAINING_LOCK_PATH: str = "model/.training.lock"  # Serializes artifact writes across API processes
+    TRAINING_IN_SUBPROCESS: bool = True  # Train in a child process so the API never holds TensorFlow training memory
+    TRAINING_CPU_THREADS: int = 1  # Intra/inter-op threads for the training process (0 = TensorFlow default)
+    TRAINING_MEMORY_LIMIT_MB: int = 4096  # Address-space cap for the training process (0 = unlimited, POSIX only)
+    TRAINING_TIMEOUT_SECONDS: float = 3600.0  # Wall-clock limit per training run (0 = none)
+    TRAINING_PROCESS_NICE: int = 10  # Scheduling priority decrease, so chat inference wins the CPU
+    TRAINING_CACHE_DIR: str = "model/cache"  # Prepared (preprocessed, tokenized, split) arrays per data fingerprint
+    TRAINING_CACHE_MAX_ENTRIES: int = 8
+    TRAINING_LOAD_CHUNK_SIZE: int = 10000  # Patterns per chunk streamed from the database
+    
+    # Incremental training (warm start from the current model)
+    INCREMENTAL_MAX_EPOCHS: int = 40  # Cap on fine-tuning epochs, whatever the request asks for
+    INCREMENTAL_LEARNING_RATE: float = 0.001
+    INCREMENTAL_REPLAY_RATIO: float = 4.0  # Replayed known samples per new sample, so old intents are not forgotten
+    INCREMENTAL_REPLAY_MIN: int = 64
+    
+    # Hyperparameter search (trials run in parallel processes over a shared, memory-mapped dataset)
+    MODEL_CONFIG_PATH: str = "model/model_config.json"  # Architecture promoted by the last search (default if missing)
+    SEARCH_SPACE: Dict[str, List[float]] = {
+        "embedding_dim": [16, 32, 64],
+        "lstm_units": [16, 32, 64],
+        "dense_units": [16, 32],
+        "dropout": [0.2, 0.3],
+        "dense_dropout": [0.2],
+        "batch_size": [8, 32]
+    }
+    SEARCH_MAX_TRIALS: int = 12  # Whole grid if smaller, otherwise a random sample of it
+    SEARCH_WORKERS: int = 0  # Trial processes (0 = one per CPU core)
+    SEARCH_OBJECTIVE: str = "accuracy"  # "accuracy" (best validation accuracy) or "latency" (fastest within tolerance)
+    SEARCH_ACCURACY_TOLERANCE: float = 0.01  # "latency": allowed validation accuracy loss versus the best trial
+    SEARCH_LATENCY_SAMPLES: int = 200  # Single-message predictions timed per trial
+    SEARCH_TIMEOUT_SECONDS: float = 14400.0  # Wall-clock limit per search, promotion included (0 = none)
+    
     # API settings
     API_PREFIX: str = "/api"
     DEBUG: bool = True
@@ -3,7 +3,12 @@ from sqlalchemy.orm import Session
 
 from service.chat_service import ChatService
 from service.intent_service import IntentService
-from schemas.chat import ChatRequest, ChatResponse, ChatHistoryResponse, ChatLogResponse, AssignIntentRequest
+from service.inference_executor import run_in_inference_executor
+from schemas.chat import (
+    ChatRequest, ChatResponse, ChatHistoryResponse, ChatLogResponse, AssignIntentRequest,
+    BatchChatRequest, BatchChatResponse, BatchChatItem
+)
+from service.chat_log_writer import chat_log_writer
 
 
 class ChatController:
@@ -40,6 +45,53 @@ class ChatController:
             confidence=confidence
         )
     
+    @staticmethod
+    async def process_chat_async(chat_request: ChatRequest) -> ChatResponse:
+        """
+        Process a chat message without blocking the event loop.
+        - Inference runs on the dedicated inference executor
+        - Replies come from the in-memory response table
+        - The chat log is buffered by the write-behind logger
+        """
+        response, intent, confidence = await run_in_inference_executor(
+            lambda: ChatService().chat(chat_request.message)
+        )
+        
+        return ChatResponse(
+            reply=response,
+            intent=intent,
+            confidence=confidence
+        )
+    
+    @staticmethod
+    async def process_batch_async(batch_request: BatchChatRequest) -> BatchChatResponse:
+        """
+        Classify a list of messages in bulk.
+        - Runs vectorized on the inference executor
+        - Optionally logs every message through the write-behind logger
+        """
+        def classify():
+            results = ChatService().classify_batch(batch_request.messages, top_k=batch_request.top_k)
+            if batch_request.log:
+                for message, result in zip(batch_request.messages, results):
+                    chat_log_writer.enqueue(
+                        user_message=message,
+                        bot_response=result["reply"],
+                        intent_tag=result["intent"],
+                        confidence=result["confidence"]
+                    )
+            return results
+        
+        results = await run_in_inference_executor(classify)
+        
+        return BatchChatResponse(
+            total=len(results),
+            results=[
+                BatchChatItem(message=message, **result)
+                for message, result in zip(batch_request.messages, results)
+            ]
+        )
+    
     def get_chat_history(self, limit: int = 100, offset: int = 0) -> ChatHistoryResponse:
         """Get chat history with pagination."""
         logs, total = self.chat_service.get_chat_history(limit=limit, offset=offset)
@@ -72,3 +124,7 @@ class ChatController:
             }
             for log in logs
         ]
+
+    def get_inference_stats(self) -> dict:
+        """Get chat pipeline statistics (inference, caches, chat log buffer)."""
+        return self.chat_service.get_inference_stats()
@@ -68,24 +68,36 @@ class IntentController:
         except FileNotFoundError as e:
             raise HTTPException(status_code=404, detail=str(e))
     
-    def retrain_model(self, epochs: int = 100, split_ratio: str = "70:30") -> dict:
-        """Retrain the LSTM model with proper train-validation-test split."""
-        # Reload chat service model after training
-        from service.chat_service import ChatService
+    def retrain_model(
+        self,
+        epochs: int = 100,
+        split_ratio: str = "70:30",
+        force: bool = False,
+        incremental: bool = False,
+        wait: bool = False
+    ) -> dict:
+        """
+        Retrain the LSTM model with proper train-validation-test split.
+        Runs as a background training job (one at a time), which reloads
+        the model when it succeeds. Returns the queued job, or with wait
+        the training result once the job finishes.
+        """
+        from service.training_jobs import training_jobs, SUCCEEDED
         
-        success, message, metrics = self.training_service.train_model(
-            epochs=epochs, 
-            split_ratio=split_ratio
-        )
-        if not success:
-            raise HTTPException(status_code=400, detail=message)
+        job = training_jobs.submit(epochs=epochs, split_ratio=split_ratio, force=force, incremental=incremental)
+        if not wait:
+            return job.to_dict(include_progress=False)
+        job.wait()
+        if job.status != SUCCEEDED:
+            raise HTTPException(status_code=400, detail=job.message)
         
-        # Reload the model in chat service
-        ChatService.reload_model()
+        message, metrics = job.message, job.metrics
         
         return {
             "message": message,
+            "job_id": job.id,
             "training_id": metrics.get("training_id"),
+            "skipped": bool(metrics.get("skipped")),
             "metrics": {
                 "total_samples": metrics.get("total_samples"),
                 "train_samples": metrics.get("train_samples"),
@@ -93,6 +105,7 @@ class IntentController:
                 "test_samples": metrics.get("test_samples"),
                 "epochs_run": metrics.get("epochs_run"),
                 "split_ratio": metrics.get("split_ratio"),
+                "training_mode": metrics.get("training_mode"),
                 "train_accuracy": round(metrics.get("train_accuracy", 0) * 100, 2),
                 "val_accuracy": round(metrics.get("val_accuracy", 0) * 100, 2),
                 "test_accuracy": round(metrics.get("test_accuracy", 0) * 100, 2),
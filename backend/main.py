@@ -1,4 +1,4 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
@@ -32,9 +32,32 @@ async def lifespan(app: FastAPI):
     finally:
         db.close()
     
+    # Keep in-memory intent data in sync with edits from other workers
+    from service.intent_cache import start_intent_cache_refresher, stop_intent_cache_refresher
+    start_intent_cache_refresher(settings.INTENT_CACHE_REFRESH_SECONDS)
+    
+    # Load and warm up the model in the background; /ready reports when it is done
+    from service.chat_service import ChatService
+    ChatService.start_background_load()
+    
+    # Hot-load models retrained by any worker (version file written last by training)
+    ChatService.start_version_watcher(settings.MODEL_VERSION_POLL_SECONDS)
+    
+    # Start buffered chat logging
+    from service.chat_log_writer import chat_log_writer
+    chat_log_writer.start()
+    
     yield
     # Shutdown
     print("Application shutting down...")
+    stop_intent_cache_refresher()
+    ChatService.stop_version_watcher()
+    
+    # Let in-flight chat inference finish, then flush buffered chat logs
+    from service.inference_executor import shutdown_inference_executor
+    shutdown_inference_executor()
+    chat_log_writer.stop()
+    print("Chat log buffer flushed.")
 
 
 # Create FastAPI application
@@ -74,10 +97,74 @@ def root():
 
 @app.get("/health")
 def health_check():
-    """Health check endpoint."""
+    """Health check endpoint (liveness)."""
     return {"status": "healthy"}
 
 
+@app.get("/ready")
+def readiness_check(response: Response):
+    """
+    Readiness endpoint for load balancers.
+    Returns 503 until the model is loaded and warmed up, then reports the
+    model version this worker serves (and the latest on disk), load time
+    and warmup latency.
+    """
+    from service.chat_service import ChatService
+    readiness = ChatService.get_readiness()
+    if not readiness["ready"]:
+        response.status_code = 503
+    return readiness
+
+
+def profile_imports(top: int = 15):
+    """Print an import-time breakdown of the API module (python -X importtime)."""
+    import os
+    import re
+    import subprocess
+    import sys
+    from collections import defaultdict
+    
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        capture_output=True,
+        text=True,
+        cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    
+    # Lines look like: "import time:   self_us |   cumulative_us | <indent>module"
+    rows = []
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)", line)
+        if match:
+            rows.append((int(match[1]), int(match[2]), len(match[3]), match[4]))
+    
+    total_us = sum(cumulative for _, cumulative, indent, _ in rows if indent == 1)
+    by_package = defaultdict(int)
+    for self_us, _, _, name in rows:
+        by_package[name.split(".")[0]] += self_us
+    direct = [(cumulative, name) for _, cumulative, indent, name in rows if indent == 3]
+    
+    print("=" * 60)
+    print(f"STARTUP IMPORT PROFILE (total {total_us / 1000:.1f} ms)")
+    print("=" * 60)
+    print("Top packages by self time:")
+    for name, self_us in sorted(by_package.items(), key=lambda item: -item[1])[:top]:
+        print(f"  {self_us / 1000:9.1f} ms  {name}")
+    print("\nDirect imports of main by cumulative time:")
+    for cumulative, name in sorted(direct, reverse=True)[:top]:
+        print(f"  {cumulative / 1000:9.1f} ms  {name}")
+
+
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Chatbot PMB API server")
+    parser.add_argument("--profile-imports", action="store_true", help="Print an import-time breakdown and exit")
+    parser.add_argument("--top", type=int, default=15, help="Rows to show in the import profile (default: 15)")
+    args = parser.parse_args()
+    
+    if args.profile_imports:
+        profile_imports(args.top)
+    else:
+        import uvicorn
+        uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
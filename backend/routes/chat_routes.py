@@ -1,25 +1,61 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, HTTPException
 from sqlalchemy.orm import Session
 
 from config.database import get_db
 from controller.chat_controller import ChatController
-from schemas.chat import ChatRequest, ChatResponse, ChatHistoryResponse, AssignIntentRequest
+from schemas.chat import ChatRequest, ChatResponse, ChatHistoryResponse, AssignIntentRequest, BatchChatRequest, BatchChatResponse
+from config.settings import get_settings
+
+
+settings = get_settings()
 
 
 router = APIRouter(prefix="/chat", tags=["Chat"])
 
 
 @router.post("/", response_model=ChatResponse)
-def chat(chat_request: ChatRequest, db: Session = Depends(get_db)):
+async def chat(chat_request: ChatRequest):
     """
     Send a message and receive a chatbot response.
     
     - The message is processed by the LSTM model to detect intent
-    - The response is fetched from the database based on detected intent
-    - The conversation is automatically logged to the database
+    - The response is served from the in-memory intent response table
+    - The conversation is automatically logged to the database (buffered)
+    - Inference runs on a dedicated executor, not the default threadpool
+    """
+    return await ChatController.process_chat_async(chat_request)
+
+
+@router.post("/batch", response_model=BatchChatResponse)
+async def chat_batch(batch_request: BatchChatRequest):
+    """
+    Classify many messages in one request (imports, FAQ lists, regression sets).
+    
+    - **messages**: List of messages to classify
+    - **top_k**: Optionally return the k most likely intents per message
+    - **log**: Save the messages to chat logs (default: false)
+    - Messages are preprocessed, tokenized and classified in vectorized batches
+    """
+    if len(batch_request.messages) > settings.BATCH_CLASSIFY_MAX_MESSAGES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Maximum {settings.BATCH_CLASSIFY_MAX_MESSAGES} messages per request"
+        )
+    return await ChatController.process_batch_async(batch_request)
+
+
+@router.get("/stats")
+def get_inference_stats(db: Session = Depends(get_db)):
+    """
+    Get chat pipeline statistics.
+    
+    - Current and peak queue depth of the batching scheduler
+    - Number of batches run and the batch-size distribution
+    - Prediction cache hits, misses and evictions
+    - Chat log write-behind buffer depth and write counters
     """
     controller = ChatController(db)
-    return controller.process_chat(chat_request)
+    return controller.get_inference_stats()
 
 
 @router.get("/history", response_model=ChatHistoryResponse)
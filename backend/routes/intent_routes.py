@@ -1,5 +1,5 @@
 from typing import List
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Response
 from sqlalchemy.orm import Session
 
 from config.database import get_db
@@ -73,10 +73,14 @@ def sync_from_json(db: Session = Depends(get_db)):
     return controller.sync_from_json()
 
 
-@router.post("/retrain")
+@router.post("/retrain", status_code=202)
 def retrain_model(
+    response: Response,
     epochs: int = Query(default=100, ge=10, le=500, description="Number of training epochs"),
     split_ratio: str = Query(default="70:30", regex="^(70:30|80:20)$", description="Train:Test split ratio"),
+    force: bool = Query(default=False, description="Retrain even if intents and parameters are unchanged"),
+    incremental: bool = Query(default=False, description="Fine-tune the current model instead of training from scratch"),
+    wait: bool = Query(default=False, description="Block until training finishes (CLI/scripts only)"),
     db: Session = Depends(get_db)
 ):
     """
@@ -84,12 +88,22 @@ def retrain_model(
     
     - **epochs**: Number of training epochs (10-500)
     - **split_ratio**: Data split ratio - "70:30" or "80:20"
+    - **force**: Retrain even if nothing changed since the served model
+    - **incremental**: Fine-tune the current model on new data instead of training from scratch
     - Training uses all intents and patterns in the database
     - After training, the new model is automatically loaded
     - Training history is saved to database
+    - Queues a training job and returns it at once (202); follow it at
+      /training/jobs/{job_id} or its /events stream
+    - **wait**: hold the request until the job finishes and return its
+      result (200); proxies may time out long trainings
     """
     controller = IntentController(db)
-    return controller.retrain_model(epochs=epochs, split_ratio=split_ratio)
+    if wait:
+        response.status_code = 200
+    return controller.retrain_model(
+        epochs=epochs, split_ratio=split_ratio, force=force, incremental=incremental, wait=wait
+    )
 
 
 @router.post("/export")
@@ -1,9 +1,13 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+import json
+import asyncio
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from config.database import get_db
 from service.training_service import TrainingService
+from service.training_jobs import training_jobs, TrainingJob
 
 
 router = APIRouter(prefix="/training", tags=["Training"])
@@ -22,6 +26,7 @@ def get_all_training_history(db: Session = Depends(get_db)):
         {
             "id": r.id,
             "trained_at": r.trained_at.isoformat() if r.trained_at else None,
+            "model_version": r.model_version,
             "split_ratio": r.split_ratio,
             "epochs_run": r.epochs_run,
             "total_samples": r.total_samples,
@@ -60,3 +65,145 @@ def delete_training_history(history_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail=f"Training history {history_id} not found")
     
     return {"message": f"Training history {history_id} deleted successfully"}
+
+
+# ==================== TRAINING JOBS ====================
+
+def _get_job(job_id: str) -> TrainingJob:
+    job = training_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Training job {job_id} not found")
+    return job
+
+
+@router.post("/jobs", status_code=202)
+def submit_training_job(
+    epochs: int = Query(default=100, ge=10, le=500, description="Number of training epochs"),
+    split_ratio: str = Query(default="70:30", regex="^(70:30|80:20)$", description="Train:Test split ratio"),
+    force: bool = Query(default=False, description="Retrain even if intents and parameters are unchanged"),
+    incremental: bool = Query(default=False, description="Fine-tune the current model instead of training from scratch")
+):
+    """
+    Queue a retrain and return its job id immediately.
+    Jobs run one at a time; poll /training/jobs/{job_id} or stream
+    /training/jobs/{job_id}/events for per-epoch progress.
+    If intents and parameters match the served model, the job finishes
+    at once with that model's training record (skipped = true).
+    With incremental, the current model is fine-tuned on new data (seconds
+    after small intent edits) instead of trained from scratch.
+    """
+    job = training_jobs.submit(epochs=epochs, split_ratio=split_ratio, force=force, incremental=incremental)
+    return job.to_dict(include_progress=False)
+
+
+@router.get("/jobs")
+def get_training_jobs():
+    """
+    Get recent training jobs (newest first) without per-epoch detail.
+    """
+    return [job.to_dict(include_progress=False) for job in training_jobs.list_jobs()]
+
+
+@router.get("/jobs/{job_id}")
+def get_training_job(job_id: str):
+    """
+    Get a training job's status, per-epoch loss/accuracy and, once it
+    succeeded, the id of its training history record.
+    """
+    return _get_job(job_id).to_dict()
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_training_job(job_id: str):
+    """
+    Server-Sent Events stream of a training job.
+    Emits a `progress` event per finished epoch and a `status` event on
+    every state change; the stream ends when the job finishes. Works from
+    any API process, whichever one runs the job.
+    """
+    job = await asyncio.to_thread(_get_job, job_id)
+    
+    async def events():
+        nonlocal job
+        sent = 0
+        status = None
+        idle = 0
+        while True:
+            if not training_jobs.is_local(job_id):
+                # Run by another API process: re-read its snapshot from the database
+                job = await asyncio.to_thread(training_jobs.get, job_id) or job
+            finished = job.is_finished  # Read first: no progress can follow a finished state
+            progress = job.progress
+            sending = sent < len(progress) or job.status != status
+            while sent < len(progress):
+                yield f"event: progress\ndata: {json.dumps(progress[sent])}\n\n"
+                sent += 1
+            if job.status != status:
+                status = job.status
+                yield f"event: status\ndata: {json.dumps(job.to_dict(include_progress=False))}\n\n"
+            if finished:
+                break
+            idle = 0 if sending else idle + 1
+            if idle >= 30:
+                idle = 0
+                yield ": keepalive\n\n"
+            await asyncio.sleep(0.5)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post("/jobs/{job_id}/cancel")
+def cancel_training_job(job_id: str):
+    """
+    Cancel a training job. A queued job never starts; a running job stops
+    after the current batch and the served model is left unchanged.
+    """
+    job = _get_job(job_id)
+    if job.is_finished:
+        raise HTTPException(status_code=409, detail=f"Training job {job_id} already {job.status}")
+    job = training_jobs.cancel(job_id) or job
+    return job.to_dict(include_progress=False)
+
+
+# ==================== HYPERPARAMETER SEARCH ====================
+
+@router.post("/search", status_code=202)
+def submit_search_job(
+    epochs: int = Query(default=100, ge=10, le=500, description="Max epochs per trial (early stopping applies)"),
+    split_ratio: str = Query(default="70:30", regex="^(70:30|80:20)$", description="Train:Test split ratio"),
+    objective: Optional[str] = Query(
+        default=None, regex="^(accuracy|latency)$",
+        description="Best validation accuracy, or lowest latency within SEARCH_ACCURACY_TOLERANCE of it"
+    ),
+    max_trials: Optional[int] = Query(default=None, ge=1, le=200, description="Configurations to try"),
+    workers: Optional[int] = Query(default=None, ge=1, le=64, description="Parallel trial processes"),
+    promote: bool = Query(default=True, description="Train, serve and keep the best configuration")
+):
+    """
+    Queue a hyperparameter search over SEARCH_SPACE and return its job id.
+    Trials run in parallel processes; every finished trial appears in the
+    job's progress and in /training/search/{search_id}. With promote, the
+    best configuration is trained, served, and used by later retrains.
+    """
+    job = training_jobs.submit(
+        epochs=epochs,
+        split_ratio=split_ratio,
+        search={"objective": objective, "max_trials": max_trials, "workers": workers, "promote": promote}
+    )
+    return job.to_dict(include_progress=False)
+
+
+@router.get("/search/{search_id}")
+def get_search_trials(search_id: str, db: Session = Depends(get_db)):
+    """
+    Get every trial of a hyperparameter search: configuration, validation
+    accuracy, training time, inference latency and the promoted winner.
+    """
+    trials = TrainingService(db).get_search_trials(search_id)
+    if not trials:
+        raise HTTPException(status_code=404, detail=f"Search {search_id} not found")
+    return trials
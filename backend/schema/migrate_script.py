@@ -1,19 +1,85 @@
 from sqlalchemy import text
 from config.database import engine
+from utils.nlp_utils import text_hash
+
+BACKFILL_CHUNK_SIZE = 1000
+
+
+def add_column_if_missing(conn, table: str, column: str, definition: str):
+    """Add a column to a table unless it already exists."""
+    print(f"Checking if column '{column}' exists in '{table}'...")
+    result = conn.execute(
+        text("SELECT column_name FROM information_schema.columns WHERE table_name=:table AND column_name=:column"),
+        {"table": table, "column": column}
+    )
+    if result.fetchone():
+        print(f"Column '{column}' already exists.")
+    else:
+        print(f"Adding column '{column}' to '{table}'...")
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {definition}"))
+        conn.commit()
+        print("Column added successfully.")
+
+
+def backfill_hashes(conn, table: str, text_column: str, hash_column: str):
+    """Fill the normalized-text hash column for rows created before it existed."""
+    total = 0
+    while True:
+        rows = conn.execute(
+            text(f"SELECT id, {text_column} FROM {table} WHERE {hash_column} IS NULL ORDER BY id LIMIT :limit"),
+            {"limit": BACKFILL_CHUNK_SIZE}
+        ).fetchall()
+        if not rows:
+            break
+        conn.execute(
+            text(f"UPDATE {table} SET {hash_column} = :hash WHERE id = :id"),
+            [{"id": row_id, "hash": text_hash(value)} for row_id, value in rows]
+        )
+        conn.commit()
+        total += len(rows)
+    print(f"Backfilled {total} rows in '{table}.{hash_column}'.")
+
 
 def migrate():
     with engine.connect() as conn:
         try:
-            # Check if column exists
-            print("Checking if column 'is_new_data' exists...")
-            result = conn.execute(text("SELECT column_name FROM information_schema.columns WHERE table_name='chat_logs' AND column_name='is_new_data'"))
-            if result.fetchone():
-                print("Column 'is_new_data' already exists.")
-            else:
-                print("Adding column 'is_new_data' to 'chat_logs'...")
-                conn.execute(text("ALTER TABLE chat_logs ADD COLUMN is_new_data BOOLEAN DEFAULT TRUE"))
-                conn.commit()
-                print("Column added successfully.")
+            add_column_if_missing(conn, "chat_logs", "is_new_data", "BOOLEAN DEFAULT TRUE")
+
+            # Normalized-text hashes for duplicate detection
+            add_column_if_missing(conn, "patterns", "pattern_hash", "VARCHAR(40)")
+            add_column_if_missing(conn, "chat_logs", "message_hash", "VARCHAR(40)")
+            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_patterns_pattern_hash ON patterns (pattern_hash)"))
+            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_chat_logs_message_hash ON chat_logs (message_hash)"))
+            conn.commit()
+            backfill_hashes(conn, "patterns", "pattern_text", "pattern_hash")
+            backfill_hashes(conn, "chat_logs", "user_message", "message_hash")
+
+            # Cascade classifier metrics
+            for column in (
+                "cascade_threshold", "fast_test_accuracy", "fast_coverage",
+                "fast_stage_accuracy", "lstm_stage_accuracy", "cascade_test_accuracy"
+            ):
+                add_column_if_missing(conn, "training_history", column, "DOUBLE PRECISION")
+
+            # Model version stamped on the artifacts of each run
+            add_column_if_missing(conn, "training_history", "model_version", "VARCHAR(40)")
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_training_history_model_version ON training_history (model_version)"
+            ))
+            conn.commit()
+
+            # Training-data fingerprint, used to skip retrains of unchanged data
+            add_column_if_missing(conn, "training_history", "fingerprint", "VARCHAR(64)")
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_training_history_fingerprint ON training_history (fingerprint)"
+            ))
+            conn.commit()
+
+            # Full or incremental (warm start) training
+            add_column_if_missing(conn, "training_history", "training_mode", "VARCHAR(20)")
+
+            # Model architecture of each run (hyperparameter search); search_trials is created by create_tables
+            add_column_if_missing(conn, "training_history", "model_config", "TEXT")
         except Exception as e:
             print(f"Migration failed: {e}")
 
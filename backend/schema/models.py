@@ -2,6 +2,15 @@ from sqlalchemy import Column, Integer, String, Text, DateTime, Float, ForeignKe
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from config.database import Base
+from utils.nlp_utils import text_hash
+
+
+def _hash_of(column: str):
+    """Column default computing text_hash() of another column on the same row."""
+    def default(context):
+        value = context.get_current_parameters().get(column)
+        return text_hash(value) if value is not None else None
+    return default
 
 
 class Intent(Base):
@@ -28,6 +37,7 @@ class Pattern(Base):
     id = Column(Integer, primary_key=True, index=True)
     intent_id = Column(Integer, ForeignKey("intents.id", ondelete="CASCADE"), nullable=False)
     pattern_text = Column(Text, nullable=False)
+    pattern_hash = Column(String(40), nullable=True, index=True, default=_hash_of("pattern_text"))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationship
@@ -59,6 +69,7 @@ class ChatLog(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     user_message = Column(Text, nullable=False)
+    message_hash = Column(String(40), nullable=True, index=True, default=_hash_of("user_message"))
     bot_response = Column(Text, nullable=False)
     intent_tag = Column(String(100), nullable=True)
     confidence = Column(Float, nullable=True)
@@ -76,11 +87,16 @@ class TrainingHistory(Base):
     id = Column(Integer, primary_key=True, index=True)
     trained_at = Column(DateTime(timezone=True), server_default=func.now())
     
+    model_version = Column(String(40), nullable=True, index=True)  # Id written to model/version.json
+    fingerprint = Column(String(64), nullable=True, index=True)  # SHA-256 of intents + split + hyperparameters
+    training_mode = Column(String(20), nullable=True)  # "full" or "incremental" (warm start)
+    
     # Training configuration
     epochs_requested = Column(Integer, nullable=False)
     epochs_run = Column(Integer, nullable=False)
     split_ratio = Column(String(10), nullable=False)  # "70:30" or "80:20"
     batch_size = Column(Integer, nullable=False)
+    model_config = Column(Text, nullable=True)  # JSON architecture (embedding/LSTM/dense sizes, dropouts, batch size)
     
     # Sample counts
     total_samples = Column(Integer, nullable=False)
@@ -97,6 +113,14 @@ class TrainingHistory(Base):
     val_loss = Column(Float, nullable=False)
     test_loss = Column(Float, nullable=False)
     
+    # Cascade (fast linear model first, LSTM when unsure), measured on the test split
+    cascade_threshold = Column(Float, nullable=True)  # NULL = no safe threshold, LSTM answers everything
+    fast_test_accuracy = Column(Float, nullable=True)  # Fast model alone
+    fast_coverage = Column(Float, nullable=True)  # Share of messages answered by the fast model
+    fast_stage_accuracy = Column(Float, nullable=True)  # Accuracy on the messages it answered
+    lstm_stage_accuracy = Column(Float, nullable=True)  # LSTM accuracy on the remaining messages
+    cascade_test_accuracy = Column(Float, nullable=True)
+    
     # Confusion matrix & classification report (stored as JSON strings)
     confusion_matrix = Column(Text, nullable=True)  # JSON 2D array
     classification_report = Column(Text, nullable=True)  # JSON object
@@ -106,6 +130,50 @@ class TrainingHistory(Base):
         return f"<TrainingHistory(id={self.id}, trained_at='{self.trained_at}', test_acc={self.test_accuracy:.2f})>"
 
 
+class SearchTrial(Base):
+    """SearchTrial table - one model configuration evaluated by a hyperparameter search."""
+    __tablename__ = "search_trials"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    search_id = Column(String(12), nullable=False, index=True)  # Shared by all trials of one search
+    trial_number = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    model_config = Column(Text, nullable=False)  # JSON architecture and batch size
+    objective = Column(String(20), nullable=False)  # "accuracy" or "latency"
+    status = Column(String(20), nullable=False)  # "succeeded", "failed" or "cancelled"
+    error = Column(Text, nullable=True)
+    
+    # Measured on the validation split; the test split is left for the promoted model
+    val_accuracy = Column(Float, nullable=True)
+    val_loss = Column(Float, nullable=True)
+    epochs_run = Column(Integer, nullable=True)
+    train_seconds = Column(Float, nullable=True)
+    latency_ms = Column(Float, nullable=True)  # Mean single-message prediction, NumPy engine
+    parameters = Column(Integer, nullable=True)  # Trainable weights
+    
+    is_best = Column(Boolean, default=False)  # Winner under the search objective
+    training_id = Column(Integer, ForeignKey("training_history.id", ondelete="SET NULL"), nullable=True)  # Promoted run
+    
+    def __repr__(self):
+        return f"<SearchTrial(search='{self.search_id}', trial={self.trial_number}, val_acc={self.val_accuracy})>"
+
+
+class TrainingJobRecord(Base):
+    """TrainingJobRecord table - state of a background training job, shared by all API processes."""
+    __tablename__ = "training_jobs"
+    
+    id = Column(String(12), primary_key=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    status = Column(String(20), nullable=False, index=True)  # queued, running, succeeded, failed, cancelled
+    state = Column(Text, nullable=False)  # JSON job status with progress, written by the process running it
+    cancel_requested = Column(Boolean, default=False)  # Set by any process, polled by the one running it
+    heartbeat = Column(Float, nullable=True)  # time.time() of the running process's last sign of life
+    
+    def __repr__(self):
+        return f"<TrainingJobRecord(id='{self.id}', status='{self.status}')>"
+
+
 class User(Base):
     """User table - stores user accounts with roles."""
     __tablename__ = "users"
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Optional, List
 from datetime import datetime
 
 
@@ -13,6 +13,34 @@ class ChatResponse(BaseModel):
     confidence: Optional[float] = Field(None, description="Prediction confidence score")
 
 
+class BatchChatRequest(BaseModel):
+    messages: List[str] = Field(..., min_length=1, description="Messages to classify")
+    top_k: Optional[int] = Field(None, ge=1, le=20, description="Also return the k most likely intents")
+    log: bool = Field(False, description="Save the classified messages to chat logs")
+
+
+class IntentScore(BaseModel):
+    intent: str
+    confidence: float
+
+
+class BatchChatItem(BaseModel):
+    message: str
+    reply: str = Field(..., description="Bot response")
+    intent: Optional[str] = Field(None, description="Detected intent tag")
+    confidence: Optional[float] = Field(None, description="Prediction confidence score")
+    top_k: Optional[List[IntentScore]] = Field(
+        None,
+        description="Most likely intents, best first: min(top_k, number of intents) entries, also for exact "
+                    "pattern matches (the match at 1.0, the rest at 0.0); only the match while no model is loaded"
+    )
+
+
+class BatchChatResponse(BaseModel):
+    total: int
+    results: List[BatchChatItem]
+
+
 class ChatLogResponse(BaseModel):
     id: int
     user_message: str
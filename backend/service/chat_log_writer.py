@@ -0,0 +1,286 @@
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, List, Iterable, Set
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from schema.models import ChatLog, Pattern
+from config.settings import get_settings
+from service.intent_cache import pattern_index
+from utils.nlp_utils import text_hash
+
+
+settings = get_settings()
+
+
+def find_known_hashes(db: Session, hashes: Iterable[str]) -> Set[str]:
+    """
+    Return the text hashes that are already trained patterns or waiting in the new-data inbox.
+
+    Pattern hashes are answered from the in-memory pattern index when it is
+    built; everything else takes one indexed lookup for the whole batch.
+    """
+    hashes = set(hashes)
+    if not hashes:
+        return set()
+
+    # 1. Already a trained pattern
+    if pattern_index.is_built:
+        known = {h for h in hashes if pattern_index.has_pattern_hash(h)}
+    else:
+        known = {
+            h for (h,) in db.query(Pattern.pattern_hash).filter(Pattern.pattern_hash.in_(hashes)).distinct()
+        }
+
+    # 2. Already in the new-data queue (prevent duplicates in inbox)
+    remaining = hashes - known
+    if remaining:
+        known |= {
+            h for (h,) in db.query(ChatLog.message_hash).filter(
+                ChatLog.message_hash.in_(remaining),
+                ChatLog.is_new_data == True
+            ).distinct()
+        }
+    return known
+
+
+def is_known_message(db: Session, user_message: str) -> bool:
+    """Check if a message is already a trained pattern or waiting in the new-data inbox."""
+    message_hash = text_hash(user_message)
+    return message_hash in find_known_hashes(db, [message_hash])
+
+
+class ChatLogWriter:
+    """
+    Write-behind buffer for chat logs.
+
+    Chat requests enqueue a record and return immediately; a background
+    thread writes records in bulk every `flush_interval_ms` or every
+    `batch_size` records. When the queue is full, callers wait up to
+    `enqueue_timeout_ms` and then write their record synchronously, so load
+    is pushed back onto the producers instead of dropping logs.
+
+    A batch that fails to write goes back to the queue after an exponential
+    backoff, at most `max_retries` times; after that its records are written
+    one at a time, so only rows that fail on their own are dropped.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = 100,
+        flush_interval_ms: float = 200.0,
+        max_queue_size: int = 10000,
+        enqueue_timeout_ms: float = 50.0,
+        max_retries: int = 3,
+        retry_backoff_ms: float = 200.0
+    ):
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = max(0.0, float(flush_interval_ms)) / 1000.0
+        self.enqueue_timeout = max(0.0, float(enqueue_timeout_ms)) / 1000.0
+        self.max_retries = max(0, int(max_retries))
+        self.retry_backoff = max(0.0, float(retry_backoff_ms)) / 1000.0
+        self._queue: "queue.Queue[dict]" = queue.Queue(maxsize=max(1, int(max_queue_size)))
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+        # Metrics
+        self._enqueued = 0
+        self._written = 0
+        self._batches = 0
+        self._sync_writes = 0
+        self._retries = 0
+        self._failed = 0
+        self._last_flush_ms = 0.0
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start the background flush thread."""
+        if self.is_running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="chat-log-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        """Stop the flush thread after writing everything still buffered."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        # Anything left (e.g. enqueued after the thread exited) is written here
+        remaining = self._drain(self._queue.qsize())
+        if remaining:
+            self._write(remaining)
+
+    def enqueue(
+        self,
+        user_message: str,
+        bot_response: str,
+        intent_tag: Optional[str] = None,
+        confidence: Optional[float] = None,
+        is_new_data: bool = True
+    ):
+        """Buffer a chat log record for a later bulk write."""
+        record = {
+            "user_message": user_message,
+            "bot_response": bot_response,
+            "intent_tag": intent_tag,
+            "confidence": confidence,
+            "is_new_data": is_new_data,
+            "created_at": datetime.now(timezone.utc)
+        }
+
+        if self.is_running and not self._stop.is_set():
+            try:
+                self._queue.put(record, timeout=self.enqueue_timeout)
+                with self._lock:
+                    self._enqueued += 1
+                return
+            except queue.Full:
+                pass
+
+        # Backpressure: buffer full (or writer not running), write inline
+        with self._lock:
+            self._sync_writes += 1
+        self._write([record])
+
+    def _drain(self, limit: int) -> List[dict]:
+        records = []
+        while len(records) < limit:
+            try:
+                records.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return records
+
+    def _run(self):
+        while not (self._stop.is_set() and self._queue.empty()):
+            try:
+                first = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+            batch = [first]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self._stop.is_set():
+                    batch.extend(self._drain(self.batch_size - len(batch)))
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            self._write(batch, requeue=True)
+
+    def _write(self, records: List[dict], requeue: bool = False):
+        """
+        Write records with one multi-row INSERT. On failure, requeue them
+        (writer thread only, up to max_retries) or fall back to row-by-row writes.
+        """
+        start = time.perf_counter()
+        try:
+            self._insert(records)
+        except Exception as e:
+            error = e
+        else:
+            with self._lock:
+                self._written += len(records)
+                self._batches += 1
+                self._last_flush_ms = (time.perf_counter() - start) * 1000.0
+            return
+
+        attempt = max(r.get("_attempt", 0) for r in records) + 1
+        if requeue and attempt <= self.max_retries and not self._stop.is_set():
+            time.sleep(self.retry_backoff * (2 ** (attempt - 1)))
+            leftover = self._requeue(records, attempt)
+            with self._lock:
+                self._retries += 1
+            print(f"Warning: Could not write {len(records)} chat logs (attempt {attempt}), "
+                  f"requeued {len(records) - len(leftover)}: {error}")
+            if not leftover:
+                return
+            records = leftover
+
+        # Out of retries (or no queue to return to): isolate the rows that fail on their own
+        dropped = 0
+        for record in records:
+            try:
+                self._insert([record])
+            except Exception:
+                dropped += 1
+        with self._lock:
+            self._written += len(records) - dropped
+            self._failed += dropped
+        print(f"Warning: Batch write of {len(records)} chat logs failed ({error}); "
+              f"wrote {len(records) - dropped} one by one, dropped {dropped}")
+
+    def _requeue(self, records: List[dict], attempt: int) -> List[dict]:
+        """Put records back in the queue; returns those that did not fit."""
+        for i, record in enumerate(records):
+            record["_attempt"] = attempt
+            try:
+                self._queue.put_nowait(record)
+            except queue.Full:
+                return records[i:]
+        return []
+
+    def _insert(self, records: List[dict]):
+        """One multi-row INSERT in its own transaction; raises on failure."""
+        from config.database import SessionLocal
+
+        db = SessionLocal()
+        try:
+            for record in records:
+                record["message_hash"] = text_hash(record["user_message"])
+            known = find_known_hashes(db, [r["message_hash"] for r in records if r["is_new_data"]])
+
+            for record in records:
+                if not record["is_new_data"]:
+                    continue
+                # Duplicates inside this batch are not visible to the query yet
+                if record["message_hash"] in known:
+                    record["is_new_data"] = False
+                known.add(record["message_hash"])
+
+            # Bookkeeping keys (e.g. the retry count) are not columns
+            rows = [{key: value for key, value in r.items() if not key.startswith("_")} for r in records]
+            db.execute(insert(ChatLog), rows)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Buffer depth and write counters."""
+        with self._lock:
+            return {
+                "running": self.is_running,
+                "buffer_depth": self._queue.qsize(),
+                "max_buffer_size": self._queue.maxsize,
+                "enqueued": self._enqueued,
+                "written": self._written,
+                "batches": self._batches,
+                "sync_writes": self._sync_writes,
+                "retries": self._retries,
+                "failed": self._failed,
+                "last_flush_ms": round(self._last_flush_ms, 2)
+            }
+
+
+chat_log_writer = ChatLogWriter(
+    batch_size=settings.CHAT_LOG_FLUSH_BATCH_SIZE,
+    flush_interval_ms=settings.CHAT_LOG_FLUSH_INTERVAL_MS,
+    max_queue_size=settings.CHAT_LOG_QUEUE_MAX_SIZE,
+    enqueue_timeout_ms=settings.CHAT_LOG_ENQUEUE_TIMEOUT_MS,
+    max_retries=settings.CHAT_LOG_WRITE_RETRIES,
+    retry_backoff_ms=settings.CHAT_LOG_RETRY_BACKOFF_MS
+)
@@ -1,76 +1,388 @@
+import os
+import threading
 import numpy as np
-import pickle
 from typing import Optional, Tuple, List
 from sqlalchemy.orm import Session
-from tensorflow.keras.models import load_model
-from tensorflow.keras.preprocessing.sequence import pad_sequences
 
-from schema.models import ChatLog, Intent, Pattern
+from schema.models import ChatLog, Intent
 from config.settings import get_settings
-from utils.nlp_utils import preprocess_text
+from utils.nlp_utils import preprocess_text, preprocess_batch
+from utils.length_buckets import sequence_lengths
+from service.inference_batcher import InferenceBatcher
+from service.prediction_cache import PredictionCache
+from service.model_bundle import ModelBundle, load_model_bundle, current_model_version
+from service.intent_cache import pattern_index, response_table, refresh_intent_caches
+from service.chat_log_writer import chat_log_writer, is_known_message
 
 
 settings = get_settings()
 
+DEFAULT_RESPONSE = "Maaf, saya belum memahami pertanyaan tersebut."
+
 
 class ChatService:
     """Service for chat processing and LSTM prediction."""
     
-    _model = None
-    _tokenizer = None
-    _encoder = None
-    _max_len = None  # Will be set from settings
+    # Current serving artifacts; replaced by a single reference assignment on reload
+    _bundle: Optional[ModelBundle] = None
+    _bundle_lock = threading.Lock()
+    _reload_lock = threading.Lock()
+    _load_thread: Optional[threading.Thread] = None
+    _load_error: Optional[str] = None
+    _reloads = 0
+    _last_reload_error: Optional[str] = None
+    _watcher_stop = threading.Event()
+    _watcher_thread: Optional[threading.Thread] = None
+    _failed_version: Optional[str] = None  # Not retried until a newer version appears
+    _batcher = InferenceBatcher(
+        forward=lambda predict_fn, batch: predict_fn(batch),
+        max_batch_size=settings.INFERENCE_BATCH_MAX_SIZE,
+        max_wait_ms=settings.INFERENCE_BATCH_MAX_WAIT_MS
+    )
+    _cascade_lock = threading.Lock()
+    _cascade_counts = {"fast": 0, "lstm": 0}
+    _cache = PredictionCache(
+        max_size=settings.PREDICTION_CACHE_MAX_SIZE,
+        ttl_seconds=settings.PREDICTION_CACHE_TTL_SECONDS
+    )
     
-    def __init__(self, db: Session):
+    def __init__(self, db: Optional[Session] = None):
+        # Cheap on the request path: never loads the model. start_background_load and
+        # the version watcher set _bundle; until then messages get the fallback reply.
         self.db = db
-        self._load_model()
     
     @classmethod
     def _load_model(cls):
         """Load LSTM model, tokenizer, and encoder (singleton pattern)."""
-        if cls._model is None:
+        if cls._bundle is None:
+            with cls._bundle_lock:
+                if cls._bundle is None:
+                    try:
+                        cls._bundle = load_model_bundle()
+                        cls._load_error = None
+                    except Exception as e:
+                        cls._load_error = str(e)
+                        print(f"Warning: Could not load model files: {e}")
+        
+        # Exact-match answers and replies work even if the model files are missing
+        if not pattern_index.is_built or not response_table.is_loaded:
+            cls._build_intent_caches()
+    
+    @classmethod
+    def start_background_load(cls):
+        """Load and warm up the model in a background thread (called at startup)."""
+        if cls._bundle is not None or (cls._load_thread is not None and cls._load_thread.is_alive()):
+            return
+        cls._load_thread = threading.Thread(target=cls._load_model, name="model-load", daemon=True)
+        cls._load_thread.start()
+    
+    @classmethod
+    def get_readiness(cls) -> dict:
+        """Readiness of this worker to serve chat traffic."""
+        bundle = cls._bundle
+        if bundle is not None:
+            status = "ready"
+        elif cls._load_thread is not None and cls._load_thread.is_alive():
+            status = "loading"
+        elif cls._load_error is not None:
+            status = "failed"
+        else:
+            status = "not_loaded"
+        
+        try:
+            latest_version = current_model_version()
+        except OSError:
+            latest_version = None
+        
+        return {
+            "ready": bundle is not None,
+            "status": status,
+            "pid": os.getpid(),
+            "model": bundle.info() if bundle else None,
+            "latest_version": latest_version,
+            "up_to_date": bundle is not None and bundle.version == latest_version,
+            "error": cls._load_error if bundle is None else None,
+            "intent_caches_loaded": pattern_index.is_built and response_table.is_loaded
+        }
+    
+    @staticmethod
+    def _build_intent_caches():
+        """Build the exact-match pattern index and response table alongside the model."""
+        from config.database import SessionLocal
+        db = SessionLocal()
+        try:
+            refresh_intent_caches(db)
+        finally:
+            db.close()
+    
+    @classmethod
+    def reload_model(cls, wait: bool = True, only_if_changed: bool = False) -> Optional[threading.Thread]:
+        """
+        Reload the model (after retraining) without interrupting chat.
+        The new bundle is loaded and warmed up in a background thread while
+        the current one keeps serving, then swapped in with one assignment.
+        If loading fails, the current bundle stays in place.
+        With only_if_changed, nothing happens if the version on disk is already served.
+        """
+        thread = threading.Thread(
+            target=cls._reload_in_background,
+            args=(only_if_changed,),
+            name="model-reload",
+            daemon=True
+        )
+        thread.start()
+        if wait:
+            thread.join()
+        return thread
+    
+    @classmethod
+    def _reload_in_background(cls, only_if_changed: bool = False):
+        with cls._reload_lock:
+            if only_if_changed and cls._bundle is not None and cls._bundle.version == current_model_version():
+                return
             try:
-                cls._model = load_model(settings.MODEL_PATH)
-                cls._tokenizer = pickle.load(open(settings.TOKENIZER_PATH, 'rb'))
-                cls._encoder = pickle.load(open(settings.ENCODER_PATH, 'rb'))
-                cls._max_len = settings.MAX_SEQUENCE_LENGTH
+                bundle = load_model_bundle()
             except Exception as e:
-                print(f"Warning: Could not load model files: {e}")
-                cls._model = None
-                cls._tokenizer = None
-                cls._encoder = None
-                cls._max_len = settings.MAX_SEQUENCE_LENGTH
+                cls._last_reload_error = str(e)
+                print(f"Warning: Model reload failed, keeping current model: {e}")
+                return
+            
+            cls._bundle = bundle  # Atomic swap; in-flight requests keep their bundle
+            cls._reloads += 1
+            cls._last_reload_error = None
+            # Cache keys include the bundle generation; this only frees old entries
+            cls._cache.invalidate()
+            print(f"[MODEL] Loaded model version {bundle.version} "
+                  f"(load {bundle.load_seconds:.2f}s, warmup {bundle.warmup_ms:.1f}ms)")
+        
+        cls._build_intent_caches()
     
     @classmethod
-    def reload_model(cls):
-        """Force reload the model (after retraining)."""
-        cls._model = None
-        cls._tokenizer = None
-        cls._encoder = None
-        cls._load_model()
-    
-    def predict_intent(self, message: str) -> Tuple[Optional[str], float]:
-        """Predict intent from user message using LSTM model."""
-        if self._model is None or self._tokenizer is None or self._encoder is None:
+    def start_version_watcher(cls, interval: float):
+        """
+        Poll the model version on disk and hot-load new versions in the background.
+        Picks up retrains handled by other workers without a restart.
+        """
+        if interval <= 0 or (cls._watcher_thread is not None and cls._watcher_thread.is_alive()):
+            return
+        cls._watcher_stop.clear()
+        cls._watcher_thread = threading.Thread(
+            target=cls._watch_version,
+            args=(interval,),
+            name="model-version-watcher",
+            daemon=True
+        )
+        cls._watcher_thread.start()
+    
+    @classmethod
+    def stop_version_watcher(cls):
+        """Stop polling the model version."""
+        cls._watcher_stop.set()
+    
+    @classmethod
+    def _watch_version(cls, interval: float):
+        while not cls._watcher_stop.wait(interval):
+            try:
+                latest = current_model_version()
+            except OSError:
+                continue  # No model files (yet)
+            
+            bundle = cls._bundle
+            if latest == cls._failed_version or (bundle is not None and bundle.version == latest):
+                continue
+            if bundle is None and cls._load_thread is not None and cls._load_thread.is_alive():
+                continue  # Initial load still running
+            
+            print(f"[MODEL] Model version {latest} found on disk "
+                  f"(serving {bundle.version if bundle else 'none'}), reloading")
+            if bundle is None:
+                cls._load_model()
+            else:
+                cls.reload_model(wait=True, only_if_changed=True)
+            
+            bundle = cls._bundle
+            cls._failed_version = None if bundle is not None and bundle.version == latest else latest
+    
+    def predict_intent(self, message: str, processed_message: Optional[str] = None) -> Tuple[Optional[str], float]:
+        """
+        Predict intent from user message using LSTM model.
+        Pass processed_message if the caller already preprocessed it.
+        """
+        bundle = self._bundle  # Read once: the whole prediction uses the same artifacts
+        if bundle is None:
             return None, 0.0
         
         # Preprocess message
-        processed_message = preprocess_text(message)
+        if processed_message is None:
+            processed_message = preprocess_text(message)
         print(f"[NLP-Predict] Original: '{message}' -> Processed: '{processed_message}'")
         
+        if settings.PREDICTION_CACHE_ENABLED:
+            return self._cache.get_or_compute(
+                (bundle.generation, processed_message),
+                lambda: self._predict_processed(bundle, processed_message)
+            )
+        return self._predict_processed(bundle, processed_message)
+    
+    def _predict_processed(self, bundle: ModelBundle, processed_message: str) -> Tuple[Optional[str], float]:
+        """Run the model on an already preprocessed message."""
         # Tokenize and pad
-        seq = self._tokenizer.texts_to_sequences([processed_message])
-        pad = pad_sequences(seq, maxlen=self._max_len)
+        pad = bundle.tokenizer.encode_batch([processed_message], bundle.max_len)
         
-        # Predict
-        pred = self._model.predict(pad, verbose=0)
+        # Cascade: the fast model answers confident cases, the LSTM the rest
+        fast_probs, accepted = self._fast_stage(bundle, pad)
+        if accepted[0]:
+            pred = fast_probs[0]
+        # Predict (batched with concurrent requests when enabled)
+        elif settings.INFERENCE_BATCHING_ENABLED:
+            pred = self._batcher.predict(bundle.predict_fn, pad[0])
+        else:
+            pred = bundle.predict_fn(pad)[0]
         confidence = float(np.max(pred))
-        tag = self._encoder.inverse_transform([np.argmax(pred)])[0]
+        tag = bundle.encoder.inverse_transform([np.argmax(pred)])[0]
         
         return tag, confidence
     
+    @classmethod
+    def _fast_stage(cls, bundle: ModelBundle, X: np.ndarray) -> Tuple[Optional[np.ndarray], np.ndarray]:
+        """
+        Run the cascade's fast model on padded inputs.
+        Returns its probabilities (None if the cascade is off) and a mask of
+        the rows confident enough to skip the LSTM.
+        """
+        fast_model = bundle.fast_model
+        if not settings.CASCADE_ENABLED or fast_model is None or fast_model.threshold is None:
+            fast_probs, accepted = None, np.zeros(len(X), dtype=bool)
+        else:
+            fast_probs = fast_model.predict(X)
+            accepted = np.max(fast_probs, axis=1) >= fast_model.threshold
+        
+        answered = int(np.count_nonzero(accepted))
+        with cls._cascade_lock:
+            cls._cascade_counts["fast"] += answered
+            cls._cascade_counts["lstm"] += len(X) - answered
+        return fast_probs, accepted
+    
+    def classify_batch(self, messages: List[str], top_k: Optional[int] = None) -> List[dict]:
+        """
+        Classify many messages at once.
+        Messages are preprocessed and tokenized in bulk, identical texts are
+        classified once, and the model runs in large vectorized chunks
+        (bypassing the per-request micro-batcher).
+        Returns one dict per message: intent, confidence, reply and optional top_k.
+        """
+        bundle = self._bundle
+        processed = preprocess_batch(messages)
+        
+        # Exact pattern matches skip the model, as in process_message. Their top_k has
+        # the same k entries as model rows: the match, then the other intents at 0.0
+        class_names = [str(name) for name in bundle.encoder.classes_] if bundle is not None else []
+        results: dict = {}
+        for text in processed:
+            if text in results:
+                continue
+            tag = pattern_index.lookup(text)
+            if tag is not None:
+                ranked = None
+                if top_k:
+                    others = [name for name in class_names if name != tag]
+                    ranked = [(tag, 1.0)] + [(name, 0.0) for name in others[:min(top_k, len(class_names) or 1) - 1]]
+                results[text] = (tag, 1.0, ranked)
+        
+        pending = [text for text in dict.fromkeys(processed) if text not in results]
+        if pending and bundle is not None:
+            X = bundle.tokenizer.encode_batch(pending, bundle.max_len)
+            
+            # Cascade: only rows the fast model is unsure about go to the LSTM
+            fast_probs, accepted = self._fast_stage(bundle, X)
+            probs = np.zeros((len(X), len(bundle.encoder.classes_)), dtype=np.float32)
+            if fast_probs is not None:
+                probs[accepted] = fast_probs[accepted]
+            # Similar lengths share a chunk, so masked models run on less padding
+            hard = np.flatnonzero(~accepted)
+            hard = hard[np.argsort(sequence_lengths(X[hard]), kind="stable")]
+            chunk = max(1, settings.BATCH_CLASSIFY_CHUNK_SIZE)
+            for start in range(0, len(hard), chunk):
+                rows = hard[start:start + chunk]
+                probs[rows] = bundle.predict_fn(X[rows])
+            
+            best = np.argmax(probs, axis=1)
+            tags = bundle.encoder.inverse_transform(best)
+            confidences = probs[np.arange(len(probs)), best]
+            if top_k:
+                k = min(top_k, probs.shape[1])
+                top_idx = np.argsort(-probs, axis=1)[:, :k]
+            
+            for i, text in enumerate(pending):
+                ranked = None
+                if top_k:
+                    ranked = [(class_names[j], float(probs[i, j])) for j in top_idx[i]]
+                results[text] = (str(tags[i]), float(confidences[i]), ranked)
+        
+        output = []
+        for text in processed:
+            tag, confidence, ranked = results.get(text, (None, 0.0, None))
+            response = self.get_response(tag) if tag else None
+            output.append({
+                "intent": tag,
+                "confidence": confidence,
+                "reply": response or DEFAULT_RESPONSE,
+                "top_k": [{"intent": t, "confidence": c} for t, c in ranked] if ranked is not None else None
+            })
+        return output
+    
+    @classmethod
+    def _get_cascade_stats(cls) -> dict:
+        with cls._cascade_lock:
+            fast, lstm = cls._cascade_counts["fast"], cls._cascade_counts["lstm"]
+        total = fast + lstm
+        return {
+            "fast_answers": fast,
+            "lstm_answers": lstm,
+            "fast_share": round(fast / total, 4) if total else 0.0
+        }
+    
+    @staticmethod
+    def _get_pool_stats(bundle: Optional[ModelBundle]) -> Optional[dict]:
+        """Inference pool server stats when serving with INFERENCE_BACKEND=pool."""
+        if bundle is None or not hasattr(bundle.model, "get_stats"):
+            return None
+        try:
+            return bundle.model.get_stats()
+        except Exception as e:
+            return {"error": str(e)}
+    
+    @classmethod
+    def get_inference_stats(cls) -> dict:
+        """Get chat pipeline statistics (inference, caches, chat log buffer)."""
+        bundle = cls._bundle
+        return {
+            "backend": settings.INFERENCE_BACKEND,
+            "model": bundle.info() if bundle else None,
+            "reloads": cls._reloads,
+            "last_reload_error": cls._last_reload_error,
+            "pool": cls._get_pool_stats(bundle),
+            "batching_enabled": settings.INFERENCE_BATCHING_ENABLED,
+            "batcher": cls._batcher.get_stats(),
+            "cascade_enabled": settings.CASCADE_ENABLED,
+            "cascade": cls._get_cascade_stats(),
+            "cache_enabled": settings.PREDICTION_CACHE_ENABLED,
+            "cache": cls._cache.get_stats(),
+            "pattern_index": pattern_index.get_stats(),
+            "response_table": response_table.get_stats(),
+            "chat_log_writer": chat_log_writer.get_stats()
+        }
+    
     def get_response(self, tag: str) -> Optional[str]:
-        """Get response for a given intent tag from database."""
+        """Get response for a given intent tag from the in-memory response table."""
+        if response_table.is_loaded:
+            responses = response_table.get(tag)
+            # Return first response (can be randomized later)
+            return responses[0] if responses else None
+        
+        # Table not loaded yet (database was unavailable at startup)
+        if self.db is None:
+            return None
         intent = self.db.query(Intent).filter(Intent.tag == tag).first()
         if intent and intent.responses:
             # Return first response (can be randomized later)
@@ -79,8 +391,15 @@ class ChatService:
     
     def process_message(self, message: str) -> Tuple[str, Optional[str], float]:
         """Process user message and return response with intent info."""
-        # Predict intent
-        tag, confidence = self.predict_intent(message)
+        # Preprocessed once, for the exact-match lookup and the model
+        processed_message = preprocess_text(message)
+        
+        # Exact match against a known training pattern skips the model
+        tag = pattern_index.lookup(processed_message)
+        if tag is not None:
+            confidence = 1.0
+        else:
+            tag, confidence = self.predict_intent(message, processed_message)
         
         # Get response based on intent
         if tag:
@@ -89,7 +408,7 @@ class ChatService:
                 return response, tag, confidence
         
         # Default response if no match
-        return "Maaf, saya belum memahami pertanyaan tersebut.", tag, confidence
+        return DEFAULT_RESPONSE, tag, confidence
     
     def save_chat_log(
         self, 
@@ -102,19 +421,8 @@ class ChatService:
         """Save chat interaction to database."""
         
         # Duplicate Check Logic
-        # 1. Check if message already exists in trained patterns (case-insensitive)
-        exists_in_patterns = self.db.query(Pattern).filter(
-            Pattern.pattern_text.ilike(user_message)
-        ).first() is not None
-        
-        # 2. Check if message already exists in new data queue (prevent duplicates in inbox)
-        exists_in_queue = self.db.query(ChatLog).filter(
-            ChatLog.user_message.ilike(user_message),
-            ChatLog.is_new_data == True
-        ).first() is not None
-        
-        # If exists in either, it's not "new data" for the dataset
-        final_is_new_data = is_new_data and not exists_in_patterns and not exists_in_queue
+        # If it exists in trained patterns or the inbox, it's not "new data" for the dataset
+        final_is_new_data = is_new_data and not is_known_message(self.db, user_message)
         
         chat_log = ChatLog(
             user_message=user_message,
@@ -164,13 +472,21 @@ class ChatService:
         # Process message
         response, tag, confidence = self.process_message(message)
         
-        # Save to database
-        self.save_chat_log(
-            user_message=message,
-            bot_response=response,
-            intent_tag=tag,
-            confidence=confidence
-        )
+        # Save to database (buffered and written in bulk by the write-behind logger)
+        if settings.CHAT_LOG_WRITE_BEHIND or self.db is None:
+            chat_log_writer.enqueue(
+                user_message=message,
+                bot_response=response,
+                intent_tag=tag,
+                confidence=confidence
+            )
+        else:
+            self.save_chat_log(
+                user_message=message,
+                bot_response=response,
+                intent_tag=tag,
+                confidence=confidence
+            )
         
         return response, tag, confidence
     
@@ -0,0 +1,121 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Dict
+
+import numpy as np
+
+
+class InferenceBatcher:
+    """
+    Micro-batching scheduler for model inference.
+
+    Concurrent callers submit one padded sequence each. A single worker thread
+    collects requests for up to `max_wait_ms` (or until `max_batch_size` rows
+    are waiting), runs one forward pass per model and hands every caller its
+    own row of the prediction.
+    """
+
+    def __init__(
+        self,
+        forward: Callable[[Any, np.ndarray], np.ndarray],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0
+    ):
+        self._forward = forward
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._thread = None
+
+        # Stats
+        self._requests = 0
+        self._batches = 0
+        self._peak_queue_depth = 0
+        self._max_batch_seen = 0
+        self._batch_size_histogram: Dict[int, int] = {}
+
+    def predict(self, model: Any, row: np.ndarray) -> np.ndarray:
+        """Submit a single padded sequence and block until its prediction is ready."""
+        future = Future()
+        with self._cond:
+            self._ensure_worker()
+            self._queue.append((time.monotonic(), model, row, future))
+            self._peak_queue_depth = max(self._peak_queue_depth, len(self._queue))
+            self._cond.notify()
+        return future.result()
+
+    def _ensure_worker(self):
+        """Start the worker thread on first use (caller holds the lock)."""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._worker_loop,
+                name="inference-batcher",
+                daemon=True
+            )
+            self._thread.start()
+
+    def _worker_loop(self):
+        while True:
+            with self._cond:
+                while not self._queue:
+                    self._cond.wait()
+
+                # Wait until the oldest request has waited max_wait or the batch is full
+                deadline = self._queue[0][0] + self.max_wait
+                while len(self._queue) < self.max_batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+
+                size = min(len(self._queue), self.max_batch_size)
+                items = [self._queue.popleft() for _ in range(size)]
+
+            self._run_batch(items)
+
+    def _run_batch(self, items):
+        # Requests may target different models (e.g. around a reload), one pass each
+        groups: Dict[int, list] = {}
+        for _, model, row, future in items:
+            groups.setdefault(id(model), []).append((model, row, future))
+
+        for group in groups.values():
+            model = group[0][0]
+            try:
+                batch = np.stack([row for _, row, _ in group])
+                predictions = self._forward(model, batch)
+            except Exception as e:
+                for _, _, future in group:
+                    future.set_exception(e)
+                continue
+
+            for i, (_, _, future) in enumerate(group):
+                future.set_result(predictions[i])
+
+            self._record_batch(len(group))
+
+    def _record_batch(self, size: int):
+        with self._cond:
+            self._requests += size
+            self._batches += 1
+            self._max_batch_seen = max(self._max_batch_seen, size)
+            self._batch_size_histogram[size] = self._batch_size_histogram.get(size, 0) + 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth and batch-size statistics."""
+        with self._cond:
+            return {
+                "queue_depth": len(self._queue),
+                "peak_queue_depth": self._peak_queue_depth,
+                "requests": self._requests,
+                "batches": self._batches,
+                "avg_batch_size": round(self._requests / self._batches, 2) if self._batches else 0.0,
+                "max_batch_size_seen": self._max_batch_seen,
+                "batch_size_histogram": dict(sorted(self._batch_size_histogram.items())),
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000.0
+            }
@@ -0,0 +1,45 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from config.settings import get_settings
+
+
+settings = get_settings()
+
+_executor: Optional[ThreadPoolExecutor] = None
+_lock = threading.Lock()
+
+
+def get_inference_executor() -> ThreadPoolExecutor:
+    """
+    Dedicated, size-bounded thread pool for chat inference.
+
+    Separate from Starlette's default threadpool, so slow database or auth
+    work running there cannot starve chat inference of threads.
+    """
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.INFERENCE_EXECUTOR_WORKERS,
+                thread_name_prefix="inference"
+            )
+        return _executor
+
+
+async def run_in_inference_executor(fn: Callable, *args, **kwargs) -> Any:
+    """Run a blocking function on the inference executor and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_inference_executor(), functools.partial(fn, *args, **kwargs))
+
+
+def shutdown_inference_executor():
+    """Wait for running inference calls and stop the executor."""
+    global _executor
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
@@ -0,0 +1,395 @@
+"""
+Multi-process inference pool with shared-memory weights.
+
+One server process loads the NumPy LSTM weights once into shared memory and
+starts a pool of worker processes that attach to them read-only, so adding
+workers adds CPU, not model copies. API processes (uvicorn workers) send
+padded batches over a multiprocessing connection and get probabilities back.
+
+Run the server next to the API:
+    python -m service.inference_pool [--workers N]
+and start the API with INFERENCE_BACKEND=pool.
+"""
+
+import os
+import time
+import signal
+import argparse
+import itertools
+import threading
+import multiprocessing as mp
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+from multiprocessing.connection import Client, Listener
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from config.settings import get_settings
+from utils.numpy_lstm import NumpyLSTM
+
+
+settings = get_settings()
+
+_ALIGN = 64  # Byte alignment of each array inside the shared block
+
+
+def _pool_address() -> Tuple[str, int]:
+    return settings.INFERENCE_POOL_HOST, settings.INFERENCE_POOL_PORT
+
+
+def _pool_authkey() -> bytes:
+    return settings.INFERENCE_POOL_AUTHKEY.encode("utf-8")
+
+
+def _require_authkey(authkey: bytes):
+    """Messages are pickled, so anyone who knows the key can run code in the peer: never run without one."""
+    if not authkey:
+        raise RuntimeError("INFERENCE_POOL_AUTHKEY is not set; set a random secret in the environment")
+
+
+# ==================== SHARED WEIGHTS ====================
+
+def share_model(model: NumpyLSTM) -> Tuple[shared_memory.SharedMemory, dict]:
+    """Copy the model weights into one shared memory block; returns it and its manifest."""
+    config, arrays = model.to_arrays()
+    arrays = {name: np.ascontiguousarray(array, dtype=np.float32) for name, array in arrays.items()}
+
+    layout = []
+    offset = 0
+    for name, array in arrays.items():
+        offset = -(-offset // _ALIGN) * _ALIGN
+        layout.append((name, array.shape, offset))
+        offset += array.nbytes
+
+    shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+    for name, shape, start in layout:
+        np.ndarray(shape, dtype=np.float32, buffer=shm.buf, offset=start)[...] = arrays[name]
+
+    manifest = {"shm_name": shm.name, "config": config, "layout": layout, "nbytes": offset}
+    return shm, manifest
+
+
+def attach_model(manifest: dict) -> Tuple[shared_memory.SharedMemory, NumpyLSTM]:
+    """Build a NumpyLSTM whose weights are read-only views into the shared block."""
+    shm = shared_memory.SharedMemory(name=manifest["shm_name"])
+    arrays = {}
+    for name, shape, start in manifest["layout"]:
+        array = np.ndarray(shape, dtype=np.float32, buffer=shm.buf, offset=start)
+        array.flags.writeable = False
+        arrays[name] = array
+    return shm, NumpyLSTM.from_arrays(manifest["config"], arrays)
+
+
+def _worker_main(manifest: dict, tasks, results):
+    """Worker process: run forward passes until a None task arrives."""
+    shm, model = attach_model(manifest)
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            task_id, batch = task
+            try:
+                results.put((task_id, True, model.predict(batch)))
+            except Exception as e:
+                results.put((task_id, False, f"{type(e).__name__}: {e}"))
+    finally:
+        del model
+        try:
+            shm.close()
+        except BufferError:
+            pass
+
+
+class _PoolGeneration:
+    """Workers attached to one version of the weights."""
+
+    def __init__(self, ctx, model: NumpyLSTM, num_workers: int, results, version: str):
+        self.version = version
+        self.shm, self.manifest = share_model(model)
+        self.tasks = ctx.Queue()
+        self.workers = [
+            ctx.Process(
+                target=_worker_main,
+                args=(self.manifest, self.tasks, results),
+                name=f"inference-worker-{i}",
+                daemon=True
+            )
+            for i in range(num_workers)
+        ]
+        for worker in self.workers:
+            worker.start()
+
+    def request_stop(self):
+        # Queued tasks are served first: every sentinel comes after them
+        for _ in self.workers:
+            self.tasks.put(None)
+
+    def join(self, timeout: float = 30.0):
+        for worker in self.workers:
+            worker.join(timeout)
+        self.shm.close()
+        self.shm.unlink()
+
+
+# ==================== SERVER ====================
+
+class InferencePoolServer:
+    """
+    Accepts connections from API processes and fans batches out to workers.
+
+    Message protocol (tuples over multiprocessing.connection):
+        request:  (kind, request_id, payload)  kind = "predict" | "reload" | "stats"
+        response: (status, request_id, value)  status = "ok" | "error"
+    """
+
+    def __init__(self, address: Tuple[str, int], authkey: bytes, num_workers: int):
+        _require_authkey(authkey)
+        self.address = address
+        self.authkey = authkey
+        self.num_workers = max(1, num_workers)
+        self._ctx = mp.get_context("spawn")
+        self._results = self._ctx.Queue()
+        self._lock = threading.Lock()  # Guards the generation swap against task submission
+        self._reload_lock = threading.Lock()
+        self._generation: Optional[_PoolGeneration] = None
+        self._pending: Dict[int, Tuple[Any, threading.Lock, int]] = {}
+        self._task_ids = itertools.count()
+
+        # Metrics
+        self._requests = 0
+        self._errors = 0
+        self._reloads = 0
+
+    def reload(self) -> dict:
+        """Load the weights into a new generation if the model version changed."""
+        from service.model_bundle import load_numpy_model, current_model_version
+
+        with self._reload_lock:
+            version = current_model_version()
+            if self._generation is not None and self._generation.version == version:
+                return self.get_stats()
+
+            start = time.perf_counter()
+            generation = _PoolGeneration(self._ctx, load_numpy_model(), self.num_workers, self._results, version)
+            with self._lock:
+                old, self._generation = self._generation, generation
+                if old is not None:
+                    old.request_stop()
+            if old is not None:
+                threading.Thread(target=old.join, name="inference-pool-retire", daemon=True).start()
+                self._reloads += 1
+            print(f"[POOL] Loaded weights ({generation.manifest['nbytes']} bytes shared) into "
+                  f"{self.num_workers} workers in {time.perf_counter() - start:.2f}s")
+        return self.get_stats()
+
+    def serve_forever(self):
+        self.reload()
+        threading.Thread(target=self._dispatch_results, name="inference-pool-results", daemon=True).start()
+        with Listener(self.address, authkey=self.authkey) as listener:
+            print(f"[POOL] Listening on {self.address[0]}:{self.address[1]}")
+            while True:
+                try:
+                    conn = listener.accept()
+                except Exception as e:
+                    print(f"Warning: Rejected inference pool connection: {e}")
+                    continue
+                threading.Thread(target=self._handle, args=(conn,), name="inference-pool-conn", daemon=True).start()
+
+    def shutdown(self):
+        with self._lock:
+            generation, self._generation = self._generation, None
+            if generation is not None:
+                generation.request_stop()
+        if generation is not None:
+            generation.join()
+
+    def _handle(self, conn):
+        send_lock = threading.Lock()
+        try:
+            while True:
+                try:
+                    kind, request_id, payload = conn.recv()
+                except (EOFError, OSError):
+                    break
+
+                if kind == "predict":
+                    task_id = next(self._task_ids)
+                    self._pending[task_id] = (conn, send_lock, request_id)
+                    with self._lock:
+                        self._generation.tasks.put((task_id, payload))
+                elif kind == "reload":
+                    try:
+                        self._send(conn, send_lock, ("ok", request_id, self.reload()))
+                    except Exception as e:
+                        self._send(conn, send_lock, ("error", request_id, f"Reload failed: {e}"))
+                elif kind == "stats":
+                    self._send(conn, send_lock, ("ok", request_id, self.get_stats()))
+                else:
+                    self._send(conn, send_lock, ("error", request_id, f"Unknown request: {kind}"))
+        finally:
+            conn.close()
+
+    def _dispatch_results(self):
+        while True:
+            task_id, ok, value = self._results.get()
+            entry = self._pending.pop(task_id, None)
+            if entry is None:
+                continue
+            conn, send_lock, request_id = entry
+            self._requests += 1
+            if not ok:
+                self._errors += 1
+            self._send(conn, send_lock, ("ok" if ok else "error", request_id, value))
+
+    @staticmethod
+    def _send(conn, send_lock: threading.Lock, message: tuple):
+        try:
+            with send_lock:
+                conn.send(message)
+        except (OSError, ValueError):
+            pass  # Client went away; its request is dropped
+
+    def get_stats(self) -> dict:
+        generation = self._generation
+        return {
+            "workers": self.num_workers,
+            "workers_alive": sum(w.is_alive() for w in generation.workers) if generation else 0,
+            "shared_bytes": generation.manifest["nbytes"] if generation else 0,
+            "version": generation.version if generation else None,
+            "reloads": self._reloads,
+            "requests": self._requests,
+            "errors": self._errors,
+            "pending": len(self._pending)
+        }
+
+
+# ==================== CLIENT ====================
+
+class InferencePoolClient:
+    """
+    Callable predict_fn that forwards padded batches to the pool server.
+
+    Thread-safe: many requests share one connection and are matched to their
+    responses by id. Reconnects on the next call if the server restarts.
+    """
+
+    def __init__(self, address: Tuple[str, int], authkey: bytes, timeout: float):
+        _require_authkey(authkey)
+        self.address = address
+        self.authkey = authkey
+        self.timeout = timeout
+        self._conn = None
+        self._lock = threading.Lock()
+        self._pending: Dict[int, Future] = {}
+        self._request_ids = itertools.count()
+
+    def _connection(self):
+        with self._lock:
+            if self._conn is None:
+                conn = Client(self.address, authkey=self.authkey)
+                self._conn = conn
+                threading.Thread(target=self._read, args=(conn,), name="inference-pool-client", daemon=True).start()
+            return self._conn
+
+    def _read(self, conn):
+        while True:
+            try:
+                status, request_id, value = conn.recv()
+            except (EOFError, OSError):
+                break
+            future = self._pending.pop(request_id, None)
+            if future is None:
+                continue
+            if status == "ok":
+                future.set_result(value)
+            else:
+                future.set_exception(RuntimeError(f"Inference pool error: {value}"))
+
+        with self._lock:
+            if self._conn is conn:
+                self._conn = None
+        for request_id in list(self._pending):
+            future = self._pending.pop(request_id, None)
+            if future is not None:
+                future.set_exception(ConnectionError("Inference pool connection closed"))
+
+    def _request(self, kind: str, payload: Any = None) -> Any:
+        conn = self._connection()
+        request_id = next(self._request_ids)
+        future: Future = Future()
+        self._pending[request_id] = future
+        try:
+            try:
+                with self._lock:
+                    conn.send((kind, request_id, payload))
+            except (OSError, ValueError) as e:
+                with self._lock:
+                    if self._conn is conn:
+                        self._conn = None
+                raise ConnectionError(f"Inference pool connection lost: {e}")
+            return future.result(timeout=self.timeout)
+        finally:
+            self._pending.pop(request_id, None)
+
+    def __call__(self, batch: np.ndarray) -> np.ndarray:
+        return self._request("predict", np.asarray(batch, dtype=np.int32))
+
+    def reload(self) -> dict:
+        """Ask the server to pick up new model files (no-op if unchanged)."""
+        return self._request("reload")
+
+    def get_stats(self) -> dict:
+        return self._request("stats")
+
+    def close(self):
+        with self._lock:
+            conn, self._conn = self._conn, None
+        if conn is not None:
+            conn.close()
+
+
+_client: Optional[InferencePoolClient] = None
+_client_lock = threading.Lock()
+
+
+def get_pool_client() -> InferencePoolClient:
+    """Process-wide client for the inference pool server."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = InferencePoolClient(
+                _pool_address(),
+                _pool_authkey(),
+                timeout=settings.INFERENCE_POOL_TIMEOUT_SECONDS
+            )
+        return _client
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Shared-memory inference pool for the LSTM chatbot')
+    parser.add_argument('--workers', type=int, default=settings.INFERENCE_POOL_WORKERS,
+                        help='Worker processes (default: INFERENCE_POOL_WORKERS, 0 = one per CPU core)')
+    args = parser.parse_args()
+
+    # One BLAS thread per worker: parallelism comes from the processes
+    for var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ.setdefault(var, "1")
+
+    # Stop on SIGTERM the same way as on Ctrl+C, so the shared block is unlinked
+    def _raise_interrupt(signum, frame):
+        raise KeyboardInterrupt
+    signal.signal(signal.SIGTERM, _raise_interrupt)
+
+    server = InferencePoolServer(_pool_address(), _pool_authkey(), args.workers or os.cpu_count() or 1)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+import threading
+import time
+from typing import Optional, Dict, Any, List, Tuple
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from schema.models import Intent, Pattern, Response
+from utils.nlp_utils import preprocess_batch, processed_hash
+
+
+class PatternIndex:
+    """
+    In-memory hash index from preprocessed pattern text to intent tag.
+
+    Messages that match a training pattern exactly (after preprocess_text)
+    are answered from here without running the model. Texts that appear as
+    patterns of more than one intent are left out so the model decides them.
+    The set of all pattern hashes is kept too, for duplicate detection.
+    """
+
+    def __init__(self):
+        self._index: Dict[str, str] = {}
+        self._hashes = frozenset()
+        self._lock = threading.Lock()
+        self._built = False
+        self._version = 0
+        self._built_at = None
+        self._ambiguous = 0
+        self._hits = 0
+        self._lookups = 0
+
+    @property
+    def is_built(self) -> bool:
+        return self._built
+
+    def rebuild(self, db: Session) -> int:
+        """Rebuild the index from the patterns table. Returns number of entries."""
+        rows = db.query(Pattern.pattern_text, Intent.tag)\
+            .join(Intent, Pattern.intent_id == Intent.id)\
+            .all()
+
+        index: Dict[str, str] = {}
+        hashes = set()
+        ambiguous = set()
+        keys = preprocess_batch(pattern_text for pattern_text, _ in rows)
+        for key, (_, tag) in zip(keys, rows):
+            hashes.add(processed_hash(key))
+            if not key or key in ambiguous:
+                continue
+            if key in index and index[key] != tag:
+                del index[key]
+                ambiguous.add(key)
+                continue
+            index[key] = tag
+
+        with self._lock:
+            # Single reference swap: readers see either the old or the new index
+            self._index = index
+            self._hashes = frozenset(hashes)
+            self._built = True
+            self._version += 1
+            self._built_at = time.time()
+            self._ambiguous = len(ambiguous)
+        return len(index)
+
+    def lookup(self, processed_text: str) -> Optional[str]:
+        """Get the intent tag for an exact pattern match, or None."""
+        tag = self._index.get(processed_text)
+        self._lookups += 1
+        if tag is not None:
+            self._hits += 1
+        return tag
+
+    def has_pattern_hash(self, hash_value: str) -> bool:
+        """Check if any training pattern has this text_hash()."""
+        return hash_value in self._hashes
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._index),
+            "pattern_hashes": len(self._hashes),
+            "ambiguous_patterns": self._ambiguous,
+            "version": self._version,
+            "built_at": self._built_at,
+            "lookups": self._lookups,
+            "hits": self._hits
+        }
+
+
+class ResponseTable:
+    """
+    Versioned in-process table of intent tag -> responses.
+
+    Loaded once and replaced wholesale on refresh, so the chat path can serve
+    replies without checking out a database connection.
+    """
+
+    def __init__(self):
+        self._responses: Dict[str, List[str]] = {}
+        self._loaded = False
+        self._version = 0
+        self._loaded_at = None
+        self._lookups = 0
+        self._misses = 0
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def reload(self, db: Session) -> int:
+        """Load all responses from the database. Returns number of intents."""
+        rows = db.query(Intent.tag, Response.response_text)\
+            .join(Response, Response.intent_id == Intent.id)\
+            .order_by(Response.id)\
+            .all()
+
+        responses: Dict[str, List[str]] = {}
+        for tag, response_text in rows:
+            responses.setdefault(tag, []).append(response_text)
+
+        # Single reference swap: readers see either the old or the new table
+        self._responses = responses
+        self._loaded = True
+        self._version += 1
+        self._loaded_at = time.time()
+        return len(responses)
+
+    def get(self, tag: str) -> Optional[List[str]]:
+        """Get the responses for a tag, or None if the tag has none."""
+        responses = self._responses.get(tag)
+        self._lookups += 1
+        if responses is None:
+            self._misses += 1
+        return responses
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "intents": len(self._responses),
+            "version": self._version,
+            "loaded_at": self._loaded_at,
+            "lookups": self._lookups,
+            "misses": self._misses
+        }
+
+
+pattern_index = PatternIndex()
+response_table = ResponseTable()
+
+_data_version: Optional[Tuple] = None
+_refresher_stop = threading.Event()
+_refresher_thread: Optional[threading.Thread] = None
+
+
+def _fetch_data_version(db: Session) -> Tuple:
+    """Cheap fingerprint of intent data: row counts, max ids and last intent update."""
+    intents = db.query(func.count(Intent.id), func.max(Intent.id), func.max(Intent.updated_at)).one()
+    patterns = db.query(func.count(Pattern.id), func.max(Pattern.id)).one()
+    responses = db.query(func.count(Response.id), func.max(Response.id)).one()
+    return tuple(intents) + tuple(patterns) + tuple(responses)
+
+
+def refresh_intent_caches(db: Session):
+    """Rebuild in-memory intent data after intents/patterns/responses change."""
+    global _data_version
+    try:
+        version = _fetch_data_version(db)
+        pattern_index.rebuild(db)
+        response_table.reload(db)
+        _data_version = version
+    except Exception as e:
+        print(f"Warning: Could not refresh intent caches: {e}")
+
+
+def refresh_intent_caches_if_changed(db: Session) -> bool:
+    """Refresh only when the data version differs (e.g. edited by another worker)."""
+    if _data_version is not None and _fetch_data_version(db) == _data_version:
+        return False
+    refresh_intent_caches(db)
+    return True
+
+
+def _refresher_loop(interval: float):
+    from config.database import SessionLocal
+
+    while not _refresher_stop.wait(interval):
+        db = SessionLocal()
+        try:
+            if refresh_intent_caches_if_changed(db):
+                print(f"[CACHE] Intent caches refreshed (response table v{response_table.version})")
+        except Exception as e:
+            print(f"Warning: Intent cache version check failed: {e}")
+        finally:
+            db.close()
+
+
+def start_intent_cache_refresher(interval: float):
+    """Start the background version check that picks up changes from other workers."""
+    global _refresher_thread
+    if interval <= 0 or (_refresher_thread is not None and _refresher_thread.is_alive()):
+        return
+    _refresher_stop.clear()
+    _refresher_thread = threading.Thread(
+        target=_refresher_loop,
+        args=(interval,),
+        name="intent-cache-refresher",
+        daemon=True
+    )
+    _refresher_thread.start()
+
+
+def stop_intent_cache_refresher():
+    """Stop the background version check."""
+    _refresher_stop.set()
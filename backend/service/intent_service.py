@@ -1,10 +1,11 @@
 import json
-from typing import List, Optional
+from typing import Iterator, List, Optional, Tuple
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from schema.models import Intent, Pattern, Response
 from schemas.intent import IntentCreate, IntentUpdate
 from config.settings import get_settings
+from service.intent_cache import refresh_intent_caches
 
 
 settings = get_settings()
@@ -40,6 +41,7 @@ class IntentService:
         
         self.db.commit()
         self.db.refresh(intent)
+        refresh_intent_caches(self.db)
         return intent
     
     def get_all_intents(self) -> List[Intent]:
@@ -91,6 +93,7 @@ class IntentService:
         
         self.db.commit()
         self.db.refresh(intent)
+        refresh_intent_caches(self.db)
         return intent
     
     def delete_intent(self, intent_id: int) -> bool:
@@ -101,6 +104,7 @@ class IntentService:
         
         self.db.delete(intent)
         self.db.commit()
+        refresh_intent_caches(self.db)
         return True
     
     def add_pattern(self, intent_id: int, pattern_text: str) -> Pattern:
@@ -109,6 +113,7 @@ class IntentService:
         self.db.add(pattern)
         self.db.commit()
         self.db.refresh(pattern)
+        refresh_intent_caches(self.db)
         return pattern
     
     def sync_from_json(self) -> int:
@@ -146,6 +151,8 @@ class IntentService:
             count += 1
         
         self.db.commit()
+        if count:
+            refresh_intent_caches(self.db)
         return count
     
     def export_to_json(self) -> dict:
@@ -163,15 +170,26 @@ class IntentService:
         
         return data
     
-    def get_training_data(self) -> tuple:
-        """Get patterns and labels for training."""
-        intents = self.get_all_intents()
-        sentences = []
-        labels = []
-        
-        for intent in intents:
-            for pattern in intent.patterns:
-                sentences.append(pattern.pattern_text)
-                labels.append(intent.tag)
+    def iter_training_chunks(self, chunk_size: Optional[int] = None) -> Iterator[Tuple[List[str], List[str]]]:
+        """
+        Stream (patterns, tags) of all intents in chunks from a single query.
+        Rows come through a server-side cursor (yield_per), so memory stays
+        bounded by the chunk size however large the pattern table grows.
+        """
+        chunk_size = chunk_size or settings.TRAINING_LOAD_CHUNK_SIZE
+        query = (
+            self.db.query(Pattern.pattern_text, Intent.tag)
+            .join(Intent, Pattern.intent_id == Intent.id)
+            .order_by(Intent.tag, Pattern.pattern_text)
+            .yield_per(chunk_size)
+        )
         
-        return sentences, labels
+        sentences, labels = [], []
+        for pattern_text, tag in query:
+            sentences.append(pattern_text)
+            labels.append(tag)
+            if len(sentences) >= chunk_size:
+                yield sentences, labels
+                sentences, labels = [], []
+        if sentences:
+            yield sentences, labels
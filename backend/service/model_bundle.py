@@ -0,0 +1,181 @@
+import os
+import time
+import pickle
+import functools
+import itertools
+from datetime import datetime, timezone
+from typing import Any, Callable, NamedTuple, Optional
+
+import numpy as np
+
+from config.settings import get_settings
+from utils.numpy_lstm import NumpyLSTM
+from utils.compiled_predict import CompiledPredictor
+from utils.vocab_encoder import VocabEncoder
+from utils.fast_classifier import FastIntentClassifier
+from utils.model_version import read_version_file
+from utils.length_buckets import trim_padding
+
+
+settings = get_settings()
+
+_generations = itertools.count(1)
+
+_LOAD_ATTEMPTS = 20
+_LOAD_RETRY_SECONDS = 0.25  # Publishing only renames files, so a retry rarely waits long
+
+
+class ModelBundle(NamedTuple):
+    """
+    Immutable set of serving artifacts that are always used together.
+
+    A request reads the current bundle once and uses its model, tokenizer
+    and encoder for the whole prediction, so a reload can never pair a new
+    tokenizer with an old model.
+    """
+    model: Any
+    predict_fn: Callable[[np.ndarray], np.ndarray]  # padded batch -> class probabilities
+    tokenizer: VocabEncoder
+    encoder: Any
+    max_len: int
+    generation: int  # Unique per loaded bundle in this process
+    version: str  # Id from version.json (or the model file's mtime for unstamped artifacts)
+    loaded_at: float
+    load_seconds: float
+    warmup_ms: float
+    fast_model: Optional[FastIntentClassifier] = None  # First cascade stage, if trained with this model
+
+    def info(self) -> dict:
+        """Bundle metadata for stats/readiness endpoints."""
+        return {
+            "version": self.version,
+            "backend": settings.INFERENCE_BACKEND,
+            "loaded_at": datetime.fromtimestamp(self.loaded_at, timezone.utc).isoformat(),
+            "load_seconds": round(self.load_seconds, 3),
+            "warmup_ms": round(self.warmup_ms, 3),
+            "num_classes": len(self.encoder.classes_),
+            "cascade_threshold": self.fast_model.threshold if self.fast_model else None
+        }
+
+
+def load_numpy_model() -> NumpyLSTM:
+    """Load the NumPy engine, preferring the exported weight bundle unless the .h5 model is newer."""
+    if _is_current(settings.WEIGHTS_PATH, settings.MODEL_PATH):
+        return NumpyLSTM.from_bundle(settings.WEIGHTS_PATH)
+    return NumpyLSTM.from_h5(settings.MODEL_PATH)
+
+
+def _load_inference_model():
+    """Load the serving model for the configured INFERENCE_BACKEND."""
+    if settings.INFERENCE_BACKEND == "numpy":
+        model = load_numpy_model()
+        return model, model.predict
+
+    if settings.INFERENCE_BACKEND == "pool":
+        from service.inference_pool import get_pool_client
+        # Forward passes run in the shared inference pool server; make sure it serves these files
+        client = get_pool_client()
+        client.reload()
+        return client, client
+
+    from tensorflow.keras.models import load_model
+    model = load_model(settings.MODEL_PATH)
+    # Models that mask padding give the same predictions on batches cut to their longest row
+    trim = settings.LENGTH_BUCKETING_ENABLED and _masks_padding(model)
+    if settings.INFERENCE_BACKEND == "compiled":
+        # Traced once per bucket size and warmed up here, so requests never retrace
+        return model, CompiledPredictor(
+            model,
+            max_len=settings.MAX_SEQUENCE_LENGTH,
+            buckets=settings.INFERENCE_BATCH_BUCKETS,
+            trim=trim
+        )
+    predict = functools.partial(model.predict, verbose=0)
+    if trim:
+        return model, lambda batch: predict(trim_padding(np.asarray(batch, dtype=np.int32)))
+    return model, predict
+
+
+def _masks_padding(model) -> bool:
+    """True if the Keras model's embedding masks padding (id 0)."""
+    return bool(model.layers) and bool(getattr(model.layers[0], "mask_zero", False))
+
+
+def _is_current(path: str, source: str) -> bool:
+    """True if an exported artifact exists and is at least as new as its source."""
+    return os.path.exists(path) and (
+        not os.path.exists(source) or os.path.getmtime(path) >= os.path.getmtime(source)
+    )
+
+
+def _load_vocab() -> VocabEncoder:
+    """Load the compact vocabulary, falling back to the pickled Keras Tokenizer."""
+    if _is_current(settings.VOCAB_PATH, settings.TOKENIZER_PATH):
+        return VocabEncoder.load(settings.VOCAB_PATH)
+    with open(settings.TOKENIZER_PATH, 'rb') as f:
+        return VocabEncoder.from_tokenizer(pickle.load(f))
+
+
+def _load_fast_model() -> Optional[FastIntentClassifier]:
+    """Load the cascade's fast model if it was trained together with the current model."""
+    # Written after the .h5 in the same training run; an older file belongs to a previous vocabulary
+    if not os.path.exists(settings.MODEL_PATH) or not _is_current(settings.FAST_MODEL_PATH, settings.MODEL_PATH):
+        return None
+    return FastIntentClassifier.load(settings.FAST_MODEL_PATH)
+
+
+def current_model_version() -> str:
+    """Version of the model artifacts currently on disk."""
+    record = read_version_file(settings.MODEL_VERSION_PATH)
+    if record and record.get("version"):
+        return str(record["version"])
+    return datetime.fromtimestamp(os.path.getmtime(settings.MODEL_PATH), timezone.utc).strftime("%Y%m%d%H%M%S")
+
+
+def load_model_bundle() -> ModelBundle:
+    """
+    Load model, tokenizer and encoder, then run a warmup forward pass.
+    Retried while a training run is moving new artifacts into place: the
+    version record must be final and unchanged across the whole load, so
+    the files always belong to one version.
+    """
+    for _ in range(_LOAD_ATTEMPTS):
+        record = read_version_file(settings.MODEL_VERSION_PATH)
+        if record is None or not record.get("pending"):
+            bundle = _load_bundle()
+            if read_version_file(settings.MODEL_VERSION_PATH) == record:
+                return bundle
+            print("[MODEL] Artifacts were replaced while loading; loading again")
+        time.sleep(_LOAD_RETRY_SECONDS)
+    raise RuntimeError("Model artifacts kept changing while loading")
+
+
+def _load_bundle() -> ModelBundle:
+    version = current_model_version()
+    start = time.perf_counter()
+    model, predict_fn = _load_inference_model()
+    tokenizer = _load_vocab()
+    fast_model = _load_fast_model()
+    with open(settings.ENCODER_PATH, 'rb') as f:
+        encoder = pickle.load(f)
+    max_len = settings.MAX_SEQUENCE_LENGTH
+    load_seconds = time.perf_counter() - start
+
+    # Warmup: the first forward pass pays one-time setup costs, not the first user
+    warmup_start = time.perf_counter()
+    predict_fn(np.zeros((1, max_len), dtype=np.int32))
+    warmup_ms = (time.perf_counter() - warmup_start) * 1000.0
+
+    return ModelBundle(
+        model=model,
+        predict_fn=predict_fn,
+        tokenizer=tokenizer,
+        encoder=encoder,
+        max_len=max_len,
+        generation=next(_generations),
+        version=version,
+        loaded_at=time.time(),
+        load_seconds=load_seconds,
+        warmup_ms=warmup_ms,
+        fast_model=fast_model
+    )
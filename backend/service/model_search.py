@@ -0,0 +1,179 @@
+"""
+Parallel hyperparameter search trials.
+
+Each trial trains one model configuration in a pool worker process. The
+prepared arrays are written once as .npy files and memory-mapped read-only
+by every worker, so all workers share a single copy of the dataset through
+the page cache. Workers are single-threaded and get the training process
+memory limit, so N workers use N cores.
+
+Inference latency is timed afterwards in the parent, one trial at a time, so
+trials are not measured while competing with each other for the CPU.
+"""
+
+import os
+import time
+import tempfile
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+import numpy as np
+
+from config.settings import get_settings
+from service.training_process import apply_process_limits
+from utils.numpy_lstm import NumpyLSTM
+
+
+settings = get_settings()
+
+SHARED_ARRAYS = ("X_train", "y_train", "X_val", "y_val")
+
+_stop = None  # Worker side: set by the parent when the search is cancelled
+
+
+def _init_worker(limits: Dict[str, int], stop):
+    """Pool initializer; runs before TensorFlow is imported in the worker."""
+    global _stop
+    apply_process_limits(**limits)
+    _stop = stop
+
+
+def _run_trial(
+    data_dir: str,
+    config: Dict[str, Any],
+    vocab_size: int,
+    num_classes: int,
+    epochs: int
+) -> Dict[str, Any]:
+    """Worker: train one configuration; returns validation metrics, training time and the NumPy weights."""
+    from tensorflow.keras.callbacks import EarlyStopping, Callback
+    from utils.model_config import build_lstm_model
+    from utils.length_buckets import bucketed_dataset
+
+    data = {name: np.load(os.path.join(data_dir, f"{name}.npy"), mmap_mode="r") for name in SHARED_ARRAYS}
+    X_train, y_train, X_val, y_val = (data[name] for name in SHARED_ARRAYS)
+
+    class StopOnCancel(Callback):
+        def on_train_batch_end(self, batch, logs=None):
+            if _stop.is_set():
+                self.model.stop_training = True
+
+    model = build_lstm_model(vocab_size, num_classes, X_train.shape[1], config)
+    model.compile(loss='sparse_categorical_crossentropy', optimizer='adam', metrics=['accuracy'])
+    callbacks = [EarlyStopping(monitor='val_loss', patience=10, restore_best_weights=True), StopOnCancel()]
+
+    batch_size = config["batch_size"]
+    start = time.perf_counter()
+    if settings.LENGTH_BUCKETING_ENABLED:
+        history = model.fit(
+            bucketed_dataset(X_train, y_train, batch_size, shuffle=True),
+            shuffle=False,
+            epochs=epochs,
+            validation_data=bucketed_dataset(X_val, y_val, batch_size, shuffle=False),
+            callbacks=callbacks,
+            verbose=0
+        )
+    else:
+        history = model.fit(
+            X_train, y_train,
+            batch_size=batch_size,
+            epochs=epochs,
+            validation_data=(X_val, y_val),
+            callbacks=callbacks,
+            verbose=0
+        )
+    train_seconds = time.perf_counter() - start
+    if _stop.is_set():
+        return {"status": "cancelled"}
+
+    val_loss, val_accuracy = model.evaluate(X_val, y_val, verbose=0)
+    return {
+        "status": "succeeded",
+        "val_accuracy": float(val_accuracy),
+        "val_loss": float(val_loss),
+        "epochs_run": len(history.history["loss"]),
+        "train_seconds": train_seconds,
+        "parameters": int(model.count_params()),
+        "weights": NumpyLSTM.from_keras_model(model).to_arrays()
+    }
+
+
+def measure_latency(weights, rows: np.ndarray) -> float:
+    """Mean milliseconds per single-message prediction through the NumPy engine."""
+    engine = NumpyLSTM.from_arrays(*weights)
+    engine.predict(rows[:1])
+    start = time.perf_counter()
+    for row in rows:
+        engine.predict(row[None, :])
+    return (time.perf_counter() - start) / len(rows) * 1000.0
+
+
+def run_trials(
+    arrays: Mapping[str, np.ndarray],
+    configs: List[Dict[str, Any]],
+    vocab_size: int,
+    num_classes: int,
+    epochs: int,
+    workers: Optional[int] = None,
+    on_trial_end: Optional[Callable[[int, Dict[str, Any]], None]] = None,
+    should_cancel: Optional[Callable[[], bool]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Train every config in a process pool of `workers` processes (default
+    SEARCH_WORKERS, 0 = one per CPU core). Returns one result per config,
+    in order; on_trial_end(index, result) is called as each one finishes,
+    before its latency_ms is filled in (once every trial is done).
+    When should_cancel() turns true, queued trials are dropped and running
+    ones stop after their current batch.
+    """
+    workers = workers or settings.SEARCH_WORKERS or os.cpu_count() or 1
+    workers = max(1, min(workers, len(configs)))
+    # Priority is inherited from this process; only threads and memory are set per worker
+    limits = {"cpu_threads": 1, "memory_limit_mb": settings.TRAINING_MEMORY_LIMIT_MB, "nice": 0}
+    results: List[Optional[Dict[str, Any]]] = [None] * len(configs)
+    weights: List[Optional[tuple]] = [None] * len(configs)
+
+    ctx = mp.get_context("spawn")
+    stop = ctx.Event()
+    with tempfile.TemporaryDirectory(prefix="search-") as data_dir:
+        for name in SHARED_ARRAYS:
+            np.save(os.path.join(data_dir, f"{name}.npy"), np.ascontiguousarray(arrays[name]))
+
+        print(f"[SEARCH] Running {len(configs)} trials on {workers} worker processes")
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=ctx,
+            initializer=_init_worker,
+            initargs=(limits, stop)
+        ) as pool:
+            pending = {
+                pool.submit(_run_trial, data_dir, config, vocab_size, num_classes, epochs): index
+                for index, config in enumerate(configs)
+            }
+            while pending:
+                done, _ = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+                if not stop.is_set() and should_cancel is not None and should_cancel():
+                    stop.set()
+                    for future in pending:
+                        future.cancel()
+
+                for future in done:
+                    index = pending.pop(future)
+                    if future.cancelled():
+                        result = {"status": "cancelled"}
+                    else:
+                        try:
+                            result = future.result()
+                        except Exception as e:  # Includes a worker killed by the memory limit
+                            result = {"status": "failed", "error": str(e) or e.__class__.__name__}
+                    weights[index] = result.pop("weights", None)
+                    results[index] = result
+                    if on_trial_end is not None:
+                        on_trial_end(index, result)
+
+    rows = np.asarray(arrays["X_val"][:max(1, settings.SEARCH_LATENCY_SAMPLES)])
+    for index, result in enumerate(results):
+        if weights[index] is not None:
+            result["latency_ms"] = measure_latency(weights[index], rows)
+    return results
@@ -0,0 +1,106 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable
+
+
+class PredictionCache:
+    """
+    Bounded LRU + TTL cache for intent predictions.
+
+    Identical concurrent misses are single-flighted: the first caller computes
+    the value and every other caller for the same key waits for its result.
+    `invalidate()` clears everything atomically; computations that started
+    before an invalidation are returned to their callers but never stored.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl_seconds: float = 3600.0):
+        self.max_size = max(1, int(max_size))
+        self.ttl = float(ttl_seconds)
+
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (expires_at, value)
+        self._inflight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self._generation = 0
+
+        # Counters
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Return the cached value for key, computing it at most once if missing."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return entry[1]
+                del self._entries[key]
+                self._expirations += 1
+
+            future = self._inflight.get(key)
+            if future is not None:
+                self._coalesced += 1
+                is_leader = False
+            else:
+                future = Future()
+                self._inflight[key] = future
+                self._misses += 1
+                is_leader = True
+            generation = self._generation
+
+        if not is_leader:
+            return future.result()
+
+        try:
+            value = compute()
+        except Exception as e:
+            with self._lock:
+                if self._inflight.get(key) is future:
+                    del self._inflight[key]
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+            if generation == self._generation:
+                self._entries[key] = (time.monotonic() + self.ttl, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+                    self._evictions += 1
+
+        future.set_result(value)
+        return value
+
+    def invalidate(self):
+        """Drop all entries and in-flight computations."""
+        with self._lock:
+            self._entries.clear()
+            self._inflight.clear()
+            self._generation += 1
+            self._invalidations += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss/eviction counters."""
+        with self._lock:
+            lookups = self._hits + self._misses + self._coalesced
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "coalesced": self._coalesced,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "invalidations": self._invalidations,
+                "hit_rate": round((self._hits + self._coalesced) / lookups, 4) if lookups else 0.0
+            }
@@ -0,0 +1,470 @@
+import os
+import json
+import time
+import uuid
+import queue
+import threading
+import contextlib
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from config.settings import get_settings
+
+try:
+    import fcntl  # Cross-process artifact lock (POSIX)
+except ImportError:
+    fcntl = None
+
+
+settings = get_settings()
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class TrainingJob:
+    """One retrain or hyperparameter search request: parameters, state, progress and result."""
+
+    def __init__(
+        self,
+        epochs: int,
+        split_ratio: str,
+        force: bool = False,
+        incremental: bool = False,
+        search: Optional[Dict[str, Any]] = None
+    ):
+        self.id = uuid.uuid4().hex[:12]
+        self.epochs = epochs
+        self.split_ratio = split_ratio
+        self.force = force  # Train even if data and parameters match the served model
+        self.incremental = incremental  # Warm-start from the served model
+        self.search = search  # Search parameters (objective, max_trials, workers, promote); None for a retrain
+        self.status = QUEUED
+        self.created_at = _now()
+        self.started_at: Optional[str] = None
+        self.finished_at: Optional[str] = None
+        self.progress: List[Dict[str, Any]] = []  # One entry per finished epoch (search: per finished trial)
+        self.message: Optional[str] = None
+        self.training_id: Optional[int] = None  # training_history row of a successful run
+        self.metrics: Dict[str, Any] = {}
+        self._cancel = threading.Event()
+        self._done = threading.Event()
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in FINISHED_STATES
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the job finishes. Returns False on timeout."""
+        return self._done.wait(timeout)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TrainingJob":
+        """Snapshot of a job run by another API process, rebuilt from its to_dict() state."""
+        job = cls(data["epochs"], data["split_ratio"], data["force"], data["incremental"], data["search"])
+        job.id = data["id"]
+        job.status = data["status"]
+        job.created_at = data["created_at"]
+        job.started_at = data["started_at"]
+        job.finished_at = data["finished_at"]
+        job.progress = data.get("progress", [])
+        job.message = data["message"]
+        job.training_id = data["training_id"]
+        job.metrics = {"search_id": data["search_id"], "skipped": data["skipped"]}
+        if data["cancel_requested"]:
+            job._cancel.set()
+        if job.is_finished:
+            job._done.set()
+        return job
+
+    def _finish(self, status: str, message: str):
+        self.status = status
+        self.message = message
+        self.finished_at = _now()
+        _save_job(self)  # Before waiters wake up, so the saved state is final when they read it
+        self._done.set()
+
+    def to_dict(self, include_progress: bool = True) -> Dict[str, Any]:
+        progress = list(self.progress)
+        data = {
+            "id": self.id,
+            "kind": "search" if self.search is not None else "train",
+            "status": self.status,
+            "epochs": self.epochs,
+            "split_ratio": self.split_ratio,
+            "force": self.force,
+            "incremental": self.incremental,
+            "search": self.search,
+            "search_id": self.metrics.get("search_id"),
+            "skipped": bool(self.metrics.get("skipped")),
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "current_epoch": progress[-1].get("epoch", 0) if progress else 0,
+            "latest": progress[-1] if progress else None,
+            "message": self.message,
+            "training_id": self.training_id,
+            "cancel_requested": self.cancel_requested
+        }
+        if include_progress:
+            data["progress"] = progress
+        return data
+
+
+@contextlib.contextmanager
+def _artifact_lock():
+    """Serialize artifact writes across API processes (each process runs one job at a time)."""
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(os.path.dirname(settings.TRAINING_LOCK_PATH) or ".", exist_ok=True)
+    with open(settings.TRAINING_LOCK_PATH, "w") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _save_job(job: TrainingJob, new: bool = False):
+    """Write a job's current state to the training_jobs table (best effort: the job keeps running)."""
+    from config.database import SessionLocal
+    from schema.models import TrainingJobRecord
+
+    db = SessionLocal()
+    try:
+        state = json.dumps(job.to_dict())
+        if new:
+            db.add(TrainingJobRecord(id=job.id, status=job.status, state=state, heartbeat=time.time()))
+        else:
+            db.query(TrainingJobRecord).filter(TrainingJobRecord.id == job.id).update(
+                {"status": job.status, "state": state, "heartbeat": time.time()}, synchronize_session=False
+            )
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"Warning: Could not save training job {job.id}: {e}")
+    finally:
+        db.close()
+
+
+def _load_jobs(job_id: Optional[str] = None) -> List[TrainingJob]:
+    """
+    Jobs from the training_jobs table (one, or all newest first). An
+    unfinished job whose process stopped sending heartbeats is reported
+    as failed.
+    """
+    from config.database import SessionLocal
+    from schema.models import TrainingJobRecord
+
+    db = SessionLocal()
+    try:
+        query = db.query(TrainingJobRecord)
+        if job_id is not None:
+            query = query.filter(TrainingJobRecord.id == job_id)
+        rows = query.order_by(TrainingJobRecord.created_at.desc()).all()
+    finally:
+        db.close()
+
+    stale_before = time.time() - settings.TRAINING_JOB_STALE_SECONDS
+    jobs = []
+    for row in rows:
+        state = json.loads(row.state)
+        state["cancel_requested"] = state["cancel_requested"] or bool(row.cancel_requested)
+        if state["status"] not in FINISHED_STATES and (row.heartbeat or 0) < stale_before:
+            state.update(status=FAILED, message="Training job lost: the API process running it stopped")
+        jobs.append(TrainingJob.from_dict(state))
+    return jobs
+
+
+class TrainingJobManager:
+    """
+    Runs retrain jobs one at a time on a background thread.
+
+    Submitting returns immediately; progress, cancellation and the result
+    are read from the job. Job state is mirrored to the training_jobs
+    table, so every API process can report and cancel jobs run by another
+    one. Only the most recent `history_size` finished jobs are kept.
+    """
+
+    def __init__(self, history_size: int = 50, poll_seconds: float = 1.0):
+        self.history_size = max(1, history_size)
+        self.poll_seconds = max(0.1, poll_seconds)
+        self._jobs: "OrderedDict[str, TrainingJob]" = OrderedDict()
+        self._queue: "queue.Queue[TrainingJob]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._monitor_thread: Optional[threading.Thread] = None
+
+    def submit(
+        self,
+        epochs: int,
+        split_ratio: str,
+        force: bool = False,
+        incremental: bool = False,
+        search: Optional[Dict[str, Any]] = None
+    ) -> TrainingJob:
+        """Queue a retrain (or, with search parameters, a hyperparameter search) and return its job."""
+        job = TrainingJob(epochs, split_ratio, force, incremental, search)
+        _save_job(job, new=True)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="training-jobs", daemon=True)
+                self._thread.start()
+            if self._monitor_thread is None or not self._monitor_thread.is_alive():
+                self._monitor_thread = threading.Thread(target=self._monitor, name="training-jobs-monitor", daemon=True)
+                self._monitor_thread.start()
+        self._prune_saved()
+        self._queue.put(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[TrainingJob]:
+        """The live job if this process runs it, else a snapshot from the database."""
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return job
+        jobs = _load_jobs(job_id)
+        return jobs[0] if jobs else None
+
+    def is_local(self, job_id: str) -> bool:
+        """True if this process runs (or ran) the job, so get() returns the live object."""
+        return job_id in self._jobs
+
+    def list_jobs(self) -> List[TrainingJob]:
+        """Jobs of all API processes, newest first."""
+        with self._lock:
+            local = dict(self._jobs)
+        return [local.get(job.id, job) for job in _load_jobs()]
+
+    def cancel(self, job_id: str) -> Optional[TrainingJob]:
+        """
+        Request cancellation. Queued jobs never start; running jobs stop after
+        the current batch (within TRAINING_JOB_POLL_SECONDS when another
+        process runs them). Returns the job as seen after the request.
+        """
+        from config.database import SessionLocal
+        from schema.models import TrainingJobRecord
+
+        job = self.get(job_id)
+        if job is None or job.is_finished:
+            return job
+        if job_id in self._jobs:
+            job._cancel.set()
+            _save_job(job)
+            return job
+
+        db = SessionLocal()
+        try:
+            db.query(TrainingJobRecord).filter(
+                TrainingJobRecord.id == job_id,
+                TrainingJobRecord.status.notin_(FINISHED_STATES)
+            ).update({"cancel_requested": True}, synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+        return self.get(job_id)
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.is_finished]
+        for job_id in finished[:max(0, len(finished) - self.history_size)]:
+            del self._jobs[job_id]
+
+    def _prune_saved(self):
+        """Delete all but the newest history_size finished (or lost) jobs from the table."""
+        from sqlalchemy import or_
+        from config.database import SessionLocal
+        from schema.models import TrainingJobRecord
+
+        db = SessionLocal()
+        try:
+            expired = [
+                row.id for row in db.query(TrainingJobRecord.id)
+                .filter(or_(
+                    TrainingJobRecord.status.in_(FINISHED_STATES),
+                    TrainingJobRecord.heartbeat < time.time() - settings.TRAINING_JOB_STALE_SECONDS
+                ))
+                .order_by(TrainingJobRecord.created_at.desc())
+                .offset(self.history_size)
+            ]
+            if expired:
+                db.query(TrainingJobRecord).filter(TrainingJobRecord.id.in_(expired)).delete(synchronize_session=False)
+                db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"Warning: Could not prune training jobs: {e}")
+        finally:
+            db.close()
+
+    def _monitor(self):
+        """
+        Every poll_seconds, mark this process's unfinished jobs as alive and
+        pick up cancel requests made for them through other API processes.
+        """
+        from config.database import SessionLocal
+        from schema.models import TrainingJobRecord
+
+        while True:
+            time.sleep(self.poll_seconds)
+            with self._lock:
+                active = {job.id: job for job in self._jobs.values() if not job.is_finished}
+            if not active:
+                continue
+
+            db = SessionLocal()
+            try:
+                db.query(TrainingJobRecord).filter(TrainingJobRecord.id.in_(active)).update(
+                    {"heartbeat": time.time()}, synchronize_session=False
+                )
+                cancelled = [
+                    row.id for row in db.query(TrainingJobRecord.id)
+                    .filter(TrainingJobRecord.id.in_(active), TrainingJobRecord.cancel_requested.is_(True))
+                ]
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                print(f"Warning: Could not update training job heartbeats: {e}")
+                cancelled = []
+            finally:
+                db.close()
+            for job_id in cancelled:
+                active[job_id]._cancel.set()
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            if job.cancel_requested:
+                job._finish(CANCELLED, "Cancelled before start")
+                continue
+            try:
+                self._execute(job)
+            except Exception as e:
+                job._finish(FAILED, f"Training failed: {e}")
+
+    def _execute(self, job: TrainingJob):
+        from service.chat_service import ChatService
+
+        def on_epoch_end(epoch: int, logs: Dict[str, Any]):
+            job.progress.append({
+                "epoch": epoch,
+                **{key: round(float(value), 6) for key, value in logs.items()}
+            })
+            _save_job(job)
+
+        def on_trial_end(trial: int, summary: Dict[str, Any]):
+            job.progress.append(dict(summary, trial=trial))
+            _save_job(job)
+
+        with _artifact_lock():
+            if job.cancel_requested:
+                job._finish(CANCELLED, "Cancelled before start")
+                return
+            job.status = RUNNING
+            job.started_at = _now()
+            _save_job(job)
+            start = time.perf_counter()
+            if job.search is not None:
+                success, message, metrics = _search(job, on_trial_end)
+            else:
+                success, message, metrics = _train(job, on_epoch_end)
+
+        if job.cancel_requested and not success:
+            job._finish(CANCELLED, message)
+            return
+        if not success:
+            job._finish(FAILED, message)
+            return
+
+        job.metrics = metrics
+        job.training_id = metrics.get("training_id")
+        # Serve the new model here now; other workers follow via the version watcher
+        ChatService.reload_model(wait=True, only_if_changed=True)
+        job._finish(SUCCEEDED, f"{message}\n• Duration: {time.perf_counter() - start:.1f}s")
+
+
+def _train(job: TrainingJob, on_epoch_end):
+    """Run one training, isolated in a child process unless TRAINING_IN_SUBPROCESS is off."""
+    from config.database import SessionLocal
+    from service.training_service import TrainingService
+
+    if settings.TRAINING_IN_SUBPROCESS:
+        if not job.force:
+            # Unchanged data and parameters: answer without starting a process
+            db = SessionLocal()
+            try:
+                current = TrainingService(db).find_current_training(job.epochs, job.split_ratio, job.incremental)
+            finally:
+                db.close()
+            if current is not None:
+                return (True,) + current
+
+        from service.training_process import train_in_subprocess
+        return train_in_subprocess(
+            epochs=job.epochs,
+            split_ratio=job.split_ratio,
+            on_epoch_end=on_epoch_end,
+            should_cancel=lambda: job.cancel_requested,
+            force=job.force,
+            incremental=job.incremental
+        )
+
+    db = SessionLocal()
+    try:
+        return TrainingService(db).train_model(
+            epochs=job.epochs,
+            split_ratio=job.split_ratio,
+            on_epoch_end=on_epoch_end,
+            should_cancel=lambda: job.cancel_requested,
+            force=job.force,
+            incremental=job.incremental
+        )
+    finally:
+        db.close()
+
+
+def _search(job: TrainingJob, on_trial_end):
+    """Run one hyperparameter search, isolated in a child process unless TRAINING_IN_SUBPROCESS is off."""
+    if settings.TRAINING_IN_SUBPROCESS:
+        from service.training_process import search_in_subprocess
+        return search_in_subprocess(
+            epochs=job.epochs,
+            split_ratio=job.split_ratio,
+            on_trial_end=on_trial_end,
+            should_cancel=lambda: job.cancel_requested,
+            **job.search
+        )
+
+    from config.database import SessionLocal
+    from service.training_service import TrainingService
+
+    db = SessionLocal()
+    try:
+        return TrainingService(db).search_model_config(
+            epochs=job.epochs,
+            split_ratio=job.split_ratio,
+            on_trial_end=on_trial_end,
+            should_cancel=lambda: job.cancel_requested,
+            **job.search
+        )
+    finally:
+        db.close()
+
+
+training_jobs = TrainingJobManager(
+    history_size=settings.TRAINING_JOB_HISTORY_SIZE,
+    poll_seconds=settings.TRAINING_JOB_POLL_SECONDS
+)
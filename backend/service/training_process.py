@@ -0,0 +1,218 @@
+"""
+Run TrainingService.train_model (or a hyperparameter search) in a child process.
+
+TensorFlow, the Keras graph and every training buffer live and die with the
+child, so repeated retrains do not grow the API process. The child runs with
+limited CPU threads, lower scheduling priority, an address-space cap and a
+wall-clock timeout; per-epoch (or per-trial) progress and the final result
+come back over a queue.
+
+On POSIX the child leads its own process group, so stopping it also stops
+the trial worker processes of a search.
+"""
+
+import os
+import time
+import queue
+import signal
+import multiprocessing as mp
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from config.settings import get_settings
+
+try:
+    import resource  # Memory limit (POSIX)
+except ImportError:
+    resource = None
+
+
+settings = get_settings()
+
+_CANCEL_GRACE_SECONDS = 30.0  # Time a cancelled or timed-out child gets to stop on its own
+
+
+def apply_process_limits(cpu_threads: int, memory_limit_mb: int, nice: int):
+    """Process-wide limits; must run before TensorFlow is imported."""
+    if cpu_threads > 0:
+        for var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+            os.environ[var] = str(cpu_threads)
+        os.environ["TF_NUM_INTRAOP_THREADS"] = str(cpu_threads)
+        os.environ["TF_NUM_INTEROP_THREADS"] = str(cpu_threads)
+    if nice > 0 and hasattr(os, "nice"):
+        os.nice(nice)
+    if memory_limit_mb > 0 and resource is not None:
+        limit = memory_limit_mb << 20
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _child_main(
+    method: str,
+    kwargs: Dict[str, Any],
+    progress_arg: str,
+    limits: Dict[str, int],
+    events,
+    cancel
+):
+    """Child process: run TrainingService.<method>, report ("progress", n, data) events, then ("result", ...)."""
+    if hasattr(os, "setsid"):
+        os.setsid()  # Own process group, inherited by trial workers (see _stop_process_group)
+    try:
+        apply_process_limits(**limits)
+
+        from config.database import SessionLocal
+        from service.training_service import TrainingService
+
+        db = SessionLocal()
+        try:
+            kwargs[progress_arg] = lambda step, data: events.put(("progress", step, data))
+            result = getattr(TrainingService(db), method)(should_cancel=cancel.is_set, **kwargs)
+        finally:
+            db.close()
+    except MemoryError:
+        result = (False, f"Training failed: memory limit of {limits['memory_limit_mb']} MB exceeded", {})
+    except Exception as e:
+        result = (False, f"Training failed: {e}", {})
+    events.put(("result",) + tuple(result))
+
+
+def train_in_subprocess(
+    epochs: int = 100,
+    split_ratio: str = "70:30",
+    on_epoch_end: Optional[Callable[[int, Dict[str, float]], None]] = None,
+    should_cancel: Optional[Callable[[], bool]] = None,
+    force: bool = False,
+    incremental: bool = False,
+    timeout: Optional[float] = None
+) -> Tuple[bool, str, Dict[str, Any]]:
+    """
+    Same contract as TrainingService.train_model, but isolated in a child process.
+    Limits come from the TRAINING_* settings; timeout defaults to TRAINING_TIMEOUT_SECONDS.
+    """
+    return _run_in_subprocess(
+        "train_model",
+        {"epochs": epochs, "split_ratio": split_ratio, "force": force, "incremental": incremental},
+        "on_epoch_end", on_epoch_end, should_cancel,
+        settings.TRAINING_TIMEOUT_SECONDS if timeout is None else timeout
+    )
+
+
+def search_in_subprocess(
+    epochs: int = 100,
+    split_ratio: str = "70:30",
+    objective: Optional[str] = None,
+    max_trials: Optional[int] = None,
+    workers: Optional[int] = None,
+    promote: bool = True,
+    on_trial_end: Optional[Callable[[int, Dict[str, Any]], None]] = None,
+    should_cancel: Optional[Callable[[], bool]] = None,
+    timeout: Optional[float] = None
+) -> Tuple[bool, str, Dict[str, Any]]:
+    """
+    Same contract as TrainingService.search_model_config, but isolated in a
+    child process (whose trial workers inherit its limits).
+    Timeout defaults to SEARCH_TIMEOUT_SECONDS.
+    """
+    return _run_in_subprocess(
+        "search_model_config",
+        {
+            "epochs": epochs, "split_ratio": split_ratio, "objective": objective,
+            "max_trials": max_trials, "workers": workers, "promote": promote
+        },
+        "on_trial_end", on_trial_end, should_cancel,
+        settings.SEARCH_TIMEOUT_SECONDS if timeout is None else timeout,
+        daemon=False  # Daemonic processes cannot start the trial worker pool
+    )
+
+
+def _stop_process_group(process, kill: bool = False):
+    """SIGTERM (or SIGKILL) the child and everything it started; the child alone where there are no process groups."""
+    if hasattr(os, "killpg"):
+        try:
+            os.killpg(process.pid, signal.SIGKILL if kill else signal.SIGTERM)
+            return
+        except ProcessLookupError:  # Group already gone, or the child has not called setsid yet
+            pass
+    if process.is_alive():
+        if kill:
+            process.kill()
+        else:
+            process.terminate()
+
+
+def _run_in_subprocess(
+    method: str,
+    kwargs: Dict[str, Any],
+    progress_arg: str,
+    on_progress: Optional[Callable[[int, Dict[str, Any]], None]],
+    should_cancel: Optional[Callable[[], bool]],
+    timeout: float,
+    daemon: bool = True
+) -> Tuple[bool, str, Dict[str, Any]]:
+    limits = {
+        "cpu_threads": settings.TRAINING_CPU_THREADS,
+        "memory_limit_mb": settings.TRAINING_MEMORY_LIMIT_MB,
+        "nice": settings.TRAINING_PROCESS_NICE
+    }
+
+    # spawn: a fresh interpreter, never a fork of the threaded API process
+    ctx = mp.get_context("spawn")
+    events = ctx.Queue()
+    cancel = ctx.Event()
+    process = ctx.Process(
+        target=_child_main,
+        args=(method, kwargs, progress_arg, limits, events, cancel),
+        name="training",
+        daemon=daemon
+    )
+    process.start()
+    print(f"[TRAIN] Training process started for {method} (pid {process.pid}, limits {limits})")
+
+    start = time.monotonic()
+    stop_deadline = None
+    timed_out = False
+    result = None
+    try:
+        while result is None:
+            try:
+                event = events.get(timeout=0.5)
+            except queue.Empty:
+                event = None
+                if not process.is_alive():
+                    # Its last messages may still be in flight
+                    try:
+                        event = events.get(timeout=1.0)
+                    except queue.Empty:
+                        result = (False, f"Training process exited unexpectedly (exit code {process.exitcode})", {})
+                        break
+
+            if event is not None and event[0] == "progress":
+                if on_progress is not None:
+                    on_progress(event[1], event[2])
+            elif event is not None:
+                result = event[1:]
+                break
+
+            now = time.monotonic()
+            if stop_deadline is None:
+                if timeout and now - start > timeout:
+                    timed_out = True
+                if timed_out or (should_cancel is not None and should_cancel()):
+                    cancel.set()
+                    stop_deadline = now + _CANCEL_GRACE_SECONDS
+            elif now > stop_deadline:
+                _stop_process_group(process)
+                result = (False, "Training process terminated", {})
+                break
+    finally:
+        process.join(_CANCEL_GRACE_SECONDS)
+        if process.exitcode != 0:
+            # Still running, or killed/crashed with trial workers possibly left behind
+            _stop_process_group(process, kill=True)
+            process.join()
+        events.close()
+
+    success, message, metrics = result
+    if timed_out and not success:
+        message = f"Training timed out after {timeout:.0f}s"
+    print(f"[TRAIN] Training process finished in {time.monotonic() - start:.1f}s (exit code {process.exitcode})")
+    return success, message, metrics
@@ -1,20 +1,27 @@
+import os
 import json
+import time
+import uuid
 import pickle
 import numpy as np
-from typing import Tuple, Dict, Any, Optional
+from typing import Tuple, Dict, Any, Optional, Callable, List
 from sqlalchemy.orm import Session
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import Embedding, LSTM, Dense, Dropout
-from tensorflow.keras.preprocessing.text import Tokenizer
-from tensorflow.keras.preprocessing.sequence import pad_sequences
-from tensorflow.keras.callbacks import EarlyStopping
-from sklearn.preprocessing import LabelEncoder
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import classification_report, confusion_matrix
 
 from service.intent_service import IntentService
 from config.settings import get_settings
-from utils.nlp_utils import preprocess_text
+from utils.nlp_utils import preprocess_batch
+from utils.numpy_lstm import NumpyLSTM
+from utils.vocab_encoder import VocabEncoder
+from utils.fast_classifier import FastIntentClassifier, calibrate_threshold, cascade_metrics
+from utils.model_version import read_version_file, staging_path, publish_artifacts
+from utils.training_cache import PreparedDataCache, DataFingerprint, training_fingerprint
+from utils.training_data import TrainingSetBuilder
+from utils.warm_start import transplant_weights, select_finetune_samples
+from utils.length_buckets import sequence_lengths, bucketed_dataset
+from utils.model_config import (
+    OBJECTIVES, normalize_model_config, load_model_config, save_model_config,
+    build_lstm_model, search_configurations, select_best_trial
+)
 
 
 settings = get_settings()
@@ -38,108 +45,287 @@ class TrainingService:
             # So effectively: 55% train, 15% val, 30% test
             return 0.30, 0.214  # test_split, val_ratio (15% of 70% ≈ 21.4% of remaining)
     
+    def _split(self, X: np.ndarray, y: np.ndarray, split_ratio: str):
+        """Stratified train/validation/test split; returns X_train, X_val, X_test, y_train, y_val, y_test."""
+        from sklearn.model_selection import train_test_split
+        
+        test_split, val_ratio = self._parse_split_ratio(split_ratio)
+        
+        # First split: separate test set
+        X_temp, X_test, y_temp, y_test = train_test_split(
+            X, y, 
+            test_size=test_split, 
+            random_state=42, 
+            stratify=y
+        )
+        
+        # Second split: separate validation from training
+        X_train, X_val, y_train, y_val = train_test_split(
+            X_temp, y_temp, 
+            test_size=val_ratio, 
+            random_state=42, 
+            stratify=y_temp
+        )
+        return X_train, X_val, X_test, y_train, y_val, y_test
+    
+    def _load_training_set(self, chunks: List[Tuple[List[str], List[str]]], base_tokenizer=None):
+        """
+        Run the (patterns, tags) chunks read by _data_fingerprint through
+        preprocessing and tokenization. Returns tokenizer, encoder, X, y.
+        """
+        builder = TrainingSetBuilder(settings.MAX_SEQUENCE_LENGTH, base_tokenizer)
+        print("\n[NLP] Preprocessing training data...")
+        start = time.perf_counter()
+        for sentences, labels in chunks:
+            processed_sentences = preprocess_batch(sentences, workers=settings.PREPROCESS_WORKERS)
+            if builder.rows == 0:
+                for s, processed in list(zip(sentences, processed_sentences))[:5]:
+                    print(f"[NLP] Processing: '{s}' -> '{processed}'")
+            builder.add(processed_sentences, labels)
+        print(f"[NLP] Loaded, preprocessed and tokenized {builder.rows} sentences in "
+              f"{(time.perf_counter() - start) * 1000:.1f} ms.\n")
+        return builder.build()
+    
+    def _prepare_data(self, split_ratio: str, data: DataFingerprint, chunks: List[Tuple[List[str], List[str]]]):
+        """
+        Preprocess, tokenize, pad and split the rows read with data, or
+        reuse the cached result for the same data fingerprint. Returns
+        tokenizer, encoder and the train/validation/test arrays.
+        """
+        from tensorflow.keras.preprocessing.text import tokenizer_from_json
+        from sklearn.preprocessing import LabelEncoder
+        
+        cache = PreparedDataCache(settings.TRAINING_CACHE_DIR, settings.TRAINING_CACHE_MAX_ENTRIES)
+        data_fp = data.hexdigest()
+        cached = cache.load(data_fp)
+        if cached is not None:
+            print(f"[CACHE] Reusing prepared data {data_fp[:12]}")
+            tokenizer = tokenizer_from_json(str(cached["tokenizer"]))
+            encoder = LabelEncoder()
+            encoder.classes_ = cached["class_names"]
+            return (
+                tokenizer, encoder,
+                cached["X_train"], cached["X_val"], cached["X_test"],
+                cached["y_train"], cached["y_val"], cached["y_test"]
+            )
+        
+        tokenizer, encoder, X, y = self._load_training_set(chunks)
+        X_train, X_val, X_test, y_train, y_val, y_test = self._split(X, y, split_ratio)
+        
+        cache.save(data_fp, {
+            "tokenizer": np.array(tokenizer.to_json()),
+            "class_names": np.asarray(encoder.classes_),
+            "X_train": X_train, "X_val": X_val, "X_test": X_test,
+            "y_train": y_train, "y_val": y_val, "y_test": y_test
+        })
+        return tokenizer, encoder, X_train, X_val, X_test, y_train, y_val, y_test
+    
+    def _model_config(self, model_config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """The given config completed with defaults, else the promoted one (MODEL_CONFIG_PATH), else the defaults."""
+        if model_config is not None:
+            return normalize_model_config(model_config, batch_size=settings.BATCH_SIZE)
+        return load_model_config(settings.MODEL_CONFIG_PATH, batch_size=settings.BATCH_SIZE)
+    
+    def _build_model(
+        self,
+        vocab_size: int,
+        num_classes: int,
+        input_length: int,
+        model_config: Optional[Dict[str, Any]] = None
+    ):
+        """Intent classifier with the architecture of model_config (see _model_config)."""
+        return build_lstm_model(vocab_size, num_classes, input_length, self._model_config(model_config))
+    
+    def _optimizer(self, learning_rate: Optional[float] = None):
+        """Adam; default learning rate unless one is given (fine-tuning)."""
+        from tensorflow.keras.optimizers import Adam
+        return Adam() if learning_rate is None else Adam(learning_rate=learning_rate)
+    
+    def _can_warm_start(self) -> bool:
+        """True if the current model, tokenizer and encoder exist to fine-tune from."""
+        return all(os.path.exists(path) for path in (settings.MODEL_PATH, settings.TOKENIZER_PATH, settings.ENCODER_PATH))
+    
+    def _prepare_incremental_data(self, split_ratio: str, chunks: List[Tuple[List[str], List[str]]]):
+        """
+        Like _prepare_data, but keeps the current model's word ids: its
+        tokenizer is extended with new words instead of refitted.
+        Returns the current model and encoder, the old vocabulary size,
+        then the same values as _prepare_data.
+        """
+        from tensorflow.keras.models import load_model
+        
+        old_model = load_model(settings.MODEL_PATH)
+        with open(settings.TOKENIZER_PATH, 'rb') as f:
+            tokenizer = pickle.load(f)
+        with open(settings.ENCODER_PATH, 'rb') as f:
+            old_encoder = pickle.load(f)
+        
+        old_vocab_size = len(tokenizer.word_index)
+        tokenizer, encoder, X, y = self._load_training_set(chunks, base_tokenizer=tokenizer)
+        print(f"[TRAIN] Vocabulary extended: {old_vocab_size} -> {len(tokenizer.word_index)} words")
+        
+        X_train, X_val, X_test, y_train, y_val, y_test = self._split(X, y, split_ratio)
+        return old_model, old_encoder, old_vocab_size, tokenizer, encoder, X_train, X_val, X_test, y_train, y_val, y_test
+    
     def train_model(
         self, 
         epochs: int = 100, 
-        split_ratio: str = "70:30"
+        split_ratio: str = "70:30",
+        on_epoch_end: Optional[Callable[[int, Dict[str, float]], None]] = None,
+        should_cancel: Optional[Callable[[], bool]] = None,
+        force: bool = False,
+        incremental: bool = False,
+        model_config: Optional[Dict[str, Any]] = None
     ) -> Tuple[bool, str, Dict[str, Any]]:
         """
         Train LSTM model using data from database with proper train-validation-test split.
         Returns (success, message, metrics).
+        
+        Unless force is set, a request whose training fingerprint (intents +
+        split + hyperparameters) matches the served model returns that
+        model's training record without training.
+        
+        incremental warm-starts from the current model: known words and
+        intents keep their learned weights, and it fine-tunes for at most
+        INCREMENTAL_MAX_EPOCHS on the samples it does not handle yet plus a
+        replay of the others. Without a current model it trains from scratch.
+        
+        on_epoch_end(epoch, logs) receives loss/accuracy after every epoch;
+        when should_cancel() turns true, training stops after the current
+        batch and nothing is saved.
+        
+        model_config (architecture and batch size) defaults to the one
+        promoted by the last hyperparameter search.
         """
         try:
-            # Get training data from database
-            sentences, labels = self.intent_service.get_training_data()
+            model_config = self._model_config(model_config)
+            
+            # One read of the patterns gives both the fingerprint (skip check, cache key) and
+            # the rows to train on, so they cannot disagree
+            chunks = []
+            data = self._data_fingerprint(split_ratio, chunks)
             
-            if len(sentences) == 0:
+            if data.rows == 0:
                 return False, "No training data found in database. Please add intents first.", {}
             
-            if len(set(labels)) < 2:
+            if len(data.tags) < 2:
                 return False, "Need at least 2 different intents for training.", {}
             
-            # Preprocess sentences
-            print(f"\n[NLP] Starting preprocessing for {len(sentences)} sentences...")
-            processed_sentences = []
-            for i, s in enumerate(sentences):
-                processed = preprocess_text(s)
-                processed_sentences.append(processed)
-                print(f"[NLP] Processing: '{s}' -> '{processed}'")
-            sentences = processed_sentences
-            print("[NLP] Preprocessing completed.\n")
-            
-            # Encode labels
-            encoder = LabelEncoder()
-            encoded_labels = encoder.fit_transform(labels)
-            num_classes = len(set(labels))
-            class_names = list(encoder.classes_)
+            if incremental and not self._can_warm_start():
+                print("[TRAIN] No current model to warm-start from; training from scratch")
+                incremental = False
+            training_mode = "incremental" if incremental else "full"
+            data_fp = data.hexdigest()
+            fingerprint = self._training_fingerprint(data_fp, epochs, incremental, model_config)
+            print(f"[CACHE] Training fingerprint {fingerprint[:12]} (data {data_fp[:12]}, {data.rows} patterns)")
             
-            # Tokenize
-            tokenizer = Tokenizer()
-            tokenizer.fit_on_texts(sentences)
-            sequences = tokenizer.texts_to_sequences(sentences)
-            X = pad_sequences(sequences, maxlen=settings.MAX_SEQUENCE_LENGTH)
-            y = np.array(encoded_labels)
-            
-            # ========== TRAIN-VALIDATION-TEST SPLIT ==========
-            test_split, val_ratio = self._parse_split_ratio(split_ratio)
-            
-            # First split: separate test set
-            X_temp, X_test, y_temp, y_test = train_test_split(
-                X, y, 
-                test_size=test_split, 
-                random_state=42, 
-                stratify=y
-            )
+            if not force:
+                current = self._find_current_training(fingerprint)
+                if current is not None:
+                    return (True,) + current
             
-            # Second split: separate validation from training
-            X_train, X_val, y_train, y_val = train_test_split(
-                X_temp, y_temp, 
-                test_size=val_ratio, 
-                random_state=42, 
-                stratify=y_temp
-            )
+            # Heavy ML imports are deferred until training actually runs
+            from tensorflow.keras.callbacks import EarlyStopping, Callback
+            from sklearn.metrics import classification_report, confusion_matrix
+            
+            if incremental:
+                (
+                    old_model, old_encoder, old_vocab_size,
+                    tokenizer, encoder, X_train, X_val, X_test, y_train, y_val, y_test
+                ) = self._prepare_incremental_data(split_ratio, chunks)
+            else:
+                tokenizer, encoder, X_train, X_val, X_test, y_train, y_val, y_test = self._prepare_data(
+                    split_ratio, data, chunks
+                )
+            del chunks
+            class_names = list(encoder.classes_)
+            num_classes = len(class_names)
+            total_samples = len(X_train) + len(X_val) + len(X_test)
             
             print(f"\n[SPLIT] Dataset split ({split_ratio}):")
-            print(f"  - Training:   {len(X_train)} samples ({len(X_train)/len(X)*100:.1f}%)")
-            print(f"  - Validation: {len(X_val)} samples ({len(X_val)/len(X)*100:.1f}%)")
-            print(f"  - Testing:    {len(X_test)} samples ({len(X_test)/len(X)*100:.1f}%)")
-            print(f"  - Total:      {len(X)} samples\n")
+            print(f"  - Training:   {len(X_train)} samples ({len(X_train)/total_samples*100:.1f}%)")
+            print(f"  - Validation: {len(X_val)} samples ({len(X_val)/total_samples*100:.1f}%)")
+            print(f"  - Testing:    {len(X_test)} samples ({len(X_test)/total_samples*100:.1f}%)")
+            print(f"  - Total:      {total_samples} samples\n")
             
             # ========== BUILD MODEL ==========
-            model = Sequential()
-            model.add(Embedding(len(tokenizer.word_index) + 1, 32, input_length=X.shape[1]))
-            model.add(LSTM(32, return_sequences=False))
-            model.add(Dropout(0.3))
-            model.add(Dense(16, activation='relu'))
-            model.add(Dropout(0.2))
-            model.add(Dense(num_classes, activation='softmax'))
+            model = self._build_model(len(tokenizer.word_index) + 1, num_classes, X_train.shape[1], model_config)
+            
+            X_fit, y_fit = X_train, y_train
+            epochs_to_run, patience = epochs, 10
+            new_samples = replay_samples = None
+            if incremental:
+                # ========== WARM START ==========
+                try:
+                    transplant_weights(old_model, model, list(old_encoder.classes_), class_names)
+                except ValueError as e:
+                    print(f"Warning: {e}; training from scratch")
+                    incremental = False
+                    training_mode = "full"
+            if incremental:
+                fit_idx, new_samples, replay_samples = select_finetune_samples(
+                    old_model, list(old_encoder.classes_), old_vocab_size,
+                    X_train, y_train, class_names,
+                    replay_ratio=settings.INCREMENTAL_REPLAY_RATIO,
+                    replay_min=settings.INCREMENTAL_REPLAY_MIN
+                )
+                X_fit, y_fit = X_train[fit_idx], y_train[fit_idx]
+                epochs_to_run, patience = min(epochs, settings.INCREMENTAL_MAX_EPOCHS), 5
+                print(f"[TRAIN] Warm start: fine-tuning on {new_samples} new + {replay_samples} replayed samples")
             
             model.compile(
                 loss='sparse_categorical_crossentropy',
-                optimizer='adam',
+                optimizer=self._optimizer(settings.INCREMENTAL_LEARNING_RATE if incremental else None),
                 metrics=['accuracy']
             )
             
             # Early stopping to prevent overfitting
             early_stopping = EarlyStopping(
                 monitor='val_loss',
-                patience=10,
+                patience=patience,
                 restore_best_weights=True,
                 verbose=1
             )
             
+            # Progress reporting and cancellation for background training jobs
+            class JobCallback(Callback):
+                cancelled = False
+                
+                def on_train_batch_end(self, batch, logs=None):
+                    if should_cancel is not None and should_cancel():
+                        self.cancelled = True
+                        self.model.stop_training = True
+                
+                def on_epoch_end(self, epoch, logs=None):
+                    if on_epoch_end is not None and not self.cancelled:
+                        on_epoch_end(epoch + 1, dict(logs or {}))
+            
+            job_callback = JobCallback()
+            
             # ========== TRAIN WITH VALIDATION ==========
-            batch_size = settings.BATCH_SIZE
-            print(f"[TRAIN] Starting training with {epochs} epochs, batch_size={batch_size}")
+            batch_size = model_config["batch_size"]
+            print(f"[TRAIN] Starting {training_mode} training with {epochs_to_run} epochs, batch_size={batch_size}")
+            print(f"[TRAIN] Model config: {model_config}")
+            if settings.LENGTH_BUCKETING_ENABLED:
+                # Batches of similar length, padded only to their longest row
+                fit_inputs = {"x": bucketed_dataset(X_fit, y_fit, batch_size, shuffle=True), "shuffle": False}
+                validation_data = bucketed_dataset(X_val, y_val, batch_size, shuffle=False)
+                print(f"[TRAIN] Length bucketing: mean length {sequence_lengths(X_fit).mean():.1f} of {X_fit.shape[1]} timesteps")
+            else:
+                fit_inputs = {"x": X_fit, "y": y_fit, "batch_size": batch_size}
+                validation_data = (X_val, y_val)
             history = model.fit(
-                X_train, y_train,
-                epochs=epochs,
-                batch_size=batch_size,
-                validation_data=(X_val, y_val),
-                callbacks=[early_stopping],
+                **fit_inputs,
+                epochs=epochs_to_run,
+                validation_data=validation_data,
+                callbacks=[early_stopping, job_callback],
                 verbose=1
             )
             
+            if job_callback.cancelled:
+                print("[TRAIN] Training cancelled; keeping the current model")
+                return False, f"Training cancelled after {len(history.history.get('loss', []))} epochs", {}
+            
             # ========== EVALUATE ON TEST SET ==========
             print("\n[EVAL] Evaluating on test set...")
             test_loss, test_accuracy = model.evaluate(X_test, y_test, verbose=0)
@@ -160,14 +346,55 @@ class TrainingService:
             print("\n[EVAL] Confusion Matrix:")
             print(conf_matrix)
             
+            # ========== CASCADE: FAST LINEAR MODEL ==========
+            # Threshold is calibrated on validation, then measured on test
+            fast_model = FastIntentClassifier.fit(X_train, y_train, len(tokenizer.word_index), num_classes)
+            fast_model.threshold = calibrate_threshold(
+                fast_model.predict(X_val),
+                model.predict(X_val, verbose=0),
+                y_val,
+                min_threshold=settings.CASCADE_MIN_THRESHOLD
+            )
+            cascade = cascade_metrics(fast_model.predict(X_test), y_pred, y_test, fast_model.threshold)
+            print(f"\n[CASCADE] Threshold: {cascade['threshold']}")
+            print(f"  - Fast model accuracy:  {cascade['fast_accuracy']}")
+            print(f"  - Fast stage coverage:  {cascade['fast_coverage']*100:.1f}% (accuracy {cascade['fast_stage_accuracy']})")
+            print(f"  - LSTM stage accuracy:  {cascade['lstm_stage_accuracy']}")
+            print(f"  - Cascade accuracy:     {cascade['cascade_accuracy']} (LSTM alone {test_accuracy:.4f})")
+            
             # ========== SAVE MODEL AND ARTIFACTS ==========
-            model.save(settings.MODEL_PATH)
-            pickle.dump(tokenizer, open(settings.TOKENIZER_PATH, 'wb'))
-            pickle.dump(encoder, open(settings.ENCODER_PATH, 'wb'))
+            # Written next to the live files, then moved into place together (see publish_artifacts)
+            artifacts = [
+                settings.MODEL_PATH, settings.FAST_MODEL_PATH, settings.WEIGHTS_PATH,
+                settings.TOKENIZER_PATH, settings.VOCAB_PATH, settings.ENCODER_PATH
+            ]
+            model.save(staging_path(settings.MODEL_PATH))
+            fast_model.save(staging_path(settings.FAST_MODEL_PATH))
+            NumpyLSTM.from_keras_model(model).save_bundle(staging_path(settings.WEIGHTS_PATH))
+            with open(staging_path(settings.TOKENIZER_PATH), 'wb') as f:
+                pickle.dump(tokenizer, f)
+            VocabEncoder.from_tokenizer(tokenizer).save(staging_path(settings.VOCAB_PATH))
+            with open(staging_path(settings.ENCODER_PATH), 'wb') as f:
+                pickle.dump(encoder, f)
+            # Workers hot-load a new version only once every artifact is in place
+            model_version = publish_artifacts(
+                artifacts,
+                settings.MODEL_VERSION_PATH,
+                test_accuracy=float(test_accuracy),
+                num_classes=num_classes,
+                fingerprint=fingerprint,
+                data_fingerprint=data_fp
+            )
+            print(f"[MODEL] Artifacts saved as version {model_version}")
             
             # Prepare metrics
             metrics = {
-                "total_samples": len(X),
+                "model_version": model_version,
+                "fingerprint": fingerprint,
+                "training_mode": training_mode,
+                "finetune_new_samples": new_samples,
+                "finetune_replay_samples": replay_samples,
+                "total_samples": total_samples,
                 "train_samples": len(X_train),
                 "val_samples": len(X_val),
                 "test_samples": len(X_test),
@@ -175,6 +402,7 @@ class TrainingService:
                 "epochs_requested": epochs,
                 "epochs_run": len(history.history['loss']),
                 "batch_size": batch_size,
+                "model_config": model_config,
                 "split_ratio": split_ratio,
                 "train_accuracy": float(history.history['accuracy'][-1]),
                 "train_loss": float(history.history['loss'][-1]),
@@ -182,6 +410,12 @@ class TrainingService:
                 "val_loss": float(history.history['val_loss'][-1]),
                 "test_accuracy": float(test_accuracy),
                 "test_loss": float(test_loss),
+                "cascade_threshold": cascade["threshold"],
+                "fast_test_accuracy": cascade["fast_accuracy"],
+                "fast_coverage": cascade["fast_coverage"],
+                "fast_stage_accuracy": cascade["fast_stage_accuracy"],
+                "lstm_stage_accuracy": cascade["lstm_stage_accuracy"],
+                "cascade_test_accuracy": cascade["cascade_accuracy"],
                 "confusion_matrix": conf_matrix.tolist(),
                 "classification_report": report,
                 "class_names": class_names
@@ -202,7 +436,9 @@ class TrainingService:
                 f"• Validation Accuracy: {metrics['val_accuracy']*100:.2f}%\n"
                 f"• Test Accuracy: {metrics['test_accuracy']*100:.2f}%\n"
                 f"• Epochs: {metrics['epochs_run']}/{epochs}\n"
-                f"• Split Ratio: {split_ratio}"
+                f"• Split Ratio: {split_ratio}\n"
+                f"• Mode: {training_mode}\n"
+                f"• Fast Model Coverage: {metrics['fast_coverage']*100:.2f}%"
             )
             
             return True, message, metrics
@@ -212,15 +448,297 @@ class TrainingService:
             traceback.print_exc()
             return False, f"Training failed: {str(e)}", {}
     
+    def search_model_config(
+        self,
+        epochs: int = 100,
+        split_ratio: str = "70:30",
+        objective: Optional[str] = None,
+        max_trials: Optional[int] = None,
+        workers: Optional[int] = None,
+        promote: bool = True,
+        on_trial_end: Optional[Callable[[int, Dict[str, Any]], None]] = None,
+        should_cancel: Optional[Callable[[], bool]] = None,
+        seed: Optional[int] = None
+    ) -> Tuple[bool, str, Dict[str, Any]]:
+        """
+        Hyperparameter search over SEARCH_SPACE.
+        Returns (success, message, metrics).
+        
+        Up to max_trials configurations (SEARCH_MAX_TRIALS) are trained in
+        parallel worker processes on the prepared train/validation split,
+        each recorded in search_trials. The winner under objective
+        ("accuracy" or "latency", SEARCH_OBJECTIVE by default) is, with
+        promote, trained on the same split, evaluated on the test split,
+        served, and saved as the model config of every later training.
+        
+        on_trial_end(trial_number, summary) is called as each trial finishes.
+        """
+        from schema.models import SearchTrial
+        from service.model_search import run_trials
+        
+        objective = objective or settings.SEARCH_OBJECTIVE
+        if objective not in OBJECTIVES:
+            return False, f"Unknown objective '{objective}', expected one of: {', '.join(OBJECTIVES)}", {}
+        
+        try:
+            chunks = []
+            data = self._data_fingerprint(split_ratio, chunks)
+            if data.rows == 0:
+                return False, "No training data found in database. Please add intents first.", {}
+            if len(data.tags) < 2:
+                return False, "Need at least 2 different intents for training.", {}
+            
+            tokenizer, encoder, X_train, X_val, X_test, y_train, y_val, y_test = self._prepare_data(
+                split_ratio, data, chunks
+            )
+            del chunks
+            configs = search_configurations(
+                settings.SEARCH_SPACE,
+                max_trials or settings.SEARCH_MAX_TRIALS,
+                seed,
+                batch_size=settings.BATCH_SIZE
+            )
+            search_id = uuid.uuid4().hex[:12]
+            print(f"[SEARCH] Search {search_id}: {len(configs)} configurations, objective '{objective}'")
+            
+            records: Dict[int, Any] = {}
+            summaries: Dict[int, Dict[str, Any]] = {}
+            
+            def record_trial(index: int, result: Dict[str, Any]):
+                trial = SearchTrial(
+                    search_id=search_id,
+                    trial_number=index + 1,
+                    model_config=json.dumps(configs[index]),
+                    objective=objective,
+                    status=result["status"],
+                    error=result.get("error"),
+                    val_accuracy=result.get("val_accuracy"),
+                    val_loss=result.get("val_loss"),
+                    epochs_run=result.get("epochs_run"),
+                    train_seconds=result.get("train_seconds"),
+                    parameters=result.get("parameters")
+                )
+                self.db.add(trial)
+                self.db.commit()
+                records[index] = trial
+                summaries[index] = {"trial": index + 1, "model_config": configs[index], **result}
+                if result["status"] == "succeeded":
+                    print(
+                        f"[SEARCH] Trial {index + 1}/{len(configs)}: val_accuracy={result['val_accuracy']:.4f} "
+                        f"train={result['train_seconds']:.1f}s {configs[index]}"
+                    )
+                else:
+                    print(f"[SEARCH] Trial {index + 1}/{len(configs)} {result['status']}: {result.get('error', '')}")
+                if on_trial_end is not None:
+                    on_trial_end(index + 1, summaries[index])
+            
+            results = run_trials(
+                {"X_train": X_train, "y_train": y_train, "X_val": X_val, "y_val": y_val},
+                configs,
+                vocab_size=len(tokenizer.word_index) + 1,
+                num_classes=len(encoder.classes_),
+                epochs=epochs,
+                workers=workers,
+                on_trial_end=record_trial,
+                should_cancel=should_cancel
+            )
+            for index, result in enumerate(results):
+                if "latency_ms" in result:
+                    records[index].latency_ms = result["latency_ms"]
+                    summaries[index]["latency_ms"] = result["latency_ms"]
+            self.db.commit()
+            
+            metrics: Dict[str, Any] = {
+                "search_id": search_id,
+                "objective": objective,
+                "trials": [summaries[index] for index in sorted(summaries)],
+                "promoted": False
+            }
+            if should_cancel is not None and should_cancel():
+                finished = sum(1 for result in results if result["status"] == "succeeded")
+                return False, f"Search cancelled after {finished} trials", metrics
+            
+            best = select_best_trial(results, objective, settings.SEARCH_ACCURACY_TOLERANCE)
+            if best is None:
+                return False, f"Every search trial failed: {results[0].get('error')}", metrics
+            records[best].is_best = True
+            self.db.commit()
+            metrics.update(best_trial=best + 1, best_config=configs[best], best_result=results[best])
+            
+            message = (
+                f"Hyperparameter search {search_id} finished!\n"
+                f"• Trials: {sum(1 for result in results if result['status'] == 'succeeded')}/{len(configs)}\n"
+                f"• Objective: {objective}\n"
+                f"• Best: trial {best + 1}, validation accuracy {results[best]['val_accuracy']*100:.2f}%, "
+                f"latency {results[best]['latency_ms']:.3f} ms\n"
+                f"• Config: {configs[best]}"
+            )
+            if not promote:
+                return True, message, metrics
+            
+            # ========== PROMOTE ==========
+            print(f"[SEARCH] Promoting trial {best + 1}: {configs[best]}")
+            success, train_message, train_metrics = self.train_model(
+                epochs=epochs,
+                split_ratio=split_ratio,
+                should_cancel=should_cancel,
+                model_config=configs[best]
+            )
+            if not success:
+                return False, f"{message}\nPromotion failed: {train_message}", metrics
+            save_model_config(settings.MODEL_CONFIG_PATH, configs[best])
+            records[best].training_id = train_metrics["training_id"]
+            self.db.commit()
+            
+            metrics.update(
+                promoted=True,
+                training_id=train_metrics["training_id"],
+                model_version=train_metrics.get("model_version"),
+                test_accuracy=train_metrics.get("test_accuracy")
+            )
+            return True, f"{message}\n• Promoted: {train_message}", metrics
+            
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            return False, f"Search failed: {str(e)}", {}
+    
+    def get_search_trials(self, search_id: str) -> list:
+        """Trials of a hyperparameter search, in trial order, with parsed configs."""
+        from schema.models import SearchTrial
+        
+        trials = self.db.query(SearchTrial).filter(
+            SearchTrial.search_id == search_id
+        ).order_by(SearchTrial.trial_number).all()
+        return [
+            {
+                "trial": t.trial_number,
+                "created_at": t.created_at.isoformat() if t.created_at else None,
+                "model_config": json.loads(t.model_config),
+                "objective": t.objective,
+                "status": t.status,
+                "error": t.error,
+                "val_accuracy": t.val_accuracy,
+                "val_loss": t.val_loss,
+                "epochs_run": t.epochs_run,
+                "train_seconds": t.train_seconds,
+                "latency_ms": t.latency_ms,
+                "parameters": t.parameters,
+                "is_best": bool(t.is_best),
+                "training_id": t.training_id
+            }
+            for t in trials
+        ]
+    
+    def _data_fingerprint(
+        self,
+        split_ratio: str,
+        chunks: Optional[List[Tuple[List[str], List[str]]]] = None
+    ) -> DataFingerprint:
+        """
+        Fingerprint of the intents in the database, streamed in chunks from
+        one query (keys the prepared-data cache). If given, chunks receives
+        the (patterns, tags) chunks read, for _load_training_set.
+        """
+        data = DataFingerprint(split_ratio, settings.MAX_SEQUENCE_LENGTH)
+        for sentences, labels in self.intent_service.iter_training_chunks():
+            data.update(sentences, labels)
+            if chunks is not None:
+                chunks.append((sentences, labels))
+        return data
+    
+    def _training_fingerprint(
+        self,
+        data_fp: str,
+        epochs: int,
+        incremental: bool = False,
+        model_config: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Data fingerprint plus every hyperparameter of the run."""
+        hyperparameters = {
+            "epochs": epochs,
+            "model_config": self._model_config(model_config),
+            "mask_zero": True,  # Model architecture; older models were trained on unmasked padding
+            "length_bucketing": settings.LENGTH_BUCKETING_ENABLED,
+            "cascade_min_threshold": settings.CASCADE_MIN_THRESHOLD
+        }
+        if incremental:
+            hyperparameters.update(
+                mode="incremental",
+                max_epochs=settings.INCREMENTAL_MAX_EPOCHS,
+                learning_rate=settings.INCREMENTAL_LEARNING_RATE,
+                replay_ratio=settings.INCREMENTAL_REPLAY_RATIO,
+                replay_min=settings.INCREMENTAL_REPLAY_MIN
+            )
+        return training_fingerprint(data_fp, **hyperparameters)
+    
+    def find_current_training(
+        self,
+        epochs: int = 100,
+        split_ratio: str = "70:30",
+        incremental: bool = False,
+        model_config: Optional[Dict[str, Any]] = None
+    ) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """
+        (message, metrics) of the served model if training with these
+        parameters on the current intents would reproduce it, else None.
+        Cheap: no TensorFlow, no preprocessing.
+        """
+        data = self._data_fingerprint(split_ratio)
+        if data.rows == 0:
+            return None
+        incremental = incremental and self._can_warm_start()
+        return self._find_current_training(
+            self._training_fingerprint(data.hexdigest(), epochs, incremental, model_config)
+        )
+    
+    def _find_current_training(self, fingerprint: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """
+        (message, metrics) of the served model if it was trained with this
+        fingerprint and all its artifacts are still on disk, else None.
+        """
+        from schema.models import TrainingHistory
+        
+        record = read_version_file(settings.MODEL_VERSION_PATH)
+        if not record or record.get("fingerprint") != fingerprint:
+            return None
+        artifacts = (
+            settings.MODEL_PATH, settings.WEIGHTS_PATH, settings.VOCAB_PATH,
+            settings.ENCODER_PATH, settings.FAST_MODEL_PATH
+        )
+        if not all(os.path.exists(path) for path in artifacts):
+            return None
+        
+        row = self.db.query(TrainingHistory).filter(
+            TrainingHistory.fingerprint == fingerprint,
+            TrainingHistory.model_version == record["version"]
+        ).order_by(TrainingHistory.id.desc()).first()
+        if row is None:
+            return None
+        
+        metrics = self.get_training_history_by_id(row.id)
+        metrics["training_id"] = row.id
+        metrics["skipped"] = True
+        message = (
+            f"Model is already up to date (version {record['version']}): "
+            f"intents and training parameters are unchanged since training #{row.id}."
+        )
+        print(f"[CACHE] {message}")
+        return message, metrics
+    
     def _save_training_history(self, metrics: Dict[str, Any]):
         """Save training metrics to database."""
         from schema.models import TrainingHistory
         
         training_history = TrainingHistory(
+            model_version=metrics["model_version"],
+            fingerprint=metrics["fingerprint"],
+            training_mode=metrics["training_mode"],
             epochs_requested=metrics["epochs_requested"],
             epochs_run=metrics["epochs_run"],
             split_ratio=metrics["split_ratio"],
             batch_size=metrics["batch_size"],
+            model_config=json.dumps(metrics["model_config"]),
             total_samples=metrics["total_samples"],
             train_samples=metrics["train_samples"],
             val_samples=metrics["val_samples"],
@@ -232,6 +750,12 @@ class TrainingService:
             train_loss=metrics["train_loss"],
             val_loss=metrics["val_loss"],
             test_loss=metrics["test_loss"],
+            cascade_threshold=metrics["cascade_threshold"],
+            fast_test_accuracy=metrics["fast_test_accuracy"],
+            fast_coverage=metrics["fast_coverage"],
+            fast_stage_accuracy=metrics["fast_stage_accuracy"],
+            lstm_stage_accuracy=metrics["lstm_stage_accuracy"],
+            cascade_test_accuracy=metrics["cascade_test_accuracy"],
             confusion_matrix=json.dumps(metrics["confusion_matrix"]),
             classification_report=json.dumps(metrics["classification_report"]),
             class_names=json.dumps(metrics["class_names"])
@@ -260,10 +784,14 @@ class TrainingService:
         return {
             "id": record.id,
             "trained_at": record.trained_at.isoformat() if record.trained_at else None,
+            "model_version": record.model_version,
+            "fingerprint": record.fingerprint,
+            "training_mode": record.training_mode,
             "epochs_requested": record.epochs_requested,
             "epochs_run": record.epochs_run,
             "split_ratio": record.split_ratio,
             "batch_size": record.batch_size,
+            "model_config": json.loads(record.model_config) if record.model_config else None,
             "total_samples": record.total_samples,
             "train_samples": record.train_samples,
             "val_samples": record.val_samples,
@@ -275,6 +803,12 @@ class TrainingService:
             "train_loss": record.train_loss,
             "val_loss": record.val_loss,
             "test_loss": record.test_loss,
+            "cascade_threshold": record.cascade_threshold,
+            "fast_test_accuracy": record.fast_test_accuracy,
+            "fast_coverage": record.fast_coverage,
+            "fast_stage_accuracy": record.fast_stage_accuracy,
+            "lstm_stage_accuracy": record.lstm_stage_accuracy,
+            "cascade_test_accuracy": record.cascade_test_accuracy,
             "confusion_matrix": json.loads(record.confusion_matrix) if record.confusion_matrix else [],
             "classification_report": json.loads(record.classification_report) if record.classification_report else {},
             "class_names": json.loads(record.class_names) if record.class_names else []
@@ -4,32 +4,46 @@ Uses proper ML methodology with train-validation-test split.
 
 Usage:
     python train_model.py [--epochs 100]
+    python train_model.py --search [--objective accuracy|latency] [--trials 12] [--workers 4] [--no-promote]
+
+--search runs the parallel hyperparameter search on the intents in the
+database (like the API) and promotes the best configuration; plain runs
+train on the JSON dataset with the promoted (or default) configuration.
 """
 
 import json
 import numpy as np
 import pickle
 import argparse
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import Embedding, LSTM, Dense, Dropout
 from tensorflow.keras.preprocessing.text import Tokenizer
 from tensorflow.keras.preprocessing.sequence import pad_sequences
 from tensorflow.keras.callbacks import EarlyStopping
 from sklearn.preprocessing import LabelEncoder
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report, accuracy_score
-from utils.nlp_utils import preprocess_text
+from utils.nlp_utils import preprocess_batch
+from utils.numpy_lstm import NumpyLSTM
+from utils.vocab_encoder import VocabEncoder
+from utils.fast_classifier import FastIntentClassifier, calibrate_threshold, cascade_metrics
+from utils.model_version import staging_path, publish_artifacts
+from utils.model_config import OBJECTIVES, load_model_config, build_lstm_model
 
 # ========== CONFIGURATION ==========
 DATASET_PATH = 'dataset/intents.json'
 MODEL_PATH = 'model/lstm_model.h5'
 TOKENIZER_PATH = 'model/tokenizer.pkl'
 ENCODER_PATH = 'model/label_encoder.pkl'
+WEIGHTS_PATH = 'model/lstm_weights.npz'
+VOCAB_PATH = 'model/vocab.txt'
+FAST_MODEL_PATH = 'model/fast_classifier.npz'
+MODEL_VERSION_PATH = 'model/version.json'
+MODEL_CONFIG_PATH = 'model/model_config.json'
 
 MAX_SEQUENCE_LENGTH = 20
-BATCH_SIZE = 8
+BATCH_SIZE = 8  # Default when no configuration has been promoted
 VALIDATION_SPLIT = 0.15  # 15% for validation
 TEST_SPLIT = 0.15  # 15% for testing
+CASCADE_MIN_THRESHOLD = 0.5  # Lower bound for the calibrated fast-model threshold
 
 
 def load_and_preprocess_data():
@@ -41,16 +55,18 @@ def load_and_preprocess_data():
     with open(DATASET_PATH, encoding='utf-8') as f:
         data = json.load(f)
     
-    sentences = []
+    patterns = []
     labels = []
     
     for intent in data['intents']:
         for pattern in intent['patterns']:
-            processed = preprocess_text(pattern)
-            print(f"  [{intent['tag']}] '{pattern}' -> '{processed}'")
-            sentences.append(processed)
+            patterns.append(pattern)
             labels.append(intent['tag'])
     
+    sentences = preprocess_batch(patterns)
+    for tag, pattern, processed in list(zip(labels, patterns, sentences))[:5]:
+        print(f"  [{tag}] '{pattern}' -> '{processed}'")
+    
     print(f"\nTotal samples: {len(sentences)}")
     print(f"Total intents: {len(set(labels))}")
     
@@ -106,20 +122,13 @@ def prepare_data(sentences, labels):
     return (X_train, y_train, X_val, y_val, X_test, y_test), tokenizer, encoder, num_classes
 
 
-def build_model(vocab_size, num_classes, input_length):
+def build_model(vocab_size, num_classes, input_length, config):
     """Build LSTM model with regularization."""
     print("\n" + "=" * 60)
     print("STEP 3: Building Model")
     print("=" * 60)
     
-    model = Sequential([
-        Embedding(vocab_size + 1, 32, input_length=input_length),
-        LSTM(32, return_sequences=False),
-        Dropout(0.3),
-        Dense(16, activation='relu'),
-        Dropout(0.2),
-        Dense(num_classes, activation='softmax')
-    ])
+    model = build_lstm_model(vocab_size + 1, num_classes, input_length, config)
     
     model.compile(
         loss='sparse_categorical_crossentropy',
@@ -133,13 +142,13 @@ def build_model(vocab_size, num_classes, input_length):
     return model
 
 
-def train_model(model, X_train, y_train, X_val, y_val, epochs):
+def train_model(model, X_train, y_train, X_val, y_val, epochs, batch_size):
     """Train model with validation monitoring."""
     print("\n" + "=" * 60)
     print("STEP 4: Training Model")
     print("=" * 60)
     print(f"Epochs: {epochs}")
-    print(f"Batch Size: {BATCH_SIZE}")
+    print(f"Batch Size: {batch_size}")
     print(f"Validation Split: {VALIDATION_SPLIT*100}%")
     print("-" * 60)
     
@@ -154,7 +163,7 @@ def train_model(model, X_train, y_train, X_val, y_val, epochs):
     history = model.fit(
         X_train, y_train,
         epochs=epochs,
-        batch_size=BATCH_SIZE,
+        batch_size=batch_size,
         validation_data=(X_val, y_val),
         callbacks=[early_stopping],
         verbose=1
@@ -186,30 +195,67 @@ def evaluate_model(model, X_test, y_test, encoder):
     return test_loss, test_accuracy
 
 
-def save_artifacts(model, tokenizer, encoder):
-    """Save model and preprocessing artifacts."""
+def train_fast_model(model, vocab_size, num_classes, data_splits):
+    """Train the cascade's fast linear model and calibrate its threshold."""
     print("\n" + "=" * 60)
-    print("STEP 6: Saving Model and Artifacts")
+    print("STEP 6: Training Cascade Fast Model")
     print("=" * 60)
     
-    model.save(MODEL_PATH)
-    print(f"  Model saved to: {MODEL_PATH}")
+    X_train, y_train, X_val, y_val, X_test, y_test = data_splits
+    fast_model = FastIntentClassifier.fit(X_train, y_train, vocab_size, num_classes)
+    
+    # Calibrate on validation, report on test
+    fast_model.threshold = calibrate_threshold(
+        fast_model.predict(X_val),
+        model.predict(X_val, verbose=0),
+        y_val,
+        min_threshold=CASCADE_MIN_THRESHOLD
+    )
+    cascade = cascade_metrics(fast_model.predict(X_test), model.predict(X_test, verbose=0), y_test, fast_model.threshold)
+    
+    print(f"Threshold: {cascade['threshold']}")
+    print(f"  - Fast model accuracy: {cascade['fast_accuracy']}")
+    print(f"  - Fast stage coverage: {cascade['fast_coverage']*100:.1f}% (accuracy {cascade['fast_stage_accuracy']})")
+    print(f"  - LSTM stage accuracy: {cascade['lstm_stage_accuracy']}")
+    print(f"  - Cascade accuracy:    {cascade['cascade_accuracy']}")
     
-    pickle.dump(tokenizer, open(TOKENIZER_PATH, 'wb'))
-    print(f"  Tokenizer saved to: {TOKENIZER_PATH}")
+    return fast_model
+
+
+def save_artifacts(model, fast_model, tokenizer, encoder):
+    """Save model and preprocessing artifacts."""
+    print("\n" + "=" * 60)
+    print("STEP 7: Saving Model and Artifacts")
+    print("=" * 60)
     
-    pickle.dump(encoder, open(ENCODER_PATH, 'wb'))
-    print(f"  Encoder saved to: {ENCODER_PATH}")
+    # Staged next to the live files, then moved into place together
+    model.save(staging_path(MODEL_PATH))
+    fast_model.save(staging_path(FAST_MODEL_PATH))
+    NumpyLSTM.from_keras_model(model).save_bundle(staging_path(WEIGHTS_PATH))
+    with open(staging_path(TOKENIZER_PATH), 'wb') as f:
+        pickle.dump(tokenizer, f)
+    VocabEncoder.from_tokenizer(tokenizer).save(staging_path(VOCAB_PATH))
+    with open(staging_path(ENCODER_PATH), 'wb') as f:
+        pickle.dump(encoder, f)
+    
+    # Running API workers hot-load the new version once the version file changes
+    artifacts = [MODEL_PATH, FAST_MODEL_PATH, WEIGHTS_PATH, TOKENIZER_PATH, VOCAB_PATH, ENCODER_PATH]
+    version = publish_artifacts(artifacts, MODEL_VERSION_PATH)
+    for path in artifacts:
+        print(f"  Saved: {path}")
+    print(f"  Version {version} written to: {MODEL_VERSION_PATH}")
 
 
 def main(epochs=100):
     """Main training pipeline."""
+    config = load_model_config(MODEL_CONFIG_PATH, batch_size=BATCH_SIZE)
+    
     print("\n" + "=" * 60)
     print("LSTM CHATBOT MODEL TRAINING")
     print("=" * 60)
     print(f"Configuration:")
     print(f"  - Max Sequence Length: {MAX_SEQUENCE_LENGTH}")
-    print(f"  - Batch Size: {BATCH_SIZE}")
+    print(f"  - Model: {config}")
     print(f"  - Validation Split: {VALIDATION_SPLIT*100}%")
     print(f"  - Test Split: {TEST_SPLIT*100}%")
     print(f"  - Epochs: {epochs}")
@@ -222,16 +268,19 @@ def main(epochs=100):
     X_train, y_train, X_val, y_val, X_test, y_test = data_splits
     
     # Step 3: Build model
-    model = build_model(len(tokenizer.word_index), num_classes, MAX_SEQUENCE_LENGTH)
+    model = build_model(len(tokenizer.word_index), num_classes, MAX_SEQUENCE_LENGTH, config)
     
     # Step 4: Train
-    history = train_model(model, X_train, y_train, X_val, y_val, epochs)
+    history = train_model(model, X_train, y_train, X_val, y_val, epochs, config["batch_size"])
     
     # Step 5: Evaluate
     test_loss, test_accuracy = evaluate_model(model, X_test, y_test, encoder)
     
-    # Step 6: Save
-    save_artifacts(model, tokenizer, encoder)
+    # Step 6: Cascade fast model
+    fast_model = train_fast_model(model, len(tokenizer.word_index), num_classes, data_splits)
+    
+    # Step 7: Save
+    save_artifacts(model, fast_model, tokenizer, encoder)
     
     # Summary
     print("\n" + "=" * 60)
@@ -245,9 +294,51 @@ def main(epochs=100):
     print("=" * 60 + "\n")
 
 
+def search(epochs=100, objective=None, trials=None, workers=None, promote=True):
+    """Hyperparameter search on the database intents; prints every trial and the winner."""
+    from config.database import SessionLocal
+    from service.training_service import TrainingService
+    
+    print("\n" + "=" * 60)
+    print("LSTM CHATBOT HYPERPARAMETER SEARCH")
+    print("=" * 60)
+    
+    db = SessionLocal()
+    try:
+        success, message, metrics = TrainingService(db).search_model_config(
+            epochs=epochs,
+            objective=objective,
+            max_trials=trials,
+            workers=workers,
+            promote=promote
+        )
+    finally:
+        db.close()
+    
+    print("\n" + "=" * 60)
+    print(f"  {'trial':>5s} {'val acc':>8s} {'latency (ms)':>13s} {'train (s)':>10s} {'params':>8s}  config")
+    for trial in metrics.get("trials", []):
+        if trial["status"] != "succeeded":
+            print(f"  {trial['trial']:5d} {trial['status']:>8s}  {trial.get('error') or ''}")
+            continue
+        best = " *" if trial["trial"] == metrics.get("best_trial") else ""
+        print(f"  {trial['trial']:5d} {trial['val_accuracy']:8.4f} {trial['latency_ms']:13.3f} "
+              f"{trial['train_seconds']:10.1f} {trial['parameters']:8d}  {trial['model_config']}{best}")
+    print("=" * 60)
+    print(message)
+    return success
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Train LSTM Chatbot Model')
     parser.add_argument('--epochs', type=int, default=100, help='Number of training epochs (default: 100)')
+    parser.add_argument('--search', action='store_true', help='Run the hyperparameter search instead')
+    parser.add_argument('--objective', choices=OBJECTIVES, default=None, help='Search objective (default: SEARCH_OBJECTIVE)')
+    parser.add_argument('--trials', type=int, default=None, help='Configurations to try (default: SEARCH_MAX_TRIALS)')
+    parser.add_argument('--workers', type=int, default=None, help='Parallel trial processes (default: one per core)')
+    parser.add_argument('--no-promote', dest='promote', action='store_false', help='Only record trials, keep the model')
     args = parser.parse_args()
     
+    if args.search:
+        raise SystemExit(0 if search(args.epochs, args.objective, args.trials, args.workers, args.promote) else 1)
     main(epochs=args.epochs)
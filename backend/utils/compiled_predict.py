@@ -0,0 +1,55 @@
+from typing import Sequence
+
+import numpy as np
+
+from utils.length_buckets import trim_padding
+
+
+class CompiledPredictor:
+    """
+    Keras model wrapped in a single tf.function call with a fixed input signature.
+
+    Batches are zero-padded up to the nearest bucket size so every call reuses
+    one of a few traced graphs; batches larger than the biggest bucket are
+    split into chunks. Every bucket is traced and run once at construction
+    as warmup.
+
+    With trim (models that mask padding), each batch is first cut to its
+    longest row; the signature then has a dynamic time axis.
+    """
+
+    def __init__(self, model, max_len: int, buckets: Sequence[int], trim: bool = False):
+        import tensorflow as tf
+
+        self.max_len = max_len
+        self.trim = trim
+        self.buckets = sorted(set(int(b) for b in buckets if int(b) > 0)) or [1]
+
+        @tf.function(input_signature=[tf.TensorSpec(shape=(None, None if trim else max_len), dtype=tf.int32)])
+        def forward(x):
+            return model(x, training=False)
+
+        self._forward = forward
+
+        # Warmup: trace once and run every bucket shape
+        for size in self.buckets:
+            self(np.zeros((size, max_len), dtype=np.int32))
+
+    def _run_bucket(self, batch: np.ndarray) -> np.ndarray:
+        n = len(batch)
+        size = next(b for b in self.buckets if b >= n)
+        padded = np.zeros((size, batch.shape[1]), dtype=np.int32)
+        padded[:n] = batch
+        return self._forward(padded).numpy()[:n]
+
+    def __call__(self, batch: np.ndarray) -> np.ndarray:
+        batch = np.asarray(batch, dtype=np.int32)
+        if self.trim:
+            batch = trim_padding(batch)
+        largest = self.buckets[-1]
+        if len(batch) <= largest:
+            return self._run_bucket(batch)
+        return np.concatenate([
+            self._run_bucket(batch[start:start + largest])
+            for start in range(0, len(batch), largest)
+        ])
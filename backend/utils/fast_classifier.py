@@ -0,0 +1,164 @@
+import json
+from typing import Dict, Optional
+
+import numpy as np
+
+from utils.numpy_lstm import ACTIVATIONS
+
+
+class FastIntentClassifier:
+    """
+    TF-IDF bag-of-words + multinomial logistic regression over token ids.
+
+    Works on the same padded id matrix as the LSTM (id 0 is padding and is
+    ignored), so it shares the tokenizer. Trained with scikit-learn, served
+    in pure NumPy. Used as the first stage of the cascade: it answers when
+    its confidence clears `threshold`, otherwise the LSTM runs.
+    """
+
+    def __init__(
+        self,
+        idf: np.ndarray,
+        coef: np.ndarray,
+        intercept: np.ndarray,
+        threshold: Optional[float] = None
+    ):
+        self.idf = np.asarray(idf, dtype=np.float32)  # (vocab_size + 1,)
+        self.coef = np.asarray(coef, dtype=np.float32)  # (num_classes, vocab_size + 1)
+        self.intercept = np.asarray(intercept, dtype=np.float32)  # (num_classes,)
+        self.threshold = threshold  # None = cascade disabled (no safe threshold found)
+
+    @property
+    def num_classes(self) -> int:
+        return self.coef.shape[0]
+
+    # ==================== FEATURES ====================
+
+    @staticmethod
+    def _counts(batch: np.ndarray, width: int) -> np.ndarray:
+        """Bag-of-ids term counts for a (batch, timesteps) id matrix."""
+        batch = np.asarray(batch, dtype=np.int64)
+        counts = np.zeros((batch.shape[0], width), dtype=np.float32)
+        rows = np.repeat(np.arange(batch.shape[0]), batch.shape[1])
+        ids = batch.ravel()
+        keep = (ids > 0) & (ids < width)  # padding and unknown ids carry no signal
+        np.add.at(counts, (rows[keep], ids[keep]), 1.0)
+        return counts
+
+    def features(self, batch: np.ndarray) -> np.ndarray:
+        """L2-normalized TF-IDF rows."""
+        tfidf = self._counts(batch, self.idf.shape[0]) * self.idf
+        norms = np.linalg.norm(tfidf, axis=1, keepdims=True)
+        return tfidf / np.maximum(norms, 1e-12)
+
+    # ==================== TRAINING ====================
+
+    @classmethod
+    def fit(
+        cls,
+        X: np.ndarray,
+        y: np.ndarray,
+        vocab_size: int,
+        num_classes: int,
+        C: float = 10.0
+    ) -> "FastIntentClassifier":
+        """Fit IDF weights and a logistic regression on padded id matrices."""
+        from sklearn.linear_model import LogisticRegression
+
+        width = vocab_size + 1
+        counts = cls._counts(X, width)
+        df = np.count_nonzero(counts, axis=0)
+        idf = np.log((1.0 + len(X)) / (1.0 + df)) + 1.0  # smoothed, as in sklearn TfidfTransformer
+        idf[0] = 0.0
+
+        model = cls(idf, np.zeros((num_classes, width)), np.zeros(num_classes))
+        clf = LogisticRegression(C=C, max_iter=1000)
+        clf.fit(model.features(X), y)
+
+        # Classes absent from the training split can never be predicted
+        coef = np.zeros((num_classes, width), dtype=np.float32)
+        intercept = np.full(num_classes, -1e4, dtype=np.float32)
+        if len(clf.classes_) == 2:
+            # Binary LogisticRegression keeps one weight row for classes_[1]
+            intercept[clf.classes_[0]] = 0.0
+            coef[clf.classes_[1]] = clf.coef_[0]
+            intercept[clf.classes_[1]] = clf.intercept_[0]
+        else:
+            coef[clf.classes_] = clf.coef_
+            intercept[clf.classes_] = clf.intercept_
+
+        return cls(idf, coef, intercept)
+
+    # ==================== PERSISTENCE ====================
+
+    @classmethod
+    def load(cls, path: str) -> "FastIntentClassifier":
+        """Load a classifier written by `save`."""
+        with np.load(path) as data:
+            config = json.loads(str(data["config"]))
+            return cls(data["idf"], data["coef"], data["intercept"], threshold=config.get("threshold"))
+
+    def save(self, path: str):
+        """Write weights and the calibrated threshold to a single .npz file."""
+        config = {"threshold": self.threshold}
+        with open(path, "wb") as f:
+            np.savez(f, config=np.array(json.dumps(config)), idf=self.idf, coef=self.coef, intercept=self.intercept)
+
+    # ==================== INFERENCE ====================
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        """Class probabilities for a (batch, timesteps) matrix of token ids."""
+        logits = self.features(batch) @ self.coef.T + self.intercept
+        return ACTIVATIONS["softmax"](logits)
+
+
+# ==================== CASCADE CALIBRATION ====================
+
+def cascade_metrics(
+    fast_probs: np.ndarray,
+    lstm_probs: np.ndarray,
+    y: np.ndarray,
+    threshold: Optional[float]
+) -> Dict[str, Optional[float]]:
+    """Coverage and accuracy of each cascade stage at a given threshold."""
+    fast_pred = np.argmax(fast_probs, axis=1)
+    lstm_pred = np.argmax(lstm_probs, axis=1)
+    if threshold is None:
+        accepted = np.zeros(len(y), dtype=bool)
+    else:
+        accepted = np.max(fast_probs, axis=1) >= threshold
+    cascade_pred = np.where(accepted, fast_pred, lstm_pred)
+
+    def accuracy(pred, mask):
+        return float(np.mean(pred[mask] == y[mask])) if mask.any() else None
+
+    everything = np.ones(len(y), dtype=bool)
+    return {
+        "threshold": threshold,
+        "fast_accuracy": accuracy(fast_pred, everything),
+        "fast_coverage": float(np.mean(accepted)) if len(y) else 0.0,
+        "fast_stage_accuracy": accuracy(fast_pred, accepted),
+        "lstm_stage_accuracy": accuracy(lstm_pred, ~accepted),
+        "cascade_accuracy": accuracy(cascade_pred, everything),
+    }
+
+
+def calibrate_threshold(
+    fast_probs: np.ndarray,
+    lstm_probs: np.ndarray,
+    y: np.ndarray,
+    min_threshold: float = 0.5
+) -> Optional[float]:
+    """
+    Lowest confidence threshold (>= min_threshold) at which the cascade is
+    at least as accurate as the LSTM alone. None if no threshold qualifies.
+    """
+    if len(y) == 0:
+        return None
+    lstm_accuracy = float(np.mean(np.argmax(lstm_probs, axis=1) == y))
+    confidences = np.max(fast_probs, axis=1)
+    candidates = np.unique(confidences[confidences >= min_threshold])
+    for threshold in candidates:  # ascending: most coverage first
+        if cascade_metrics(fast_probs, lstm_probs, y, float(threshold))["cascade_accuracy"] >= lstm_accuracy:
+            return float(threshold)
+    return None
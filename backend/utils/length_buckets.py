@@ -0,0 +1,74 @@
+from typing import List, Optional
+
+import numpy as np
+
+
+def sequence_lengths(batch: np.ndarray) -> np.ndarray:
+    """Number of non-padding tokens per row (id 0 is padding)."""
+    return np.count_nonzero(batch, axis=1)
+
+
+def trim_padding(batch: np.ndarray) -> np.ndarray:
+    """
+    Drop the leading columns that are padding in every row (sequences are
+    left-padded), keeping at least one column. Only exact for models that
+    mask padding (Embedding mask_zero=True).
+    """
+    if batch.shape[1] <= 1:
+        return batch
+    used = np.flatnonzero(batch.any(axis=0))
+    start = min(int(used[0]), batch.shape[1] - 1) if len(used) else batch.shape[1] - 1
+    return batch[:, start:] if start else batch
+
+
+def length_bucketed_batches(
+    lengths: np.ndarray,
+    batch_size: int,
+    rng: Optional[np.random.Generator] = None,
+    pool_batches: int = 32
+) -> List[np.ndarray]:
+    """
+    Split row indices into batches of similar sequence length, so each
+    batch only needs padding up to its own longest row.
+
+    Without rng, rows are simply sorted by length (evaluation). With rng
+    (training), rows are shuffled, sorted by length only within pools of
+    `pool_batches` batches, and the batch order is shuffled, so batches
+    stay random from epoch to epoch.
+    """
+    batch_size = max(1, int(batch_size))
+    if rng is None:
+        order = np.argsort(lengths, kind="stable")
+        return [order[start:start + batch_size] for start in range(0, len(order), batch_size)]
+
+    order = rng.permutation(len(lengths))
+    pool = batch_size * max(1, pool_batches)
+    batches = []
+    for pool_start in range(0, len(order), pool):
+        rows = order[pool_start:pool_start + pool]
+        rows = rows[np.argsort(lengths[rows], kind="stable")]
+        batches.extend(rows[start:start + batch_size] for start in range(0, len(rows), batch_size))
+    rng.shuffle(batches)
+    return batches
+
+
+def bucketed_dataset(X: np.ndarray, y: np.ndarray, batch_size: int, shuffle: bool):
+    """
+    tf.data pipeline of length-bucketed batches, each padded only to its
+    longest row. With shuffle, batches are regrouped every epoch.
+    """
+    import tensorflow as tf
+
+    lengths = sequence_lengths(X)
+    rng = np.random.default_rng() if shuffle else None
+    num_batches = -(-len(X) // max(1, batch_size))
+
+    def batches():
+        for rows in length_bucketed_batches(lengths, batch_size, rng):
+            yield trim_padding(X[rows]).astype(np.int32, copy=False), y[rows]
+
+    dataset = tf.data.Dataset.from_generator(batches, output_signature=(
+        tf.TensorSpec(shape=(None, None), dtype=tf.int32),
+        tf.TensorSpec(shape=(None,), dtype=tf.as_dtype(y.dtype))
+    ))
+    return dataset.apply(tf.data.experimental.assert_cardinality(num_batches)).prefetch(1)
@@ -0,0 +1,125 @@
+import os
+import json
+import random
+import itertools
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+# Architecture and batch size of the LSTM intent classifier
+DEFAULT_MODEL_CONFIG: Dict[str, Any] = {
+    "embedding_dim": 32,
+    "lstm_units": 32,
+    "dense_units": 16,
+    "dropout": 0.3,
+    "dense_dropout": 0.2,
+    "batch_size": 8
+}
+
+_INT_KEYS = ("embedding_dim", "lstm_units", "dense_units", "batch_size")
+
+OBJECTIVES = ("accuracy", "latency")
+
+
+def normalize_model_config(config: Optional[Mapping[str, Any]] = None, **defaults) -> Dict[str, Any]:
+    """
+    Complete config with the defaults (DEFAULT_MODEL_CONFIG, overridden by
+    keyword arguments) and coerce value types. Raises ValueError on unknown
+    keys or out-of-range values.
+    """
+    merged = {**DEFAULT_MODEL_CONFIG, **defaults, **(config or {})}
+    unknown = set(merged) - set(DEFAULT_MODEL_CONFIG)
+    if unknown:
+        raise ValueError(f"Unknown model config keys: {', '.join(sorted(unknown))}")
+
+    normalized = {}
+    for key in DEFAULT_MODEL_CONFIG:
+        value = merged[key]
+        if key in _INT_KEYS:
+            if float(value) != int(value) or int(value) < 1:
+                raise ValueError(f"{key} must be a positive integer, got {value}")
+            normalized[key] = int(value)
+        else:
+            if not 0.0 <= float(value) < 1.0:
+                raise ValueError(f"{key} must be in [0, 1), got {value}")
+            normalized[key] = float(value)
+    return normalized
+
+
+def load_model_config(path: str, **defaults) -> Dict[str, Any]:
+    """Promoted config from a JSON file, or the defaults if there is none."""
+    if not os.path.exists(path):
+        return normalize_model_config(**defaults)
+    with open(path, encoding="utf-8") as f:
+        return normalize_model_config(json.load(f), **defaults)
+
+
+def save_model_config(path: str, config: Mapping[str, Any]):
+    """Write a config atomically."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(normalize_model_config(config), f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def build_lstm_model(vocab_size: int, num_classes: int, input_length: int, config: Mapping[str, Any]):
+    """
+    Embedding + LSTM intent classifier (uncompiled, weights initialized).
+    Padding (id 0) is masked, so a batch trimmed to its longest row
+    gives the same predictions as the fully padded one.
+    """
+    from tensorflow.keras.models import Sequential
+    from tensorflow.keras.layers import Embedding, LSTM, Dense, Dropout
+
+    config = normalize_model_config(config)
+    model = Sequential()
+    model.add(Embedding(vocab_size, config["embedding_dim"], mask_zero=True))
+    model.add(LSTM(config["lstm_units"], return_sequences=False))
+    model.add(Dropout(config["dropout"]))
+    model.add(Dense(config["dense_units"], activation='relu'))
+    model.add(Dropout(config["dense_dropout"]))
+    model.add(Dense(num_classes, activation='softmax'))
+    model.build((None, input_length))
+    return model
+
+
+def search_configurations(
+    space: Mapping[str, Sequence[Any]],
+    max_trials: int,
+    seed: Optional[int] = None,
+    **defaults
+) -> List[Dict[str, Any]]:
+    """
+    Configurations to try: the whole grid over `space` (keys missing from
+    it keep their default) if it has at most max_trials points, otherwise
+    a random sample of max_trials distinct points.
+    """
+    keys = list(space)
+    grid = [
+        normalize_model_config(dict(zip(keys, values)), **defaults)
+        for values in itertools.product(*(space[key] for key in keys))
+    ]
+    unique = list({json.dumps(config, sort_keys=True): config for config in grid}.values())
+    if len(unique) <= max_trials:
+        return unique
+    return random.Random(seed).sample(unique, max(1, max_trials))
+
+
+def select_best_trial(trials: Sequence[Mapping[str, Any]], objective: str, tolerance: float = 0.0) -> Optional[int]:
+    """
+    Index of the best successful trial, or None if every trial failed.
+
+    "accuracy": highest validation accuracy (then lowest validation loss,
+    then lowest latency). "latency": lowest latency among the trials whose
+    validation accuracy is within `tolerance` of the best one.
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Unknown objective '{objective}', expected one of: {', '.join(OBJECTIVES)}")
+    done = [i for i, trial in enumerate(trials) if trial.get("val_accuracy") is not None]
+    if not done:
+        return None
+
+    if objective == "accuracy":
+        return min(done, key=lambda i: (-trials[i]["val_accuracy"], trials[i]["val_loss"], trials[i]["latency_ms"]))
+    best_accuracy = max(trials[i]["val_accuracy"] for i in done)
+    eligible = [i for i in done if trials[i]["val_accuracy"] >= best_accuracy - tolerance]
+    return min(eligible, key=lambda i: (trials[i]["latency_ms"], -trials[i]["val_accuracy"]))
@@ -0,0 +1,61 @@
+import os
+import json
+import uuid
+from datetime import datetime, timezone
+from typing import Optional, Sequence
+
+
+def new_version_id() -> str:
+    """Sortable, unique model version id, e.g. 20250101120000-1a2b3c4d."""
+    return f"{datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}"
+
+
+def write_version_file(path: str, version: Optional[str] = None, **metadata) -> str:
+    """
+    Stamp a finished set of model artifacts with a version id.
+    Must be called after every artifact is written: the file is replaced
+    atomically, so readers see either the old version or the complete new one.
+    """
+    version = version or new_version_id()
+    record = {
+        "version": version,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        **metadata
+    }
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(record, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return version
+
+
+def staging_path(path: str) -> str:
+    """Temporary sibling of an artifact path, keeping its extension (Keras picks the format from it)."""
+    root, ext = os.path.splitext(path)
+    return f"{root}.tmp-{os.getpid()}{ext}"
+
+
+def publish_artifacts(paths: Sequence[str], version_path: str, **metadata) -> str:
+    """
+    Move artifacts already written to their staging_path() into place,
+    then stamp them with a new version. The version file is marked pending
+    before the first move, so a loader overlapping the moves sees either
+    the pending mark or a changed version and retries instead of pairing
+    files of two versions.
+    """
+    version = new_version_id()
+    write_version_file(version_path, version, pending=True)
+    for path in paths:
+        os.replace(staging_path(path), path)
+    return write_version_file(version_path, version, **metadata)
+
+
+def read_version_file(path: str) -> Optional[dict]:
+    """Current version record, or None if the artifacts were never stamped."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
@@ -1,4 +1,34 @@
-import re
+import os
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Iterable, List
+
+_ASCII_LETTERS = frozenset(map(ord, 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ'))
+
+# Below this many texts a process pool costs more than it saves
+PARALLEL_MIN_TEXTS = 20000
+
+
+class _CleanTable(dict):
+    """
+    str.translate table equivalent to re.sub(r'[^a-zA-Z\\s]', ' ', text).
+    Entries are filled lazily per code point, so it covers all of Unicode.
+    """
+
+    def __missing__(self, code: int) -> str:
+        char = chr(code)
+        value = char if code in _ASCII_LETTERS or char.isspace() else ' '
+        self[code] = value
+        return value
+
+
+_CLEAN_TABLE = _CleanTable()
+
+# Batch separator: kept as-is by the batch table, so one translate call covers every text
+_BATCH_SEPARATOR = '\x00'
+_BATCH_TABLE = _CleanTable({ord(_BATCH_SEPARATOR): _BATCH_SEPARATOR})
+
 
 def clean_text(text: str) -> str:
     """
@@ -8,7 +38,7 @@ def clean_text(text: str) -> str:
     - Keep words & spaces
     """
     text = text.lower()
-    text = re.sub(r'[^a-zA-Z\s]', ' ', text)
+    text = text.translate(_CLEAN_TABLE)
     text = ' '.join(text.split())
     return text
 
@@ -17,3 +47,45 @@ def preprocess_text(text: str) -> str:
     Final preprocessing pipeline for chatbot.
     """
     return clean_text(text)
+
+def _clean_joined(joined: str) -> str:
+    """Clean separator-joined texts; returns them joined the same way."""
+    joined = joined.lower().translate(_BATCH_TABLE)
+    return _BATCH_SEPARATOR.join([' '.join(text.split()) for text in joined.split(_BATCH_SEPARATOR)])
+
+def preprocess_batch(texts: Iterable[str], workers: int = 1) -> List[str]:
+    """
+    Preprocess many texts in one pass (same output as preprocess_text per item).
+    With workers > 1, very large corpora are split across a process pool.
+    """
+    texts = [str(text) for text in texts]
+    if not texts:
+        return []
+    joined = _BATCH_SEPARATOR.join(texts)
+    if joined.count(_BATCH_SEPARATOR) != len(texts) - 1:
+        # A text contains the separator itself
+        return [clean_text(text) for text in texts]
+
+    workers = min(workers, os.cpu_count() or 1)
+    if workers <= 1 or len(texts) < PARALLEL_MIN_TEXTS:
+        return _clean_joined(joined).split(_BATCH_SEPARATOR)
+
+    # Chunks travel as one joined string each; far cheaper to pickle than a list of strings
+    chunk_size = -(-len(texts) // workers)
+    chunks = [_BATCH_SEPARATOR.join(texts[i:i + chunk_size]) for i in range(0, len(texts), chunk_size)]
+    # spawn: safe to use from a process that already runs threads
+    with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as pool:
+        return [text for chunk in pool.map(_clean_joined, chunks) for text in chunk.split(_BATCH_SEPARATOR)]
+
+def text_hash(text: str) -> str:
+    """
+    SHA-1 hex digest of the preprocessed text.
+    Used as an indexed key for duplicate detection.
+    """
+    return processed_hash(preprocess_text(text))
+
+def processed_hash(processed: str) -> str:
+    """
+    text_hash for text that is already preprocessed.
+    """
+    return hashlib.sha1(processed.encode('utf-8')).hexdigest()
@@ -0,0 +1,239 @@
+import json
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from utils.length_buckets import trim_padding
+
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+def _hard_sigmoid(x: np.ndarray) -> np.ndarray:
+    return np.clip(0.2 * x + 0.5, 0.0, 1.0)
+
+
+def _relu(x: np.ndarray) -> np.ndarray:
+    return np.maximum(x, 0.0)
+
+
+def _softmax(x: np.ndarray) -> np.ndarray:
+    e = np.exp(x - np.max(x, axis=-1, keepdims=True))
+    return e / np.sum(e, axis=-1, keepdims=True)
+
+
+ACTIVATIONS = {
+    "linear": lambda x: x,
+    "relu": _relu,
+    "tanh": np.tanh,
+    "sigmoid": _sigmoid,
+    "hard_sigmoid": _hard_sigmoid,
+    "softmax": _softmax,
+}
+
+
+def pad_sequences(sequences: Sequence[Sequence[int]], maxlen: int) -> np.ndarray:
+    """Left-pad / left-truncate sequences to maxlen (same as Keras pad_sequences defaults)."""
+    padded = np.zeros((len(sequences), maxlen), dtype=np.int32)
+    for i, seq in enumerate(sequences):
+        if not seq:
+            continue
+        trunc = seq[-maxlen:]
+        padded[i, maxlen - len(trunc):] = trunc
+    return padded
+
+
+class NumpyLSTM:
+    """
+    Pure-NumPy forward pass for the Embedding -> LSTM -> Dense stack.
+
+    Dropout layers are identity at inference time and are skipped. Weights are
+    read from the Keras .h5 file or from the exported .npz weight bundle, so
+    serving does not need TensorFlow.
+    """
+
+    def __init__(
+        self,
+        embeddings: np.ndarray,
+        lstm_kernel: np.ndarray,
+        lstm_recurrent_kernel: np.ndarray,
+        lstm_bias: np.ndarray,
+        dense_layers: List[tuple],
+        activation: str = "tanh",
+        recurrent_activation: str = "sigmoid",
+        mask_zero: bool = False
+    ):
+        self.embeddings = np.asarray(embeddings, dtype=np.float32)
+        self.lstm_kernel = np.asarray(lstm_kernel, dtype=np.float32)
+        self.lstm_recurrent_kernel = np.asarray(lstm_recurrent_kernel, dtype=np.float32)
+        self.lstm_bias = np.asarray(lstm_bias, dtype=np.float32)
+        self.dense_layers = [
+            (np.asarray(w, dtype=np.float32), np.asarray(b, dtype=np.float32), act)
+            for w, b, act in dense_layers
+        ]
+        self.activation = activation
+        self.recurrent_activation = recurrent_activation
+        self.mask_zero = mask_zero
+        self.units = self.lstm_recurrent_kernel.shape[0]
+
+    # ==================== LOADING ====================
+
+    @classmethod
+    def _from_layers(cls, layers: List[tuple]) -> "NumpyLSTM":
+        """Build from a list of (class_name, config, weights) in model order."""
+        embedding = lstm = None
+        dense_layers = []
+        for class_name, config, weights in layers:
+            if class_name == "Embedding":
+                embedding = (config, weights)
+            elif class_name == "LSTM":
+                lstm = (config, weights)
+            elif class_name == "Dense":
+                dense_layers.append((weights[0], weights[1], config.get("activation", "linear")))
+            elif class_name not in ("Dropout", "InputLayer"):
+                raise ValueError(f"Unsupported layer for NumPy inference: {class_name}")
+
+        if embedding is None or lstm is None or not dense_layers:
+            raise ValueError("Model must contain Embedding, LSTM and Dense layers")
+
+        lstm_config, lstm_weights = lstm
+        if lstm_config.get("return_sequences") or lstm_config.get("go_backwards"):
+            raise ValueError("Only forward LSTM with return_sequences=False is supported")
+
+        return cls(
+            embeddings=embedding[1][0],
+            lstm_kernel=lstm_weights[0],
+            lstm_recurrent_kernel=lstm_weights[1],
+            lstm_bias=lstm_weights[2],
+            dense_layers=dense_layers,
+            activation=lstm_config.get("activation", "tanh"),
+            recurrent_activation=lstm_config.get("recurrent_activation", "sigmoid"),
+            mask_zero=bool(embedding[0].get("mask_zero", False))
+        )
+
+    @classmethod
+    def from_h5(cls, path: str) -> "NumpyLSTM":
+        """Read weights and layer config from a Keras .h5 model file."""
+        import h5py
+
+        def _decode(value):
+            return value.decode("utf-8") if isinstance(value, bytes) else value
+
+        with h5py.File(path, "r") as f:
+            model_config = json.loads(_decode(f.attrs["model_config"]))
+            config = model_config["config"]
+            layer_configs = config["layers"] if isinstance(config, dict) else config
+            weights_group = f["model_weights"]
+
+            layers = []
+            for layer in layer_configs:
+                name = layer["config"].get("name")
+                weights = []
+                if name in weights_group:
+                    group = weights_group[name]
+                    for weight_name in group.attrs.get("weight_names", []):
+                        weights.append(np.asarray(group[_decode(weight_name)]))
+                layers.append((layer["class_name"], layer["config"], weights))
+
+        return cls._from_layers(layers)
+
+    @classmethod
+    def from_keras_model(cls, model) -> "NumpyLSTM":
+        """Extract weights from an in-memory Keras model."""
+        layers = [
+            (layer.__class__.__name__, layer.get_config(), layer.get_weights())
+            for layer in model.layers
+        ]
+        return cls._from_layers(layers)
+
+    @classmethod
+    def from_arrays(cls, config: dict, arrays: Dict[str, np.ndarray]) -> "NumpyLSTM":
+        """Build from the (config, arrays) pair returned by `to_arrays`."""
+        dense_layers = [
+            (arrays[f"dense_{i}_kernel"], arrays[f"dense_{i}_bias"], activation)
+            for i, activation in enumerate(config["dense_activations"])
+        ]
+        return cls(
+            embeddings=arrays["embeddings"],
+            lstm_kernel=arrays["lstm_kernel"],
+            lstm_recurrent_kernel=arrays["lstm_recurrent_kernel"],
+            lstm_bias=arrays["lstm_bias"],
+            dense_layers=dense_layers,
+            activation=config["activation"],
+            recurrent_activation=config["recurrent_activation"],
+            mask_zero=config["mask_zero"]
+        )
+
+    @classmethod
+    def from_bundle(cls, path: str) -> "NumpyLSTM":
+        """Load an exported .npz weight bundle."""
+        with np.load(path, allow_pickle=False) as data:
+            config = json.loads(str(data["config"]))
+            return cls.from_arrays(config, {name: data[name] for name in data.files if name != "config"})
+
+    def to_arrays(self) -> Tuple[dict, Dict[str, np.ndarray]]:
+        """Layer config and named weight arrays (the .npz bundle layout)."""
+        config = {
+            "activation": self.activation,
+            "recurrent_activation": self.recurrent_activation,
+            "mask_zero": self.mask_zero,
+            "dense_activations": [act for _, _, act in self.dense_layers],
+        }
+        arrays = {
+            "embeddings": self.embeddings,
+            "lstm_kernel": self.lstm_kernel,
+            "lstm_recurrent_kernel": self.lstm_recurrent_kernel,
+            "lstm_bias": self.lstm_bias,
+        }
+        for i, (w, b, _) in enumerate(self.dense_layers):
+            arrays[f"dense_{i}_kernel"] = w
+            arrays[f"dense_{i}_bias"] = b
+        return config, arrays
+
+    def save_bundle(self, path: str):
+        """Export weights to a single .npz bundle."""
+        config, arrays = self.to_arrays()
+        with open(path, "wb") as f:
+            np.savez(f, config=np.array(json.dumps(config)), **arrays)
+
+    # ==================== INFERENCE ====================
+
+    def predict(self, batch: np.ndarray, trim: bool = True) -> np.ndarray:
+        """
+        Run the forward pass on a (batch, timesteps) matrix of token ids.
+        With mask_zero, leading all-padding columns are skipped (same result).
+        """
+        batch = np.asarray(batch, dtype=np.int64)
+        if trim and self.mask_zero:
+            batch = trim_padding(batch)
+        n, timesteps = batch.shape
+        act = ACTIVATIONS[self.activation]
+        recurrent_act = ACTIVATIONS[self.recurrent_activation]
+        units = self.units
+
+        # Input projection for all timesteps in one matmul: (n, t, 4 * units)
+        x_proj = self.embeddings[batch] @ self.lstm_kernel + self.lstm_bias
+
+        h = np.zeros((n, units), dtype=np.float32)
+        c = np.zeros((n, units), dtype=np.float32)
+        for t in range(timesteps):
+            z = x_proj[:, t] + h @ self.lstm_recurrent_kernel
+            i = recurrent_act(z[:, :units])
+            f = recurrent_act(z[:, units:2 * units])
+            g = act(z[:, 2 * units:3 * units])
+            o = recurrent_act(z[:, 3 * units:])
+            c_new = f * c + i * g
+            h_new = o * act(c_new)
+            if self.mask_zero:
+                # Masked timesteps carry the previous state forward
+                keep = (batch[:, t] != 0)[:, None]
+                c = np.where(keep, c_new, c)
+                h = np.where(keep, h_new, h)
+            else:
+                c, h = c_new, h_new
+
+        out = h
+        for w, b, activation in self.dense_layers:
+            out = ACTIVATIONS[activation](out @ w + b)
+        return out
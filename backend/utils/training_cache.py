@@ -0,0 +1,88 @@
+import os
+import json
+import glob
+import hashlib
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+# Bump whenever data preparation changes, so old cache entries stop matching
+PREPARATION_FORMAT = "prep-v3"
+
+_HASH_MODULUS = 1 << 256
+
+
+class DataFingerprint:
+    """
+    SHA-256 based fingerprint of everything that determines the prepared
+    arrays: patterns, tags, split and padding length.
+
+    Built incrementally from streamed chunks. Rows are combined as a
+    multiset (sum of per-row hashes), so the result does not depend on
+    row order or chunking. Also tracks row count and distinct tags.
+    """
+
+    def __init__(self, split_ratio: str, max_sequence_length: int):
+        self.header = json.dumps([PREPARATION_FORMAT, split_ratio, max_sequence_length])
+        self.rows = 0
+        self.tags = set()
+        self._sum = 0
+
+    def update(self, sentences: Sequence[str], labels: Sequence[str]):
+        for sentence, label in zip(sentences, labels):
+            row = json.dumps([label, sentence], ensure_ascii=False).encode("utf-8")
+            self._sum = (self._sum + int.from_bytes(hashlib.sha256(row).digest(), "big")) % _HASH_MODULUS
+        self.rows += len(sentences)
+        self.tags.update(labels)
+
+    def hexdigest(self) -> str:
+        payload = f"{self.header}\n{self.rows}\n{self._sum:064x}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def training_fingerprint(data_fp: str, **hyperparameters) -> str:
+    """SHA-256 of the data fingerprint plus every training hyperparameter."""
+    payload = json.dumps({"data": data_fp, **hyperparameters}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class PreparedDataCache:
+    """
+    On-disk cache of preprocessed, tokenized, padded and split training
+    arrays, one .npz file per data fingerprint. Only the most recently
+    used `max_entries` files are kept.
+    """
+
+    def __init__(self, directory: str, max_entries: int = 8):
+        self.directory = directory
+        self.max_entries = max(1, max_entries)
+
+    def _path(self, fingerprint: str) -> str:
+        return os.path.join(self.directory, f"{fingerprint}.npz")
+
+    def load(self, fingerprint: str) -> Optional[Dict[str, np.ndarray]]:
+        """Cached arrays for a fingerprint, or None on a miss or unreadable entry."""
+        path = self._path(fingerprint)
+        try:
+            with np.load(path) as data:
+                arrays = {name: data[name] for name in data.files}
+        except (FileNotFoundError, OSError, ValueError):
+            return None
+        os.utime(path)  # Mark as recently used
+        return arrays
+
+    def save(self, fingerprint: str, arrays: Dict[str, np.ndarray]):
+        """Write arrays atomically, then evict the least recently used entries."""
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(fingerprint)
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+
+        entries = sorted(glob.glob(os.path.join(self.directory, "*.npz")), key=os.path.getmtime, reverse=True)
+        for stale in entries[self.max_entries:]:
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
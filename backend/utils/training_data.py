@@ -0,0 +1,104 @@
+from collections import OrderedDict, defaultdict
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+
+class TrainingSetBuilder:
+    """
+    Builds the padded id matrix and label ids from streamed chunks of
+    preprocessed sentences in a single pass.
+
+    Each chunk is tokenized straight into a compact int32 matrix (ids in
+    first-seen order), so only the chunk's strings are ever held. `build`
+    then renumbers the words by frequency, which gives exactly the
+    word_index, sequences and padding of Keras Tokenizer.fit_on_texts +
+    texts_to_sequences + pad_sequences.
+
+    With a base tokenizer (incremental training), its ids never move and
+    new words are appended after them by frequency.
+    """
+
+    def __init__(self, maxlen: int, base_tokenizer=None):
+        self.maxlen = maxlen
+        self.base_tokenizer = base_tokenizer
+        self.rows = 0
+        self._ids: Dict[str, int] = dict(base_tokenizer.word_index) if base_tokenizer is not None else {}
+        self._base_size = len(self._ids)
+        self._counts: List[int] = [0] * (self._base_size + 1)  # Indexed by provisional id; 0 = padding
+        self._docs: List[int] = [0] * (self._base_size + 1)
+        self._tags: Dict[str, int] = {}
+        self._X: List[np.ndarray] = []
+        self._y: List[np.ndarray] = []
+
+    def add(self, sentences: Sequence[str], labels: Sequence[str]):
+        """Append a chunk of preprocessed sentences (lowercase words separated by spaces) and their tags."""
+        ids_map, counts, docs, maxlen = self._ids, self._counts, self._docs, self.maxlen
+        X = np.zeros((len(sentences), maxlen), dtype=np.int32)
+        for row, sentence in enumerate(sentences):
+            ids = []
+            for word in sentence.split():
+                word_id = ids_map.get(word)
+                if word_id is None:
+                    word_id = ids_map[word] = len(counts)
+                    counts.append(0)
+                    docs.append(0)
+                counts[word_id] += 1
+                ids.append(word_id)
+            for word_id in set(ids):
+                docs[word_id] += 1
+            if ids:
+                ids = ids[-maxlen:]  # pad_sequences default: keep the last maxlen tokens, pad in front
+                X[row, maxlen - len(ids):] = ids
+
+        tags = self._tags
+        y = np.fromiter((tags.setdefault(tag, len(tags)) for tag in labels), dtype=np.int32, count=len(labels))
+        self._X.append(X)
+        self._y.append(y)
+        self.rows += len(sentences)
+
+    def build(self):
+        """Returns (tokenizer, label encoder, X, y) with final word and label ids."""
+        from tensorflow.keras.preprocessing.text import Tokenizer
+        from sklearn.preprocessing import LabelEncoder
+
+        counts = np.asarray(self._counts, dtype=np.int64)
+        size = len(counts)
+        words: List[str] = [""] * size
+        for word, word_id in self._ids.items():
+            words[word_id] = word
+
+        # Final id of every provisional id; stable sort keeps first-seen order for ties, like Keras
+        remap = np.arange(size, dtype=np.int32)
+        first_new = self._base_size + 1
+        order = first_new + np.argsort(-counts[first_new:], kind="stable")
+        remap[order] = np.arange(first_new, size, dtype=np.int32)
+
+        X = remap[np.concatenate(self._X)] if self._X else np.zeros((0, self.maxlen), dtype=np.int32)
+
+        if self.base_tokenizer is not None:
+            tokenizer = self.base_tokenizer
+        else:
+            tokenizer = Tokenizer()
+            tokenizer.document_count = self.rows
+            tokenizer.word_counts = OrderedDict()
+            tokenizer.word_docs = defaultdict(int)
+            tokenizer.index_docs = defaultdict(int)
+        for provisional in order:
+            word, final = words[provisional], int(remap[provisional])
+            tokenizer.word_index[word] = final
+            tokenizer.index_word[final] = word
+            tokenizer.word_docs[word] = self._docs[provisional]
+            tokenizer.index_docs[final] = self._docs[provisional]
+        for provisional in range(first_new, size):  # word_counts stays in first-seen order
+            tokenizer.word_counts[words[provisional]] = int(counts[provisional])
+
+        classes = sorted(self._tags)
+        label_remap = np.empty(len(classes), dtype=np.int64)
+        for final, tag in enumerate(classes):
+            label_remap[self._tags[tag]] = final
+        y = label_remap[np.concatenate(self._y)] if self._y else np.zeros(0, dtype=np.int64)
+        encoder = LabelEncoder()
+        encoder.classes_ = np.array(classes)
+
+        return tokenizer, encoder, X, y
@@ -0,0 +1,110 @@
+import json
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+# Keras Tokenizer defaults
+KERAS_FILTERS = '!"#$%&()*+,-./:;<=>?@[\\]^_`{|}~\t\n'
+
+VOCAB_FORMAT = "vocab-v1"
+
+
+class VocabEncoder:
+    """
+    Compact replacement for the pickled Keras Tokenizer at inference time.
+
+    Holds only word -> id (plus the text-splitting options), and encodes a
+    batch of texts straight into a left-padded int32 matrix identical to
+    `pad_sequences(tokenizer.texts_to_sequences(texts), maxlen=maxlen)`.
+
+    File format (vocab.txt): a JSON header line with the tokenizer options,
+    then one word per line; the word on line n (after the header) has id n.
+    """
+
+    def __init__(
+        self,
+        words: Sequence[str],
+        filters: str = KERAS_FILTERS,
+        lower: bool = True,
+        split: str = " ",
+        oov_token: Optional[str] = None,
+        num_words: Optional[int] = None
+    ):
+        self.words = list(words)
+        self.filters = filters
+        self.lower = lower
+        self.split = split
+        self.oov_token = oov_token
+        self.num_words = num_words
+
+        # Keras only keeps ids below num_words; the rest are dropped or mapped to OOV
+        limit = num_words if num_words else len(self.words) + 1
+        self.word_index: Dict[str, int] = {
+            word: i for i, word in enumerate(self.words, start=1) if i < limit
+        }
+        self.oov_id = self.word_index.get(oov_token) if oov_token else None
+        self._table = str.maketrans({c: split for c in filters})
+
+    @property
+    def vocab_size(self) -> int:
+        return len(self.words)
+
+    @classmethod
+    def from_tokenizer(cls, tokenizer) -> "VocabEncoder":
+        """Build from a fitted Keras Tokenizer."""
+        words = [word for word, _ in sorted(tokenizer.word_index.items(), key=lambda item: item[1])]
+        return cls(
+            words,
+            filters=tokenizer.filters,
+            lower=tokenizer.lower,
+            split=tokenizer.split,
+            oov_token=tokenizer.oov_token,
+            num_words=tokenizer.num_words
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "VocabEncoder":
+        """Load a vocabulary written by `save` (one small file read)."""
+        with open(path, encoding="utf-8") as f:
+            header, *words = f.read().split("\n")
+        config = json.loads(header)
+        if config.pop("format", None) != VOCAB_FORMAT:
+            raise ValueError(f"{path} is not a {VOCAB_FORMAT} vocabulary file")
+        if words and words[-1] == "":
+            words.pop()
+        return cls(words, **config)
+
+    def save(self, path: str):
+        """Write the header line and the vocabulary in id order."""
+        config = {
+            "format": VOCAB_FORMAT,
+            "filters": self.filters,
+            "lower": self.lower,
+            "split": self.split,
+            "oov_token": self.oov_token,
+            "num_words": self.num_words
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(config) + "\n")
+            f.write("\n".join(self.words) + "\n")
+
+    def encode(self, text: str) -> List[int]:
+        """Token ids for one text (same as Tokenizer.texts_to_sequences)."""
+        if self.lower:
+            text = text.lower()
+        get = self.word_index.get
+        oov_id = self.oov_id
+        ids = [get(word, oov_id) for word in text.translate(self._table).split(self.split) if word]
+        if oov_id is None:
+            ids = [i for i in ids if i is not None]
+        return ids
+
+    def encode_batch(self, texts: Sequence[str], maxlen: int) -> np.ndarray:
+        """Encode texts into a preallocated, left-padded / left-truncated int32 matrix."""
+        X = np.zeros((len(texts), maxlen), dtype=np.int32)
+        for row, text in enumerate(texts):
+            ids = self.encode(text)[-maxlen:]
+            if ids:
+                X[row, maxlen - len(ids):] = ids
+        return X
@@ -0,0 +1,83 @@
+from typing import Sequence, Tuple
+
+import numpy as np
+
+
+def transplant_weights(old_model, new_model, old_classes: Sequence[str], new_classes: Sequence[str]):
+    """
+    Initialize new_model (same architecture, larger vocabulary and/or
+    different intents) from old_model. Embedding rows of known words and
+    output units of known intents are copied; new rows and units keep
+    their fresh initialization. Raises ValueError if the architectures differ,
+    including whether the embedding masks padding.
+    """
+    old_layers, new_layers = old_model.layers, new_model.layers
+    if len(old_layers) != len(new_layers):
+        raise ValueError("Current model has a different architecture")
+
+    old_index = {name: i for i, name in enumerate(old_classes)}
+    for position, (old, new) in enumerate(zip(old_layers, new_layers)):
+        old_weights, new_weights = old.get_weights(), new.get_weights()
+        if type(old) is not type(new) or len(old_weights) != len(new_weights):
+            raise ValueError(f"Current model has a different architecture at layer {old.name}")
+        if not old_weights:
+            continue
+
+        if position == 0:
+            # Embedding: ids are stable, the matrix only grows
+            if getattr(old, "mask_zero", False) != getattr(new, "mask_zero", False):
+                raise ValueError("Current embedding handles padding differently (mask_zero)")
+            embedding = new_weights[0]
+            rows = old_weights[0].shape[0]
+            if rows > embedding.shape[0] or old_weights[0].shape[1] != embedding.shape[1]:
+                raise ValueError("Current embedding does not fit the extended vocabulary")
+            embedding[:rows] = old_weights[0]
+            new.set_weights([embedding])
+        elif position == len(new_layers) - 1:
+            # Output layer: one unit per intent, matched by name
+            kernel, bias = new_weights
+            if old_weights[0].shape[0] != kernel.shape[0]:
+                raise ValueError("Current output layer has a different input size")
+            for i, name in enumerate(new_classes):
+                j = old_index.get(name)
+                if j is not None:
+                    kernel[:, i] = old_weights[0][:, j]
+                    bias[i] = old_weights[1][j]
+            new.set_weights([kernel, bias])
+        else:
+            if any(a.shape != b.shape for a, b in zip(old_weights, new_weights)):
+                raise ValueError(f"Current model has a different architecture at layer {old.name}")
+            new.set_weights(old_weights)
+
+
+def select_finetune_samples(
+    old_model,
+    old_classes: Sequence[str],
+    old_vocab_size: int,
+    X: np.ndarray,
+    y: np.ndarray,
+    new_classes: Sequence[str],
+    replay_ratio: float,
+    replay_min: int,
+    seed: int = 42
+) -> Tuple[np.ndarray, int, int]:
+    """
+    Indices of X to fine-tune on: every sample the current model cannot
+    handle yet (new intent, new word, or misclassified), plus a random
+    replay of the others so it does not forget them.
+    Returns (indices, new_count, replay_count).
+    """
+    old_index = {name: i for i, name in enumerate(old_classes)}
+    target = np.array([old_index.get(new_classes[label], -1) for label in y])
+    has_new_word = (X > old_vocab_size).any(axis=1)
+
+    # New word ids are unknown to the old embedding; read them as padding
+    known_X = np.where(X > old_vocab_size, 0, X)
+    predicted = np.argmax(old_model.predict(known_X, verbose=0), axis=1)
+    is_new = (target < 0) | has_new_word | (predicted != target)
+
+    new_idx = np.flatnonzero(is_new)
+    rest = np.flatnonzero(~is_new)
+    replay_count = min(len(rest), max(replay_min, int(round(replay_ratio * len(new_idx)))))
+    replay_idx = np.random.default_rng(seed).choice(rest, size=replay_count, replace=False)
+    return np.sort(np.concatenate([new_idx, replay_idx])), len(new_idx), replay_count
@@ -1,4 +1,4 @@
-import { useState, useEffect } from 'react'
+import { useState, useEffect, useRef } from 'react'
 import { useNavigate } from 'react-router-dom'
 import { Trash2, Edit2, Plus, Brain, Database, Check, ChevronRight, X, Settings } from 'lucide-react'
 
@@ -9,6 +9,8 @@ function IntentPage() {
   const [intents, setIntents] = useState([])
   const [loading, setLoading] = useState(true)
   const [isRetraining, setIsRetraining] = useState(false)
+  const [retrainEpoch, setRetrainEpoch] = useState(0)
+  const retrainEvents = useRef(null)
   
   // Assignment Modal State
   const [showAssignModal, setShowAssignModal] = useState(false)
@@ -29,6 +31,8 @@ function IntentPage() {
   useEffect(() => {
     fetchIntents()
     fetchNewData()
+    // Stop following a training job when leaving the page (the job keeps running)
+    return () => retrainEvents.current?.close()
   }, [])
 
   const fetchNewData = async () => {
@@ -55,18 +59,42 @@ function IntentPage() {
     }
   }
 
+  // Follow a training job over its event stream until it finishes; resolves with the final job
+  const waitForTrainingJob = (jobId) => new Promise((resolve, reject) => {
+    const events = new EventSource(`${API_URL}/training/jobs/${jobId}/events`)
+    retrainEvents.current = events
+    events.addEventListener('progress', (e) => {
+      const progress = JSON.parse(e.data)
+      if (progress.epoch) setRetrainEpoch(progress.epoch)
+    })
+    events.addEventListener('status', (e) => {
+      const job = JSON.parse(e.data)
+      if (!['succeeded', 'failed', 'cancelled'].includes(job.status)) return
+      events.close()
+      if (job.status === 'succeeded') resolve(job)
+      else reject(new Error(job.message || 'Gagal melatih model'))
+    })
+    events.onerror = () => {
+      if (events.readyState === EventSource.CLOSED) reject(new Error('Koneksi ke server terputus'))
+    }
+  })
+
   const handleRetrain = async () => {
     setShowRetrainModal(false)
     setIsRetraining(true)
+    setRetrainEpoch(0)
     
     try {
+      // Queues a training job and returns at once (202)
       const res = await fetch(
         `${API_URL}/intents/retrain?epochs=${retrainEpochs}&split_ratio=${retrainSplitRatio}`, 
         { method: 'POST' }
       )
-      const data = await res.json()
+      const job = await res.json()
+      
+      if (!res.ok) throw new Error(job.detail || 'Gagal melatih model')
       
-      if (!res.ok) throw new Error(data.detail || 'Gagal melatih model')
+      const data = await waitForTrainingJob(job.id)
       
       // Navigate to training detail page
       if (data.training_id) {
@@ -171,7 +199,7 @@ function IntentPage() {
             disabled={isRetraining}
           >
             {isRetraining ? (
-              <>Melatih Model...</>
+              <>Melatih Model...{retrainEpoch > 0 && ` (epoch ${retrainEpoch}/${retrainEpochs})`}</>
             ) : (
               <><Brain size={18} /> Retrain Model</>
             )}